@@ -0,0 +1,52 @@
+"""`hsbc-parser diff` on two large runs: streaming merge-join (sorted flat CSV) vs hash partitions (partitioned layout).
+
+    python benchmarks/bench_diff.py --statements 1000 --rows 200
+
+The second run changes every 50th description in a way that survives normalization, as a heuristic change would.
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import parsed_corpus
+
+from hsbc_parser.diff import diff_runs
+from hsbc_parser.export import export_csv, export_partitioned
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--statements", type=int, default=1000)
+    ap.add_argument("--rows", type=int, default=200, help="Transactions per statement")
+    args = ap.parse_args()
+
+    parsers = sorted(parsed_corpus(args.statements, rows=args.rows), key=lambda p: p.statement.archivo)
+    rows = sum(len(p.transactions) for p in parsers)
+    with tempfile.TemporaryDirectory() as tmp:
+        old, new, parts = Path(tmp) / "old", Path(tmp) / "new", Path(tmp) / "parts"
+        export_csv(parsers, old, frames=False)
+        for p in parsers:
+            for t in p.transactions[::50]:
+                t.descripcion = t.descripcion.lower()
+                t.persona = "ADICIONAL"
+        export_csv(parsers, new, frames=False)
+        export_partitioned(parsers, parts)
+
+        print(f"{args.statements} statements, {rows:,} transactions per run")
+        for label, other in (("sorted flat CSV", new), ("partitioned layout", parts)):
+            t0 = time.perf_counter()
+            result = diff_runs(old, other, out=Path(tmp) / "diff.csv")
+            elapsed = time.perf_counter() - t0
+            total = result.total()
+            print(
+                f"{label:<20} {result.mode:<12} {elapsed:7.2f} s  {2 * rows / elapsed:10,.0f} rows/s  "
+                f"changed={total.changed:,} added={total.added:,} removed={total.removed:,}"
+            )
+
+
+if __name__ == "__main__":
+    main()
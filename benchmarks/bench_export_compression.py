@@ -0,0 +1,57 @@
+"""Export write time and size: plain CSV vs gzip/xz CSV vs JSON lines.
+
+`csv/files` is `export_csv(frames=False)`, which skips building the returned DataFrames.
+
+    python benchmarks/bench_export_compression.py --statements 400 --rows 300
+
+Parses a synthetic corpus once (from page text, no PDFs), then times each exporter on it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+
+from synthetic import parsed_corpus
+
+from hsbc_parser.export import export_csv, export_jsonl
+
+VARIANTS = [
+    ("csv", export_csv, None),
+    ("csv/files", partial(export_csv, frames=False), None),
+    ("csv.gz", export_csv, "gz"),
+    ("csv.xz", export_csv, "xz"),
+    ("jsonl", export_jsonl, None),
+    ("jsonl.gz", export_jsonl, "gz"),
+]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--statements", type=int, default=200)
+    ap.add_argument("--rows", type=int, default=300)
+    args = ap.parse_args()
+
+    logging.getLogger("hsbc_parser").setLevel(logging.ERROR)
+    parsers = parsed_corpus(args.statements, rows=args.rows)
+    n_tx = sum(len(p.transactions) for p in parsers)
+    print(f"{args.statements} statements, {n_tx} transactions")
+
+    baseline = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, exporter, compress in VARIANTS:
+            out = Path(tmp) / label
+            t0 = time.perf_counter()
+            exporter(parsers, out, compress=compress)
+            elapsed = time.perf_counter() - t0
+            size = sum(f.stat().st_size for f in out.iterdir())
+            baseline = baseline or size
+            print(f"{label:<10} {elapsed:7.3f} s  {size / 2**20:8.2f} MB  ({size / baseline:6.1%} of csv)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Logging cost of warning-heavy parses: direct handlers vs the queued listener (`--log-mode queued`).
+
+    python benchmarks/bench_logging.py --workers 4 --statements 200 --warnings 50
+
+Each worker process parses synthetic statements and emits `--warnings` extra warnings per statement through
+`warn()` (with a reconciliation-sized context dict, like the parsers do). `parse path` is the slowest worker's
+time, i.e. what logging costs the parse; `total` also includes draining the listener and closing the file.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import synthetic
+
+from hsbc_parser.batch import _mp_context
+from hsbc_parser.logging_utils import (
+    configure_logging,
+    flush_logging,
+    get_logger,
+    logging_config,
+    shutdown_logging,
+)
+from hsbc_parser.parsers.types import warn
+
+CONTEXT = {
+    "prev_ars": 1000.0,
+    "sum_ars": 200.0,
+    "expected_ars": 1200.0,
+    "pdf_ars": 1210.0,
+    "diff_ars": -10.0,
+    "prev_usd": 0.0,
+    "sum_usd": 0,
+    "expected_usd": 0.0,
+    "pdf_usd": 0.0,
+    "diff_usd": 0.0,
+    "tolerance_ratio": 0.05,
+}
+
+
+def _worker(log_config, index: int, statements: int, warnings: int, conn) -> None:
+    from hsbc_parser.dispatcher import parse_text
+
+    configure_logging(**log_config)
+    logger = get_logger("parse").getChild("visa")
+    pages = [synthetic.visa_page(60, seed=index * statements + i) for i in range(statements)]
+    t0 = time.perf_counter()
+    for i, page in enumerate(pages):
+        p = parse_text([page], "visa", name=f"w{index}-{i:05d}.txt", warning_samples=None)  # log every warning
+        for n in range(warnings):
+            context = {**CONTEXT, "n": n}
+            warn(p.warnings, p.statement.archivo, "WARNING", "SYNTHETIC_WARNING", "Synthetic warning", context, logger)
+    flush_logging()
+    conn.send(time.perf_counter() - t0)
+    conn.close()
+
+
+def _run(mode: str, workers: int, statements: int, warnings: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = Path(tmp) / "bench.log"
+        configure_logging(log_file=log_file, level="INFO", queued=mode == "queued")
+        ctx = _mp_context()
+        t0 = time.perf_counter()
+        procs = []
+        for i in range(workers):
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=_worker, args=(logging_config(), i, statements, warnings, child))
+            proc.start()
+            procs.append((proc, parent))
+        parse_path = max(conn.recv() for _, conn in procs)
+        for proc, _ in procs:
+            proc.join()
+        shutdown_logging()
+        for h in list(get_logger().handlers):
+            h.close()
+        total = time.perf_counter() - t0
+        lines = sum(1 for _ in log_file.open(encoding="utf-8"))
+    return {"mode": mode, "parse_path": parse_path, "total": total, "lines": lines}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--statements", type=int, default=200, help="Statements per worker")
+    ap.add_argument("--warnings", type=int, default=50, help="Extra warnings per statement")
+    ap.add_argument("--mode", choices=["direct", "queued"], help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.mode:
+        # One interpreter per mode: logging configuration is process-global.
+        print(json.dumps(_run(args.mode, args.workers, args.statements, args.warnings)))
+        return
+
+    print(f"{args.workers} workers x {args.statements} statements x {args.warnings} extra warnings")
+    for mode in ("direct", "queued"):
+        out = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--workers", str(args.workers),
+             "--statements", str(args.statements), "--warnings", str(args.warnings)],
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).stdout
+        r = json.loads(out)
+        print(
+            f"{mode:<7} parse path {r['parse_path']:7.3f} s   total {r['total']:7.3f} s   "
+            f"{r['lines'] / r['total']:10,.0f} lines/s  ({r['lines']} lines)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Long-run worker memory: no recycling vs `--recycle-after` / `--max-worker-rss-mb`.
+
+    python benchmarks/bench_memory_recycling.py --files 400 --recycle-after 50
+
+Prints worker RSS (MB) sampled along the run; with recycling the curve stays flat instead of growing.
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import write_corpus
+
+from hsbc_parser.batch import run_batch
+
+
+def _run(paths, label: str, samples: int, **limits) -> None:
+    t0 = time.perf_counter()
+    rss = []
+    pids = set()
+    for r in run_batch(paths, workers=1, **limits):
+        rss.append((r.worker_rss or 0) / 2**20)
+        pids.add(r.worker_pid)
+    elapsed = time.perf_counter() - t0
+    step = max(1, len(rss) // samples)
+    curve = " ".join(f"{v:.0f}" for v in rss[::step])
+    print(f"{label:<22} {len(paths) / elapsed:7.1f} files/s  workers used={len(pids):<4} max={max(rss):.0f} MB")
+    print(f"{'':<22} rss MB: {curve}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--files", type=int, default=200)
+    ap.add_argument("--pages", type=int, default=3)
+    ap.add_argument("--recycle-after", type=int, default=50)
+    ap.add_argument("--max-worker-rss-mb", type=float, default=None)
+    ap.add_argument("--samples", type=int, default=20)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_corpus(Path(tmp), args.files, pages=args.pages)
+        # A single huge recycle limit keeps one long-lived worker: the baseline.
+        _run(paths, "no recycling", args.samples, max_tasks_per_worker=10**9)
+        _run(
+            paths,
+            f"recycle every {args.recycle_after}",
+            args.samples,
+            max_tasks_per_worker=args.recycle_after,
+            max_worker_rss_mb=args.max_worker_rss_mb,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Where a large statement's memory goes: tracemalloc peak / retained bytes per stage (`--memory-profile`).
+
+    python benchmarks/bench_memory_stages.py --kind cuenta --pages 100 --rows 200
+    python benchmarks/bench_memory_stages.py --kind visa --pages 5 --pdf --json data/output/memory.json
+
+Builds one synthetic statement of `--pages` pages x `--rows` rows, parses it (from page text, or from a
+generated PDF with `--pdf` so the open/extract stages are included) and exports it, all in-process.
+tracemalloc makes pdfminer many times slower, so keep `--pdf` runs to a few pages.
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import synthetic
+
+from hsbc_parser.batch import run_batch
+from hsbc_parser.export import export_csv
+from hsbc_parser.memprof import PROFILER
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--kind", choices=["visa", "cuenta"], default="cuenta")
+    ap.add_argument("--pages", type=int, default=50)
+    ap.add_argument("--rows", type=int, default=200, help="Rows per page")
+    ap.add_argument("--pdf", action="store_true", help="Parse a generated PDF instead of page text")
+    ap.add_argument("--json", default=None, help="Also write the report as JSON to this path")
+    args = ap.parse_args()
+
+    page = synthetic.visa_page if args.kind == "visa" else synthetic.cuenta_page
+    pages = [page(args.rows, seed=n) for n in range(args.pages)]
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.pdf:
+            path = synthetic.write_text_pdf(Path(tmp) / f"HSBC {args.kind} synthetic.pdf", pages)
+        else:
+            path = Path(tmp) / f"HSBC {args.kind} synthetic.txt"
+            path.write_text("\f".join(pages), encoding="utf-8")
+
+        PROFILER.start()
+        t0 = time.perf_counter()
+        (result,) = run_batch([path], args.kind)
+        export_csv([result.parser], Path(tmp) / "out", frames=False)
+        elapsed = time.perf_counter() - t0
+        PROFILER.stop()
+
+    print(f"{args.kind}: {args.pages} pages x {args.rows} rows, {len(result.parser.transactions)} transactions "
+          f"in {elapsed:.2f} s (profiled)")
+    print(PROFILER.format_report())
+    if args.json:
+        PROFILER.write(args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Merchant normalization throughput (descriptions per second), cold vs memoized.
+
+    python benchmarks/bench_merchants.py --rows 500000 --distinct 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+import synthetic
+
+from hsbc_parser.merchants import DEFAULT_RULES, MerchantRules
+
+PROCESSORS = ["", "MERCPAGO*", "DLO*", "PAYU*AR*"]
+
+
+def _descriptions(rows: int, distinct: int, seed: int = 0) -> list:
+    rnd = random.Random(seed)
+    pool = [
+        f"{rnd.choice(PROCESSORS)}{rnd.choice(synthetic.MERCHANTS)} {rnd.randint(0, 99999):05d}" for _ in range(distinct)
+    ]
+    return [rnd.choice(pool) for _ in range(rows)]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=int, default=500_000)
+    ap.add_argument("--distinct", type=int, default=20_000)
+    args = ap.parse_args()
+
+    descriptions = _descriptions(args.rows, args.distinct)
+    rules = MerchantRules.from_file(DEFAULT_RULES)
+    print(f"{rules.size} rules, {args.rows} descriptions ({args.distinct} distinct)")
+
+    unique = list(dict.fromkeys(descriptions))
+    t0 = time.perf_counter()
+    for d in unique:
+        rules._classify(d)
+    cold = time.perf_counter() - t0
+    print(f"cold (no memo)   {len(unique) / cold:12,.0f} descriptions/s")
+
+    rules = MerchantRules.from_file(DEFAULT_RULES)
+    t0 = time.perf_counter()
+    for d in descriptions:
+        rules.classify(d)
+    memo = time.perf_counter() - t0
+    print(f"memoized         {len(descriptions) / memo:12,.0f} descriptions/s")
+
+
+if __name__ == "__main__":
+    main()
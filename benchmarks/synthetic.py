@@ -0,0 +1,104 @@
+"""Synthetic HSBC-like statements for benchmarks (no real data).
+
+Pages follow the layouts in tests/fixtures/*_full_page.txt, scaled to an arbitrary number of rows.
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+from pathlib import Path
+from typing import List
+
+# Benchmarks run from a checkout: make `hsbc_parser` and the tests' PDF builder importable.
+_ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(_ROOT), str(_ROOT / "tests")]
+
+from synthetic_pdf import write_text_pdf  # noqa: E402
+
+MERCHANTS = [
+    "MERCPAGO*TIENDAEJEMPLO",
+    "WWW.EJEMPLO.COM",
+    "SUPERMERCADO EJEMPLO SA",
+    "NETFLIX.COM",
+    "SPOTIFY P1234ABCD",
+    "FARMACIA CENTRAL",
+    "YPF SERVICENTRO 123",
+    "DLO*UBER RIDES",
+    "PAYU*AR*STEAM GAMES",
+    "CAFE DEL CENTRO",
+]
+
+
+def _money(cents: int) -> str:
+    whole, frac = divmod(abs(cents), 100)
+    s = f"{whole:,}".replace(",", ".") + f",{frac:02d}"
+    return s + "-" if cents < 0 else s
+
+
+def visa_page(rows: int, *, seed: int = 0) -> str:
+    rnd = random.Random(seed)
+    lines = []
+    total = 0
+    for i in range(rows):
+        cents = rnd.randint(100, 500_000)
+        total += cents
+        day = 1 + i % 28
+        desc = rnd.choice(MERCHANTS)
+        if rnd.random() < 0.2:
+            desc += f" C.{rnd.randint(1, 6):02d}/06"
+        lines.append(f"{day:02d}.01.24 {rnd.randint(0, 999999):06d}* {desc} {_money(cents)}")
+    header = [
+        "HSBC VISA",
+        "SALDO ANTERIOR 1.000,00 0,00",
+        f"SALDO ACTUAL $ {_money(100_000 + total)} U$S 0,00",
+        "CIERRE ACTUAL 25 Ene 24",
+        "CIERRE ANTERIOR 21 Dic 23",
+        "FECHA COMPROBANTE DETALLE DE TRANSACCION PESOS DOLARES",
+    ]
+    return "\n".join(header + lines)
+
+
+def cuenta_page(rows: int, *, seed: int = 0) -> str:
+    rnd = random.Random(seed)
+    saldo = 1_000_000
+    lines = [
+        "EXTRACTO DEL 01/01/2024 AL 31/01/2024",
+        "CAJA DE AHORRO EN $ NRO. 000-0-00000-0",
+        "- DETALLE DE OPERACIONES -",
+        "FECHA REFERENCIA NRO DEBITO CREDITO SALDO",
+        f"- SALDO ANTERIOR {_money(saldo)}",
+    ]
+    for i in range(rows):
+        cents = rnd.randint(100, 50_000)
+        if rnd.random() < 0.5:
+            saldo -= cents
+            cols = f"{_money(cents)} {_money(saldo)}"
+        else:
+            saldo += cents
+            cols = f"0,00 {_money(cents)} {_money(saldo)}"
+        lines.append(f"{1 + i % 28:02d}-ENE - {rnd.choice(MERCHANTS)} {rnd.randint(0, 99999):05d} {cols}")
+    lines.append(f"- SALDO FINAL {_money(saldo)}")
+    return "\n".join(lines)
+
+
+def write_corpus(out_dir: str | Path, files: int, *, pages: int = 3, rows_per_page: int = 60) -> List[Path]:
+    """Write `files` synthetic Visa PDFs of `pages` pages each; returns their paths."""
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(files):
+        content = [visa_page(rows_per_page, seed=i * 1000 + n) for n in range(pages)]
+        paths.append(write_text_pdf(out / f"HSBC Visa synthetic {i:05d}.pdf", content))
+    return paths
+
+
+def parsed_corpus(statements: int, *, rows: int = 200) -> list:
+    """Parse `statements` synthetic statements (alternating Visa / savings account) straight from page text."""
+    from hsbc_parser.dispatcher import parse_text
+
+    parsers = []
+    for i in range(statements):
+        kind, page = ("visa", visa_page) if i % 2 == 0 else ("cuenta", cuenta_page)
+        parsers.append(parse_text([page(rows, seed=i)], kind, name=f"HSBC {kind} synthetic {i:05d}.txt"))
+    return parsers
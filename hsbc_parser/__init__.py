@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import logging
 
-__all__ = ["parse_pdf", "export_csv"]
+__all__ = ["parse_pdf", "parse_text", "parse_pdf_async", "parse_many_async", "export_csv"]
 
 logging.getLogger("hsbc_parser").addHandler(logging.NullHandler())
 
@@ -13,6 +13,24 @@ def parse_pdf(*args, **kwargs):
     return _parse_pdf(*args, **kwargs)
 
 
+def parse_text(*args, **kwargs):
+    from .dispatcher import parse_text as _parse_text
+
+    return _parse_text(*args, **kwargs)
+
+
+async def parse_pdf_async(*args, **kwargs):
+    from .aio import parse_pdf_async as _parse_pdf_async
+
+    return await _parse_pdf_async(*args, **kwargs)
+
+
+async def parse_many_async(*args, **kwargs):
+    from .aio import parse_many_async as _parse_many_async
+
+    return await _parse_many_async(*args, **kwargs)
+
+
 def export_csv(*args, **kwargs):
     from .export import export_csv as _export_csv
 
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Iterable, List, Optional
+
+from .dispatcher import parse_pdf
+
+DEFAULT_MAX_CONCURRENCY = 4
+
+_default_executor: ThreadPoolExecutor | None = None
+_default_executor_lock = threading.Lock()
+
+
+def _get_default_executor() -> ThreadPoolExecutor:
+    global _default_executor
+    with _default_executor_lock:
+        if _default_executor is None:
+            _default_executor = ThreadPoolExecutor(
+                max_workers=DEFAULT_MAX_CONCURRENCY,
+                thread_name_prefix="hsbc-parser",
+            )
+        return _default_executor
+
+
+async def parse_pdf_async(
+    pdf_path: str,
+    tipo: str | None = None,
+    *,
+    executor: Optional[Executor] = None,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    **kwargs,
+):
+    """Parse an HSBC PDF without blocking the event loop.
+
+    The blocking pdfplumber extraction + parsing runs in `executor` (default: a shared thread pool of
+    `DEFAULT_MAX_CONCURRENCY` workers). Pass a `ProcessPoolExecutor` for CPU parallelism. Other keyword
+    arguments (`cache`, `max_pages`, `warning_samples`) are passed on to `parse_pdf`.
+
+    Cancelling the awaiting task drops the job if it has not started yet; a parse that is already
+    running finishes in its worker and the result is discarded.
+
+    Returns the same parser instance as `parse_pdf` (has .statement, .transactions, .warnings).
+    """
+    loop = asyncio.get_running_loop()
+    pool = executor or _get_default_executor()
+    job = functools.partial(parse_pdf, pdf_path, tipo, **kwargs)
+    if semaphore is None:
+        return await loop.run_in_executor(pool, job)
+    async with semaphore:
+        return await loop.run_in_executor(pool, job)
+
+
+async def parse_many_async(
+    pdf_paths: Iterable[str],
+    tipo: str | None = None,
+    *,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    executor: Optional[Executor] = None,
+    **kwargs,
+) -> List:
+    """Parse several PDFs concurrently, at most `max_concurrency` at a time (`kwargs` as in `parse_pdf_async`).
+
+    Results are returned in input order. If any parse fails (or the caller is cancelled), the
+    remaining pending parses are cancelled before the exception propagates.
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be >= 1")
+
+    paths = [str(p) for p in pdf_paths]
+    semaphore = asyncio.Semaphore(max_concurrency)
+    own_executor = executor is None
+    pool = executor or ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="hsbc-parser")
+    tasks = [
+        asyncio.ensure_future(parse_pdf_async(p, tipo, executor=pool, semaphore=semaphore, **kwargs))
+        for p in paths
+    ]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for t in tasks:
+            t.cancel()
+        raise
+    finally:
+        if own_executor:
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List
+
+from .dispatcher import detect_type
+from .io_utils import file_sha256, open_text
+
+ARTIFACT_VERSION = 1
+
+
+def page_record(pdf_path: str | Path, pages: List[str]) -> Dict[str, Any]:
+    """Artifact line for one PDF: its page text plus enough metadata to trace it back to the source."""
+    path = Path(pdf_path)
+    return {
+        "v": ARTIFACT_VERSION,
+        "archivo": path.name,
+        "source": str(path),
+        "size": path.stat().st_size,
+        "sha256": file_sha256(path),
+        "n_pages": len(pages),
+        "detected_type": detect_type("\n".join(pages)),
+        "pages": pages,
+    }
+
+
+def write_artifact(records: Iterable[Dict[str, Any]], path: str | Path) -> int:
+    """Write records as JSON lines (gzip/xz by extension, e.g. `pages.jsonl.gz`); returns the count."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    n = 0
+    with open_text(path, "w") as f:
+        for rec in records:
+            f.write(json.dumps(rec, ensure_ascii=False, separators=(",", ":")))
+            f.write("\n")
+            n += 1
+    return n
+
+
+def read_artifact(path: str | Path) -> Iterator[Dict[str, Any]]:
+    """Stream records back from an artifact written by `write_artifact`."""
+    with open_text(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,441 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass, field
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import metrics, tracing
+from .dispatcher import PageLimitExceeded, extract_pages, parse_pages
+from .io_utils import read_text_pages
+from .logging_utils import configure_logging, flush_logging, get_logger, logging_config
+from .parsers.types import DEFAULT_WARNING_SAMPLES
+
+logger = get_logger("batch")
+
+# Imported once by the forkserver, so every (re)started worker is forked with pdfplumber + parsers loaded.
+_PRELOAD = ["pdfplumber", "hsbc_parser.batch"]
+
+
+def _mp_context():
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload(_PRELOAD)
+        return ctx
+    return multiprocessing.get_context()
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process (Linux: current RSS; elsewhere: peak RSS)."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        import sys
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class ParseFailed(RuntimeError):
+    """A parse raised inside a worker process; carries the stage and the worker's traceback."""
+
+    def __init__(self, path: str, stage: str, message: str, tb: str = ""):
+        super().__init__(f"{path} failed during {stage}: {message}\n{tb}".rstrip())
+        self.path = path
+        self.stage = stage
+        self.tb = tb
+
+
+@dataclass
+class BatchResult:
+    path: str
+    parser: Any = None
+    pages: Optional[List[str]] = None  # extracted page text (only with `extract_only`)
+    code: Optional[str] = None  # None on success, else the warning code (PARSE_TIMEOUT, PAGE_LIMIT_EXCEEDED, ...)
+    stage: Optional[str] = None
+    message: str = ""
+    elapsed: float = 0.0
+    context: Dict[str, Any] = field(default_factory=dict)
+    worker_pid: Optional[int] = None  # set when parsed in a pool worker
+    worker_rss: Optional[int] = None  # worker RSS in bytes right after this file
+
+    @property
+    def ok(self) -> bool:
+        return self.code is None
+
+    def warning(self) -> Dict[str, Any]:
+        """Warning record (same shape as `BaseParser.warnings`) describing a failed file."""
+        return {
+            "archivo": Path(self.path).name,
+            "level": "ERROR",
+            "code": self.code,
+            "message": self.message,
+            "context": {"stage": self.stage, "elapsed_s": round(self.elapsed, 3), **self.context},
+        }
+
+
+def _run_one(path: str, tipo: str | None, options: Dict[str, Any], on_stage=None) -> BatchResult:
+    with tracing.span("file", archivo=Path(path).name):
+        return _run_stages(path, tipo, options, on_stage)
+
+
+def _run_stages(path: str, tipo: str | None, options: Dict[str, Any], on_stage=None) -> BatchResult:
+    t0 = time.perf_counter()
+    stage = "extract"
+    try:
+        if on_stage:
+            on_stage(stage)
+        if path.endswith(".txt"):
+            pages = read_text_pages(path)
+            if options.get("max_pages") is not None and len(pages) > options["max_pages"]:
+                raise PageLimitExceeded(path, len(pages), options["max_pages"])
+        else:
+            pages = extract_pages(path, max_pages=options.get("max_pages"))
+        if options.get("extract_only"):
+            return BatchResult(path, pages=pages, stage=stage, elapsed=time.perf_counter() - t0)
+        stage = "parse"
+        if on_stage:
+            on_stage(stage)
+        p = parse_pages(
+            path,
+            pages,
+            tipo,
+            cache=options.get("cache"),
+            warning_samples=options.get("warning_samples", DEFAULT_WARNING_SAMPLES),
+        )
+    except PageLimitExceeded as e:
+        return BatchResult(
+            path,
+            code="PAGE_LIMIT_EXCEEDED",
+            stage=stage,
+            message="PDF exceeds the page limit; skipped",
+            elapsed=time.perf_counter() - t0,
+            context={"pages": e.pages, "max_pages": e.limit},
+        )
+    except Exception as e:
+        if not options.get("keep_going"):
+            raise
+        logger.exception("Failed to parse %s (stage=%s)", path, stage)
+        return BatchResult(
+            path,
+            code="PARSE_FAILED",
+            stage=stage,
+            message=f"{type(e).__name__}: {e}",
+            elapsed=time.perf_counter() - t0,
+            context={"traceback": traceback.format_exc()},
+        )
+    return BatchResult(path, parser=p, stage=stage, elapsed=time.perf_counter() - t0)
+
+
+def _counted(result: BatchResult) -> BatchResult:
+    # Failed files never go through warn(); count them with the parser warnings.
+    if result.code is not None:
+        metrics.inc("hsbc_parser_warnings_total", code=result.code, level="ERROR")
+    return result
+
+
+def _send_telemetry(conn, index: int, metrics_enabled: bool, trace_enabled: bool) -> None:
+    if metrics_enabled:
+        conn.send(("metrics", index, metrics.REGISTRY.drain()))
+    if trace_enabled:
+        conn.send(("trace", index, tracing.TRACER.drain()))
+
+
+def _worker_main(
+    conn, log_config: Dict[str, Any] | None, metrics_enabled: bool = False, trace_enabled: bool = False
+) -> None:
+    if log_config:
+        configure_logging(**log_config)
+    metrics.enable(metrics_enabled)
+    tracing.enable(trace_enabled)
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            flush_logging()
+            return
+        if task is None:
+            flush_logging()
+            return
+        index, path, tipo, options = task
+        state = {"stage": "start", "t0": time.perf_counter()}
+
+        def on_stage(stage: str) -> None:
+            state["stage"] = stage
+            conn.send(("stage", index, stage))
+
+        try:
+            result = _run_one(path, tipo, options, on_stage)
+        except Exception as e:
+            flush_logging()
+            _send_telemetry(conn, index, metrics_enabled, trace_enabled)
+            conn.send(
+                (
+                    "error",
+                    index,
+                    (state["stage"], f"{type(e).__name__}: {e}", traceback.format_exc(), current_rss_bytes()),
+                )
+            )
+        else:
+            result.worker_pid = os.getpid()
+            result.worker_rss = current_rss_bytes()
+            flush_logging()
+            _send_telemetry(conn, index, metrics_enabled, trace_enabled)
+            conn.send(("done", index, result))
+
+
+class _Worker:
+    def __init__(self, ctx, log_config: Dict[str, Any] | None, telemetry: Tuple[bool, bool] = (False, False)):
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(
+            target=_worker_main, args=(child, log_config, *telemetry), daemon=True, name="hsbc-parser-worker"
+        )
+        self.proc.start()
+        child.close()
+        self.task: Optional[Tuple[int, str]] = None
+        self.stage = "start"
+        self.started = 0.0
+        self.tasks_done = 0
+        self.rss = 0
+
+    def assign(self, index: int, path: str, tipo: str | None, options: Dict[str, Any]) -> None:
+        self.task = (index, path)
+        self.stage = "start"
+        self.started = time.perf_counter()
+        self.conn.send((index, path, tipo, options))
+
+    def kill(self) -> None:
+        self.proc.kill()
+        self.proc.join()
+        self.conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.proc.join(timeout=5)
+        if self.proc.is_alive():
+            self.proc.kill()
+            self.proc.join()
+        self.conn.close()
+
+
+class SupervisedPool:
+    """Process pool where each task can be killed individually.
+
+    Every worker owns a pipe; the parent tracks which file each worker is on and the stage it reported.
+    A worker that exceeds `timeout` (wall time per file) is killed and replaced immediately, so the
+    other workers keep going and one pathological PDF can't stall the batch.
+
+    pdfminer caches fonts/layout objects per process, so long runs grow in memory. Workers are recycled
+    (stopped and replaced between files) after `max_tasks_per_worker` files or once their RSS exceeds
+    `max_worker_rss_mb`. Workers inherit whether metrics and tracing are enabled and ship their counters and
+    spans back with each result, so the parent's registry and trace cover the whole batch. Where available,
+    workers are forked from a forkserver that has already imported the parsers, which keeps restarts cheap.
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        *,
+        timeout: float | None = None,
+        max_tasks_per_worker: int | None = None,
+        max_worker_rss_mb: float | None = None,
+    ):
+        self.size = max(1, workers)
+        self.timeout = timeout
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.max_worker_rss = int(max_worker_rss_mb * 1024 * 1024) if max_worker_rss_mb else None
+        self.recycled = 0
+        self._ctx = _mp_context()
+        self._log_config = logging_config()
+        self._telemetry = (metrics.enabled(), tracing.enabled())
+        self._workers: List[_Worker] = []
+
+    def _spawn(self) -> _Worker:
+        w = _Worker(self._ctx, self._log_config, self._telemetry)
+        self._workers.append(w)
+        return w
+
+    def start(self) -> "SupervisedPool":
+        """Start all workers up front (otherwise they start with the first `run`)."""
+        while len(self._workers) < self.size:
+            self._spawn()
+        return self
+
+    def _maybe_recycle(self, w: _Worker) -> None:
+        over_tasks = self.max_tasks_per_worker is not None and w.tasks_done >= self.max_tasks_per_worker
+        over_rss = self.max_worker_rss is not None and w.rss > self.max_worker_rss
+        if not (over_tasks or over_rss):
+            return
+        logger.debug(
+            "Recycling worker pid=%s after %d files (rss=%.1f MB)", w.proc.pid, w.tasks_done, w.rss / 2**20
+        )
+        w.stop()
+        self._workers.remove(w)
+        self._spawn()
+        self.recycled += 1
+
+    def _replace(self, w: _Worker, *, kill: bool) -> None:
+        if kill:
+            w.kill()
+        else:
+            w.conn.close()
+            w.proc.join()
+        self._workers.remove(w)
+        self._spawn()
+
+    def run(
+        self, paths: Iterable[str], tipo: str | None = None, options: Dict[str, Any] | None = None
+    ) -> Iterator[BatchResult]:
+        """Yield one `BatchResult` per path, in input order."""
+        options = options or {}
+        queue: Deque[Tuple[int, str]] = deque(enumerate(str(p) for p in paths))
+        total = len(queue)
+        while len(self._workers) < min(self.size, total):
+            self._spawn()
+
+        done: Dict[int, BatchResult] = {}
+        next_index = 0
+        while next_index < total:
+            for w in self._workers:
+                if w.task is None and queue:
+                    w.assign(*queue.popleft(), tipo, options)
+
+            busy = [w for w in self._workers if w.task is not None]
+            wait_for = None
+            if self.timeout is not None and busy:
+                now = time.perf_counter()
+                wait_for = max(0.0, min(w.started + self.timeout - now for w in busy))
+            ready = wait([w.conn for w in busy], timeout=wait_for) if busy else []
+
+            for w in busy:
+                if w.conn in ready:
+                    self._receive(w, done)
+            if self.timeout is not None:
+                now = time.perf_counter()
+                for w in [w for w in self._workers if w.task is not None and now - w.started > self.timeout]:
+                    index, path = w.task
+                    logger.error(
+                        "Timeout after %.1fs parsing %s (stage=%s); killing worker", self.timeout, path, w.stage
+                    )
+                    done[index] = BatchResult(
+                        path,
+                        code="PARSE_TIMEOUT",
+                        stage=w.stage,
+                        message="Parsing exceeded the per-file time limit; worker killed",
+                        elapsed=now - w.started,
+                        context={"timeout_s": self.timeout},
+                    )
+                    self._replace(w, kill=True)
+
+            while next_index in done:
+                yield _counted(done.pop(next_index))
+                next_index += 1
+
+    def _receive(self, w: _Worker, done: Dict[int, BatchResult]) -> None:
+        index, path = w.task  # type: ignore[misc]
+        try:
+            while w.conn.poll():
+                kind, _, payload = w.conn.recv()
+                if kind == "stage":
+                    w.stage = payload
+                    continue
+                if kind == "metrics":
+                    metrics.REGISTRY.merge(payload)
+                    continue
+                if kind == "trace":
+                    tracing.TRACER.merge(payload)
+                    continue
+                w.task = None
+                w.tasks_done += 1
+                if kind == "done":
+                    done[index] = payload
+                    w.rss = payload.worker_rss or 0
+                    self._maybe_recycle(w)
+                else:
+                    stage, message, tb, w.rss = payload
+                    self._maybe_recycle(w)
+                    raise ParseFailed(path, stage, message, tb)
+                return
+        except (EOFError, OSError):
+            logger.error("Worker died while parsing %s (stage=%s)", path, w.stage)
+            done[index] = BatchResult(
+                path,
+                code="WORKER_DIED",
+                stage=w.stage,
+                message="Worker process exited unexpectedly",
+                elapsed=time.perf_counter() - w.started,
+                context={"exitcode": w.proc.exitcode},
+            )
+            w.task = None
+            self._replace(w, kill=False)
+
+    def close(self) -> None:
+        for w in self._workers:
+            if w.task is None:
+                w.stop()
+            else:
+                w.kill()
+        self._workers.clear()
+
+    def __enter__(self) -> "SupervisedPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def run_batch(
+    paths: Iterable[str | Path],
+    tipo: str | None = None,
+    *,
+    workers: int = 1,
+    timeout: float | None = None,
+    max_pages: int | None = None,
+    cache=None,
+    keep_going: bool = False,
+    max_tasks_per_worker: int | None = None,
+    max_worker_rss_mb: float | None = None,
+    extract_only: bool = False,
+    warning_samples: int | None = DEFAULT_WARNING_SAMPLES,
+) -> Iterator[BatchResult]:
+    """Parse `paths` and yield a `BatchResult` per file, in input order.
+
+    With `extract_only`, results carry the extracted `pages` instead of a parser (parsing is skipped).
+    `warning_samples` is passed to `parse_pages` (None keeps one warning row per occurrence).
+    `.txt` paths are read as pre-extracted page text (pages separated by form feeds) instead of PDFs.
+
+    With a single worker, no `timeout` and no recycling limits, files are parsed in-process. Otherwise
+    they go through a `SupervisedPool`, which enforces the wall-time limit per file and recycles workers.
+    Files over `max_pages` or over the time limit come back as failed results (`result.warning()` gives
+    the warnings.csv row). Other exceptions propagate (as `ParseFailed` when raised inside a worker)
+    unless `keep_going` is set, in which case they become `PARSE_FAILED` results carrying the stage and
+    traceback.
+    """
+    options = {
+        "max_pages": max_pages,
+        "cache": cache,
+        "keep_going": keep_going,
+        "extract_only": extract_only,
+        "warning_samples": warning_samples,
+    }
+    if workers <= 1 and timeout is None and max_tasks_per_worker is None and max_worker_rss_mb is None:
+        for path in paths:
+            yield _counted(_run_one(str(path), tipo, options))
+        return
+    with SupervisedPool(
+        workers,
+        timeout=timeout,
+        max_tasks_per_worker=max_tasks_per_worker,
+        max_worker_rss_mb=max_worker_rss_mb,
+    ) as pool:
+        yield from pool.run(paths, tipo, options)
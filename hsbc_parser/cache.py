@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+from functools import lru_cache
+from pathlib import Path
+from typing import List
+
+from .export import parser_to_dict
+from .logging_utils import get_logger
+from .parsers.types import DEFAULT_WARNING_SAMPLES, Statement, Transaction
+
+_PARSERS_DIR = Path(__file__).parent / "parsers"
+
+# Modules whose source affects the output of every parser.
+_SHARED_SOURCES = ("utils.py", "base.py", "types.py")
+
+logger = get_logger("cache")
+
+
+@lru_cache(maxsize=None)
+def parser_fingerprint(kind: str) -> str:
+    """Hash of the source of the `kind` parser module plus the shared helpers it relies on.
+
+    Editing `parsers/visa.py` changes only the Visa fingerprint; editing `parsers/utils.py` changes all.
+    """
+    h = hashlib.sha256()
+    for name in (f"{kind}.py", *_SHARED_SOURCES):
+        h.update(name.encode())
+        h.update((_PARSERS_DIR / name).read_bytes())
+    return h.hexdigest()[:16]
+
+
+def pages_hash(pages: List[str]) -> str:
+    h = hashlib.sha256()
+    for page in pages:
+        h.update(page.encode("utf-8"))
+        h.update(b"\f")
+    return h.hexdigest()
+
+
+class ParseCache:
+    """On-disk cache of parse results keyed by (parser type, parser fingerprint, page-text hash).
+
+    Layout: `<cache_dir>/<kind>/<fingerprint>/<text sha256>.json`. The file name is not part of the key;
+    `archivo` is rewritten on load so renamed copies of a statement also hit.
+    """
+
+    def __init__(self, cache_dir: str | Path):
+        self.cache_dir = Path(cache_dir)
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, kind: str, pages: List[str], warning_samples: int | None) -> Path:
+        # Warning rows depend on the sampling, so other settings get their own entries.
+        suffix = "" if warning_samples == DEFAULT_WARNING_SAMPLES else f".w{warning_samples or 'all'}"
+        return self.cache_dir / kind / parser_fingerprint(kind) / f"{pages_hash(pages)}{suffix}.json"
+
+    def get(
+        self,
+        kind: str,
+        pages: List[str],
+        pdf_path: str,
+        *,
+        logger: logging.Logger | None = None,
+        warning_samples: int | None = DEFAULT_WARNING_SAMPLES,
+    ):
+        from .dispatcher import PARSERS
+
+        path = self._entry_path(kind, pages, warning_samples)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            self.misses += 1
+            return None
+
+        p = PARSERS[kind](pdf_path, pages=pages, logger=logger, warning_samples=warning_samples)
+        archivo = (pdf_path or "").split("/")[-1]
+        p.statement = Statement(**{**data["statement"], "archivo": archivo})
+        p.transactions = [Transaction(**{**t, "archivo": archivo}) for t in data["transactions"]]
+        rows = [{**w, "archivo": archivo} for w in data["warnings"]]
+        if warning_samples is None:
+            p.warnings = rows
+        else:
+            p.warnings.load(rows)
+        self.hits += 1
+        return p
+
+    def put(
+        self, kind: str, pages: List[str], parser, *, warning_samples: int | None = DEFAULT_WARNING_SAMPLES
+    ) -> None:
+        if parser.statement is None:
+            return
+        path = self._entry_path(kind, pages, warning_samples)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(parser_to_dict(parser), ensure_ascii=False, default=str), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def prune(self) -> int:
+        """Delete entries written by older parser versions; returns the number of directories removed."""
+        removed = 0
+        if not self.cache_dir.exists():
+            return removed
+        for kind_dir in self.cache_dir.iterdir():
+            if not kind_dir.is_dir() or not (_PARSERS_DIR / f"{kind_dir.name}.py").exists():
+                continue
+            current = parser_fingerprint(kind_dir.name)
+            for fp_dir in kind_dir.iterdir():
+                if fp_dir.is_dir() and fp_dir.name != current:
+                    shutil.rmtree(fp_dir, ignore_errors=True)
+                    removed += 1
+        logger.debug("Pruned %d stale cache directories under %s", removed, self.cache_dir)
+        return removed
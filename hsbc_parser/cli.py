@@ -1,23 +1,586 @@
 from __future__ import annotations
 
 import argparse
+import shutil
+import sys
+import traceback
 from pathlib import Path
-from typing import Iterable, List
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
 
-from .dispatcher import parse_pdf
-from .export import export_csv
-from .logging_utils import configure_logging
+from . import metrics, tracing
+from .batch import run_batch
+from .export import export_csv, export_jsonl, export_partitioned
+from .io_utils import file_sha256
+from .logging_utils import configure_logging, get_logger
+from .parsers.types import DEFAULT_WARNING_SAMPLES, warn
 
 
-def _collect_pdfs(path: Path) -> List[Path]:
+def _collect_pdfs(path: Path, pattern: str = "*.pdf") -> List[Path]:
     if path.is_dir():
-        return sorted(p for p in path.glob("*.pdf"))
+        return sorted(p for p in path.glob(pattern))
     return [path]
 
 
+def _parse_records(
+    records: Iterable[Dict[str, Any]],
+    tipo: str | None,
+    *,
+    cache: Any,
+    keep_going: bool,
+    extra_warnings: List[Dict[str, Any]],
+    warning_samples: int | None = DEFAULT_WARNING_SAMPLES,
+) -> List[Any]:
+    """Parse `{"archivo", "pages"}` records in-process (no PDF access); failures become PARSE_FAILED with keep_going."""
+    from .dispatcher import parse_pages
+
+    logger = get_logger("cli")
+    parsers = []
+    for rec in records:
+        try:
+            parsers.append(
+                parse_pages(rec["archivo"], rec["pages"], tipo, cache=cache, warning_samples=warning_samples)
+            )
+        except Exception as e:
+            if not keep_going:
+                raise
+            logger.exception("Failed to parse %s", rec["archivo"])
+            warn(
+                extra_warnings,
+                rec["archivo"],
+                "ERROR",
+                "PARSE_FAILED",
+                f"{type(e).__name__}: {e}",
+                {"stage": "parse", "traceback": traceback.format_exc()},
+            )
+    return parsers
+
+
+def _indexed(parsers: Iterable[Any], index_path: str | None) -> Iterator[Any]:
+    """Run each statement through the transaction index (if any) right before it is exported."""
+    if not index_path:
+        yield from parsers
+        return
+    from .txindex import TransactionIndex
+
+    with TransactionIndex(index_path) as index:
+        for p in parsers:
+            index.update(p)
+            yield p
+
+
+def _chain_checked(parsers: Iterable[Any], extra_warnings: List[Dict[str, Any]]) -> Iterator[Any]:
+    """Pass statements through; once all were seen, add the corpus-level balance-chain warnings."""
+    from .validate import check_balance_chain
+
+    statements = []
+    for p in parsers:
+        statements.append(p.statement)
+        yield p
+    extra_warnings.extend(check_balance_chain(statements))
+
+
+def _export(parsers: Iterable[Any], args: argparse.Namespace, extra_warnings: List[Dict[str, Any]]) -> None:
+    compress = None if args.compress == "none" else args.compress
+    parsers = _indexed(parsers, args.tx_index)
+    if args.check_chain:
+        parsers = _chain_checked(parsers, extra_warnings)
+    if args.layout == "partitioned":
+        export_partitioned(parsers, args.out, extra_warnings=extra_warnings, fmt=args.format, compress=compress)
+    elif args.format == "jsonl":
+        export_jsonl(parsers, args.out, extra_warnings=extra_warnings, compress=compress)
+    else:
+        export_csv(parsers, args.out, extra_warnings=extra_warnings, compress=compress, frames=False)
+    if args.metrics_file:
+        metrics.REGISTRY.write(args.metrics_file)
+    if args.trace:
+        tracing.TRACER.write(args.trace)
+    if args.memory_profile:
+        from .memprof import PROFILER
+
+        PROFILER.stop()
+        PROFILER.write(args.memory_profile)
+        print(PROFILER.format_report(), file=sys.stderr)
+
+
+def _add_output_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--layout",
+        choices=["flat", "partitioned"],
+        default="flat",
+        help="flat: one file per table (default); partitioned: origen=X/mes=YYYY-MM/ folders plus _partitions.json",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["csv", "jsonl"],
+        default="csv",
+        help="Output file format (default: csv); jsonl writes one JSON object per row",
+    )
+    parser.add_argument(
+        "--compress",
+        choices=["none", "gz", "xz"],
+        default="none",
+        help="Stream outputs through gzip (.gz) or xz (.xz) (default: none)",
+    )
+    parser.add_argument(
+        "--tx-index",
+        default=None,
+        metavar="PATH",
+        help="Persistent transaction index (SQLite) used across runs to flag DUPLICATE_TRANSACTION and "
+        "INSTALLMENT_CONTINUATION rows",
+    )
+    parser.add_argument(
+        "--check-chain",
+        action="store_true",
+        help="Check that consecutive statements of each origen chain up (report STATEMENT_GAP, STATEMENT_OVERLAP "
+        "and BALANCE_CHAIN_MISMATCH)",
+    )
+    parser.add_argument(
+        "--full-warnings",
+        action="store_true",
+        help=f"One warnings row per occurrence (default: repeats of a code in a file are folded into one row with "
+        f"a count and the first {DEFAULT_WARNING_SAMPLES} contexts as samples)",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        default=None,
+        metavar="PATH",
+        help="Write Prometheus text-format metrics (statements, pages, lines, transactions, warnings by code, "
+        "stage latencies) to PATH at the end of the run (with --watch: after every batch)",
+    )
+    parser.add_argument(
+        "--trace",
+        default=None,
+        metavar="PATH",
+        help="Record open/extract/detect/parse/reconcile/export spans from every worker and write them to PATH as "
+        "a Chrome trace-event JSON file (open in ui.perfetto.dev or chrome://tracing)",
+    )
+    parser.add_argument(
+        "--memory-profile",
+        default=None,
+        metavar="PATH",
+        help="Profile memory with tracemalloc: peak and retained allocations per stage (open, extract, parse, "
+        "header, reconcile, export) and their top allocation sites, printed to stderr and written to PATH as JSON. "
+        "Parses in-process, so it can't be combined with --workers > 1, --timeout or worker recycling.",
+    )
+
+
+def _start_memory_profile(args: argparse.Namespace) -> None:
+    if args.memory_profile:
+        from .memprof import PROFILER
+
+        PROFILER.start()
+
+
+def _warning_samples(args: argparse.Namespace) -> int | None:
+    return None if args.full_warnings else DEFAULT_WARNING_SAMPLES
+
+
+def _dedupe_pdfs(pdfs: List[Path]) -> Tuple[List[Path], List[Tuple[Path, Path, str]]]:
+    """Drop byte-identical inputs.
+
+    Only files that share their size with another input are hashed, so distinct files cost one stat().
+    The canonical copy is the one with the shortest name (so `X.pdf` wins over `X (1).pdf`).
+    Returns (unique PDFs, [(duplicate, canonical, sha256), ...]).
+    """
+    by_size: Dict[int, List[Path]] = {}
+    for pdf in pdfs:
+        by_size.setdefault(pdf.stat().st_size, []).append(pdf)
+
+    canonical_of: Dict[Path, Tuple[Path, str]] = {}
+    for group in by_size.values():
+        if len(group) < 2:
+            continue
+        by_digest: Dict[str, List[Path]] = {}
+        for pdf in group:
+            by_digest.setdefault(file_sha256(pdf), []).append(pdf)
+        for digest, same in by_digest.items():
+            canonical = min(same, key=lambda p: (len(p.name), p.name))
+            for pdf in same:
+                if pdf != canonical:
+                    canonical_of[pdf] = (canonical, digest)
+
+    unique = [p for p in pdfs if p not in canonical_of]
+    duplicates = [(p, *canonical_of[p]) for p in pdfs if p in canonical_of]
+    return unique, duplicates
+
+
+def _quarantine(pdf: Path, dest_dir: Path, *, move: bool) -> Path:
+    """Copy (or move) a failing PDF into `dest_dir` without overwriting earlier quarantined files."""
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    dest = dest_dir / pdf.name
+    n = 1
+    while dest.exists():
+        dest = dest_dir / f"{pdf.stem}.{n}{pdf.suffix}"
+        n += 1
+    if move:
+        shutil.move(str(pdf), dest)
+    else:
+        shutil.copy2(pdf, dest)
+    return dest
+
+
+def _add_logging_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--log-file",
+        default="data/logs/hsbc_parser.log",
+        help="Log file path (default: data/logs/hsbc_parser.log)",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        help="Log level (default: INFO)",
+    )
+    parser.add_argument(
+        "--log-mode",
+        choices=["direct", "queued"],
+        default="direct",
+        help="direct: every process writes its own log lines (default); queued: workers hand records to one "
+        "listener thread that formats them and writes the log file in batches, tagged with the process",
+    )
+
+
+def _tipo_arg(value: str) -> str | None:
+    return None if value == "auto" else ("cuenta" if value == "account" else value)
+
+
+def _main_extract(argv: List[str]) -> None:
+    from .artifacts import page_record, write_artifact
+
+    parser = argparse.ArgumentParser(
+        prog="hsbc-parser extract",
+        description="Extract page text from PDFs into a compressed JSON-lines artifact (see 'hsbc-parser parse').",
+    )
+    parser.add_argument("input", help="A folder containing PDFs or a single PDF")
+    parser.add_argument(
+        "--out",
+        default="data/extracted/pages.jsonl.gz",
+        help="Artifact path; .gz / .xz select compression (default: data/extracted/pages.jsonl.gz)",
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (default: 1)")
+    parser.add_argument("--timeout", type=float, default=None, help="Per-file wall-time limit in seconds")
+    parser.add_argument("--max-pages", type=int, default=None, help="Skip PDFs with more pages than this")
+    parser.add_argument(
+        "--keep-going",
+        action="store_true",
+        help="Record failing PDFs in the artifact (reported by 'parse') instead of aborting.",
+    )
+    _add_logging_args(parser)
+    args = parser.parse_args(argv)
+
+    configure_logging(log_file=args.log_file, level=args.log_level, queued=args.log_mode == "queued")
+
+    pdfs = _collect_pdfs(Path(args.input))
+
+    def records():
+        for result in run_batch(
+            pdfs,
+            workers=args.workers,
+            timeout=args.timeout,
+            max_pages=args.max_pages,
+            keep_going=args.keep_going,
+            extract_only=True,
+        ):
+            if result.ok:
+                yield page_record(result.path, result.pages)
+            else:
+                yield {"archivo": Path(result.path).name, "source": result.path, "error": result.warning()}
+
+    n = write_artifact(records(), args.out)
+    print(f"OK: extracted {n} PDFs into: {args.out}")
+
+
+def _main_parse(argv: List[str]) -> None:
+    from .artifacts import read_artifact
+
+    parser = argparse.ArgumentParser(
+        prog="hsbc-parser parse",
+        description="Parse page-text artifacts written by 'hsbc-parser extract' and export CSV (no PDF access).",
+    )
+    parser.add_argument("artifacts", nargs="+", help="Artifact files (*.jsonl, *.jsonl.gz, *.jsonl.xz)")
+    parser.add_argument(
+        "--out",
+        default="data/output",
+        help="Output folder for CSV files (recommended to keep out of git).",
+    )
+    parser.add_argument(
+        "--tipo",
+        "--type",
+        choices=["auto", "mastercard", "visa", "cuenta", "account"],
+        default="auto",
+        help="Force parser type (default: auto)",
+    )
+    parser.add_argument("--cache-dir", default=None, help="Parse-result cache folder (see the main command)")
+    parser.add_argument(
+        "--keep-going",
+        action="store_true",
+        help="Don't abort on a failing statement: report it in warnings.csv (PARSE_FAILED) and export the rest.",
+    )
+    _add_output_args(parser)
+    _add_logging_args(parser)
+    args = parser.parse_args(argv)
+
+    configure_logging(log_file=args.log_file, level=args.log_level, queued=args.log_mode == "queued")
+    metrics.enable(bool(args.metrics_file))
+    tracing.enable(bool(args.trace))
+    _start_memory_profile(args)
+    tipo = _tipo_arg(args.tipo)
+
+    cache = None
+    if args.cache_dir:
+        from .cache import ParseCache
+
+        cache = ParseCache(args.cache_dir)
+
+    extra_warnings: List[Dict[str, Any]] = []
+
+    def records():
+        for artifact in args.artifacts:
+            for rec in read_artifact(artifact):
+                if "error" in rec:
+                    extra_warnings.append(rec["error"])
+                    continue
+                yield rec
+
+    parsers = _parse_records(
+        records(),
+        tipo,
+        cache=cache,
+        keep_going=args.keep_going,
+        extra_warnings=extra_warnings,
+        warning_samples=_warning_samples(args),
+    )
+
+    parsers.sort(key=lambda p: p.statement.archivo)
+    _export(parsers, args, extra_warnings)
+    print(f"OK: parsed {len(parsers)} statements. CSVs in: {args.out}")
+
+
+def _main_merge(argv: List[str]) -> None:
+    from .shards import merge_outputs
+
+    parser = argparse.ArgumentParser(
+        prog="hsbc-parser merge",
+        description="Merge per-shard outputs (statements/transactions/warnings CSVs) into one folder.",
+    )
+    parser.add_argument(
+        "shards",
+        nargs="+",
+        help="Shard output folders, or a parent folder containing shard-* folders",
+    )
+    parser.add_argument("--out", required=True, help="Output folder for the merged CSV files")
+    _add_logging_args(parser)
+    args = parser.parse_args(argv)
+
+    configure_logging(log_file=args.log_file, level=args.log_level, queued=args.log_mode == "queued")
+    counts = merge_outputs(args.shards, args.out)
+    print(f"OK: merged {counts['statements']} statements, {counts['transactions']} transactions. Files in: {args.out}")
+
+
+def _main_query(argv: List[str]) -> None:
+    import csv
+    import time
+
+    from .query import GROUP_COLUMNS, TransactionStore
+
+    parser = argparse.ArgumentParser(
+        prog="hsbc-parser query",
+        description="Filter exported transactions (date range, amount range, equality) and print CSV to stdout.",
+    )
+    parser.add_argument("source", help="Output folder (flat, sharded or partitioned) or a transactions file")
+    parser.add_argument("--desde", default=None, help="First fecha (YYYY-MM-DD, inclusive)")
+    parser.add_argument("--hasta", default=None, help="Last fecha (YYYY-MM-DD, inclusive)")
+    parser.add_argument("--min", type=float, default=None, dest="importe_min", help="Minimum importe")
+    parser.add_argument("--max", type=float, default=None, dest="importe_max", help="Maximum importe")
+    parser.add_argument("--persona", default=None)
+    parser.add_argument("--origen", default=None, choices=["mastercard", "visa", "cuenta"])
+    parser.add_argument("--moneda", default=None, help="ARS or USD")
+    parser.add_argument("--operation-id", default=None)
+    parser.add_argument(
+        "--group-by",
+        default=None,
+        help=f"Comma-separated keys to sum importe by, from: {', '.join(GROUP_COLUMNS)}",
+    )
+    parser.add_argument("--limit", type=int, default=None, help="Print at most this many rows")
+    _add_logging_args(parser)
+    args = parser.parse_args(argv)
+
+    configure_logging(log_file=args.log_file, level=args.log_level, queued=args.log_mode == "queued")
+    store = TransactionStore.load(args.source)
+    equals = {
+        k: v
+        for k, v in (("persona", args.persona), ("origen", args.origen), ("moneda", args.moneda), ("operation_id", args.operation_id))
+        if v is not None
+    }
+    t0 = time.perf_counter()
+    selection = store.query(
+        fecha_desde=args.desde,
+        fecha_hasta=args.hasta,
+        importe_min=args.importe_min,
+        importe_max=args.importe_max,
+        **equals,
+    )
+    writer = csv.writer(sys.stdout, lineterminator="\n")
+    if args.group_by:
+        keys = [k.strip() for k in args.group_by.split(",") if k.strip()]
+        try:
+            groups = selection.group_sum(*keys)
+        except ValueError as e:
+            parser.error(str(e))
+        writer.writerow([*keys, "importe", "rows"])
+        for key, (total, count) in groups.items():
+            writer.writerow([*key, total, count])
+    else:
+        from .export import TRANSACTION_COLUMNS
+
+        writer.writerow(TRANSACTION_COLUMNS)
+        for rec in selection.records(limit=args.limit):
+            writer.writerow([rec[c] for c in TRANSACTION_COLUMNS])
+    get_logger("cli").info(
+        "query matched %d of %d rows in %.3f ms", len(selection), len(store), (time.perf_counter() - t0) * 1000
+    )
+
+
+def _main_regress(argv: List[str]) -> None:
+    from .regress import DEFAULT_MAX_SLOWDOWN, DEFAULT_MIN_DELTA_S, run_regression
+
+    parser = argparse.ArgumentParser(
+        prog="hsbc-parser regress",
+        description="Parse a reference corpus (*.txt page text and/or PDFs) and diff against stored goldens "
+        "and timing baselines; exits 1 on any difference or throughput regression.",
+    )
+    parser.add_argument("corpus", help="Folder with the reference inputs")
+    parser.add_argument("--goldens", default=None, help="Golden folder (default: <corpus>/golden)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (default: 1)")
+    parser.add_argument("--timeout", type=float, default=None, help="Per-file wall-time limit in seconds")
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help="Rewrite the goldens and timings.json from this run instead of comparing.",
+    )
+    parser.add_argument("--no-timing", action="store_true", help="Don't compare (or record) timing baselines.")
+    parser.add_argument(
+        "--max-slowdown",
+        type=float,
+        default=DEFAULT_MAX_SLOWDOWN,
+        help=f"Fail when total parse time exceeds the baselines by more than this ratio (default: {DEFAULT_MAX_SLOWDOWN})",
+    )
+    parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=DEFAULT_MIN_DELTA_S,
+        help=f"Ignore slowdowns smaller than this many seconds (default: {DEFAULT_MIN_DELTA_S})",
+    )
+    parser.add_argument("--report", default=None, help="Also write the full report as JSON to this path")
+    _add_logging_args(parser)
+    args = parser.parse_args(argv)
+
+    configure_logging(log_file=args.log_file, level=args.log_level, queued=args.log_mode == "queued")
+    goldens = args.goldens or str(Path(args.corpus) / "golden")
+    report = run_regression(
+        args.corpus,
+        goldens,
+        workers=args.workers,
+        update=args.update,
+        timing=not args.no_timing,
+        max_slowdown=args.max_slowdown,
+        min_delta_s=args.min_delta,
+        timeout=args.timeout,
+    )
+    if args.report:
+        import json
+
+        Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.report).write_text(json.dumps(report.to_dict(), ensure_ascii=False, indent=1), encoding="utf-8")
+
+    if args.update:
+        print(f"OK: recorded {len(report.files)} goldens in: {goldens}")
+        return
+    for f in report.files:
+        timing = ""
+        if f.elapsed is not None:
+            timing = f" {f.elapsed * 1000:9.1f} ms"
+            if f.baseline:
+                timing += f" ({f.slowdown:+.0%} vs baseline)"
+        print(f"{f.status.upper():<8} {f.archivo}{timing}")
+        for line in f.diffs:
+            print(f"    {line}")
+    if report.slowdown is not None:
+        print(
+            f"Parse time {report.elapsed:.3f} s vs baseline {report.baseline:.3f} s ({report.slowdown:+.1%}, "
+            f"limit {report.max_slowdown:+.0%}); slow files: {', '.join(f.archivo for f in report.slow_files()) or 'none'}"
+        )
+    if not report.ok:
+        print(f"FAIL: {len(report.mismatches)} files differ from goldens" + ("; throughput regressed" if report.too_slow else ""))
+        sys.exit(1)
+    print(f"OK: {len(report.files)} files match goldens in: {goldens}")
+
+
+def _main_diff(argv: List[str]) -> None:
+    import time
+
+    from .diff import DIFF_COLUMNS, diff_runs, transaction_files
+
+    parser = argparse.ArgumentParser(
+        prog="hsbc-parser diff",
+        description="Compare the transactions of two output runs: rows added, removed and changed, per file.",
+    )
+    parser.add_argument("old", help="Baseline output folder (flat, sharded or partitioned) or transactions file")
+    parser.add_argument("new", help="Output folder or transactions file to compare with the baseline")
+    parser.add_argument(
+        "--out",
+        default=None,
+        metavar="PATH",
+        help=f"Write every difference as CSV ({', '.join(DIFF_COLUMNS[:2])}, ..., changed_columns, before); "
+        ".gz / .xz compress",
+    )
+    parser.add_argument("--all-files", action="store_true", help="List unchanged files in the summary too")
+    parser.add_argument("--exit-code", action="store_true", help="Exit with 1 when the runs differ (like git diff)")
+    _add_logging_args(parser)
+    args = parser.parse_args(argv)
+
+    configure_logging(log_file=args.log_file, level=args.log_level, queued=args.log_mode == "queued")
+    for source in (args.old, args.new):
+        if not transaction_files(source):
+            parser.error(f"no transactions files under {source}")
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+
+    t0 = time.perf_counter()
+    result = diff_runs(args.old, args.new, out=args.out)
+    elapsed = time.perf_counter() - t0
+
+    print(f"{'archivo':<48} {'added':>7} {'removed':>7} {'changed':>7} {'same':>7}")
+    for archivo, f in sorted(result.files.items()):
+        if f.differs or args.all_files:
+            print(f"{archivo:<48} {f.added:>7} {f.removed:>7} {f.changed:>7} {f.unchanged:>7}")
+    total = result.total()
+    print(f"{'TOTAL':<48} {total.added:>7} {total.removed:>7} {total.changed:>7} {total.unchanged:>7}")
+    if result.columns:
+        print("changed columns: " + ", ".join(f"{c}={n}" for c, n in sorted(result.columns.items(), key=lambda kv: -kv[1])))
+    get_logger("cli").info("diff of %d files (%s) in %.3f s", len(result.files), result.mode, elapsed)
+    if args.exit_code and result.differs:
+        sys.exit(1)
+
+
+_SUBCOMMANDS = {
+    "extract": _main_extract,
+    "parse": _main_parse,
+    "merge": _main_merge,
+    "query": _main_query,
+    "regress": _main_regress,
+    "diff": _main_diff,
+}
+
+
 def main(argv: Iterable[str] | None = None) -> None:
+    argv = list(argv) if argv is not None else sys.argv[1:]
+    if argv and argv[0] in _SUBCOMMANDS:
+        _SUBCOMMANDS[argv[0]](argv[1:])
+        return
+
     parser = argparse.ArgumentParser(
-        description="Parse HSBC PDFs (Mastercard / Visa / Savings account) and export CSV."
+        description="Parse HSBC PDFs (Mastercard / Visa / Savings account) and export CSV.",
+        epilog="Other commands: " + ", ".join(f"hsbc-parser {name} --help" for name in _SUBCOMMANDS),
     )
     parser.add_argument("input", help="A folder containing PDFs or a single PDF")
     parser.add_argument(
@@ -32,30 +595,215 @@ def main(argv: Iterable[str] | None = None) -> None:
         default="auto",
         help="Force parser type (default: auto)",
     )
+    _add_logging_args(parser)
     parser.add_argument(
-        "--log-file",
-        default="data/logs/hsbc_parser.log",
-        help="Log file path (default: data/logs/hsbc_parser.log)",
+        "--text",
+        action="store_true",
+        help="Input is pre-extracted page text (*.txt, pages separated by form feeds) instead of PDFs; "
+        "skips pdfplumber entirely.",
     )
+    _add_output_args(parser)
     parser.add_argument(
-        "--log-level",
-        default="INFO",
-        help="Log level (default: INFO)",
+        "--watch",
+        action="store_true",
+        help="Keep running: poll the input folder and parse new PDFs as they land (appends to the CSVs).",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=2.0,
+        help="Polling interval in seconds for --watch (default: 2.0)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (default: 1 for a batch, 2 for --watch)",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        help="Per-file wall-time limit in seconds; slower files are killed and reported as PARSE_TIMEOUT.",
+    )
+    parser.add_argument(
+        "--max-pages",
+        type=int,
+        default=None,
+        help="Skip PDFs with more pages than this (reported as PAGE_LIMIT_EXCEEDED).",
+    )
+    parser.add_argument(
+        "--recycle-after",
+        type=int,
+        default=None,
+        help="Restart each worker process after this many files (bounds pdfminer memory growth).",
+    )
+    parser.add_argument(
+        "--max-worker-rss-mb",
+        type=float,
+        default=None,
+        help="Restart a worker once its resident memory exceeds this many MB.",
+    )
+    parser.add_argument(
+        "--keep-going",
+        action="store_true",
+        help="Don't abort on a failing PDF: report it in warnings.csv (PARSE_FAILED) and export the rest.",
+    )
+    parser.add_argument(
+        "--quarantine",
+        default=None,
+        help="Copy PDFs that failed (error, timeout, page limit) into this folder.",
+    )
+    parser.add_argument(
+        "--quarantine-move",
+        action="store_true",
+        help="Move failing PDFs into --quarantine instead of copying them.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Reuse parse results for unchanged statement text + parser code (e.g. data/cache).",
+    )
+    parser.add_argument(
+        "--keep-duplicates",
+        action="store_true",
+        help="Parse byte-identical PDFs every time (default: parse once, report the rest in warnings.csv).",
     )
-    args = parser.parse_args(list(argv) if argv is not None else None)
+    parser.add_argument(
+        "--shard",
+        default=None,
+        metavar="I/N",
+        help="Only parse the inputs assigned to shard I of N (1-based); outputs go to <out>/shard-I-of-N.",
+    )
+    parser.add_argument(
+        "--shard-by",
+        choices=["name", "content"],
+        default="name",
+        help="Assign inputs to shards by a stable hash of the file name (default) or of its content.",
+    )
+    args = parser.parse_args(argv)
+
+    configure_logging(log_file=args.log_file, level=args.log_level, queued=args.log_mode == "queued")
+    metrics.enable(bool(args.metrics_file))
+    tracing.enable(bool(args.trace))
+    if args.memory_profile and (
+        args.watch
+        or (args.workers or 1) > 1
+        or args.timeout is not None
+        or args.recycle_after is not None
+        or args.max_worker_rss_mb is not None
+    ):
+        parser.error("--memory-profile parses in-process: drop --watch, --workers > 1, --timeout and worker recycling")
+    _start_memory_profile(args)
+
+    shard = None
+    if args.shard:
+        from .shards import parse_shard_spec, shard_dir_name
 
-    configure_logging(log_file=args.log_file, level=args.log_level)
+        try:
+            shard = parse_shard_spec(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+        args.out = str(Path(args.out) / shard_dir_name(*shard))
 
     in_path = Path(args.input)
-    pdfs = _collect_pdfs(in_path)
+    tipo = _tipo_arg(args.tipo)
 
-    parsers = []
-    for pdf in pdfs:
-        tipo = None if args.tipo == "auto" else ("cuenta" if args.tipo == "account" else args.tipo)
-        parsers.append(parse_pdf(str(pdf), tipo))
+    cache = None
+    if args.cache_dir:
+        from .cache import ParseCache
+
+        cache = ParseCache(args.cache_dir)
+        cache.prune()
+
+    if args.watch:
+        if args.text or args.layout != "flat" or args.format != "csv" or args.compress != "none":
+            parser.error("--watch only supports PDF input and flat, uncompressed CSV output")
+        if args.trace:
+            parser.error("--trace is not supported with --watch (the trace would grow without bound)")
+        if not in_path.is_dir():
+            parser.error("--watch requires a folder as input")
+        from .txindex import TransactionIndex
+        from .watch import watch
+
+        tx_index = TransactionIndex(args.tx_index) if args.tx_index else None
+        count = watch(
+            in_path,
+            args.out,
+            tipo=tipo,
+            interval=args.interval,
+            workers=args.workers or 2,
+            cache=cache,
+            timeout=args.timeout,
+            max_pages=args.max_pages,
+            max_tasks_per_worker=args.recycle_after,
+            max_worker_rss_mb=args.max_worker_rss_mb,
+            tx_index=tx_index,
+            check_chain=args.check_chain,
+            metrics_file=args.metrics_file,
+            warning_samples=_warning_samples(args),
+        )
+        if tx_index is not None:
+            tx_index.close()
+        print(f"OK: processed {count} PDFs. CSVs in: {args.out}")
+        return
+
+    pdfs = _collect_pdfs(in_path, "*.txt" if args.text else "*.pdf")
+
+    extra_warnings: List[Dict[str, Any]] = []
+    if not args.keep_duplicates:
+        pdfs, duplicates = _dedupe_pdfs(pdfs)
+        logger = get_logger("cli")
+        for dup, canonical, digest in duplicates:
+            warn(
+                extra_warnings,
+                dup.name,
+                "INFO",
+                "DUPLICATE_INPUT",
+                "Input PDF is byte-identical to another input; skipped (rows are under the canonical file)",
+                {"canonical": canonical.name, "sha256": digest},
+                logger=logger,
+            )
+
+    if shard is not None:
+        from .shards import shard_of
+
+        index, count = shard
+
+        def key(p: Path) -> str:
+            return file_sha256(p) if args.shard_by == "content" else p.name
+
+        pdfs = [p for p in pdfs if shard_of(key(p), count) == index]
+        # Each duplicate is reported by the shard that parses its canonical file.
+        names = {p.name for p in pdfs}
+        extra_warnings = [w for w in extra_warnings if w["context"]["canonical"] in names]
+
+    def parsed():
+        # Generator, so the partitioned layout can stream each statement to disk as soon as it is parsed.
+        # `.txt` inputs (--text) go through the same pool, limits and quarantine as PDFs.
+        for result in run_batch(
+            pdfs,
+            tipo,
+            workers=args.workers or 1,
+            timeout=args.timeout,
+            max_pages=args.max_pages,
+            cache=cache,
+            keep_going=args.keep_going,
+            max_tasks_per_worker=args.recycle_after,
+            max_worker_rss_mb=args.max_worker_rss_mb,
+            warning_samples=_warning_samples(args),
+        ):
+            if result.ok:
+                yield result.parser
+                continue
+            failure = result.warning()
+            if args.quarantine:
+                dest = _quarantine(Path(result.path), Path(args.quarantine), move=args.quarantine_move)
+                failure["context"]["quarantined_to"] = str(dest)
+            extra_warnings.append(failure)
 
-    export_csv(parsers, args.out)
-    print(f"OK: processed {len(pdfs)} PDFs. CSVs in: {args.out}")
+    _export(parsed(), args, extra_warnings)
+    print(f"OK: processed {len(pdfs)} {'text files' if args.text else 'PDFs'}. CSVs in: {args.out}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import csv
+import itertools
+import json
+import tempfile
+from dataclasses import dataclass, field
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .export import TRANSACTION_COLUMNS
+from .io_utils import open_text
+from .logging_utils import get_logger
+from .parsers.utils import normalize_description
+from .shards import shard_of, transaction_files
+
+logger = get_logger("diff")
+
+KEY_COLUMNS = ("archivo", "fecha", "operation_id", "importe", "descripcion")
+DIFF_COLUMNS = ["change", *TRANSACTION_COLUMNS, "changed_columns", "before"]
+DEFAULT_PARTITIONS = 64
+_NUMERIC_COLUMNS = ("importe", "installment_number", "installment_total")
+
+Row = Dict[str, str]
+Key = Tuple[str, ...]
+
+
+def _cell(column: str, value) -> str:
+    # CSV cells are strings and JSON lines are typed: compare both as text, numbers in one canonical form.
+    if value is None:
+        return ""
+    if column in _NUMERIC_COLUMNS and value != "":
+        try:
+            return repr(float(value))
+        except (TypeError, ValueError):
+            pass
+    return str(value)
+
+
+def _csv_rows(f) -> Iterator[Row]:
+    reader = csv.reader(f)
+    header = next(reader, [])
+    if header == TRANSACTION_COLUMNS:
+        rows: Iterator[Row] = (dict(zip(TRANSACTION_COLUMNS, cells)) for cells in reader)
+    else:
+        positions = [(c, header.index(c)) for c in TRANSACTION_COLUMNS if c in header]
+        missing = {c: "" for c in TRANSACTION_COLUMNS if c not in header}
+        rows = ({**missing, **{c: cells[i] for c, i in positions if i < len(cells)}} for cells in reader)
+    for row in rows:
+        for c in _NUMERIC_COLUMNS:
+            row[c] = _cell(c, row.get(c, ""))
+        yield row
+
+
+def iter_transactions(paths: Iterable[Path]) -> Iterator[Row]:
+    """Stream transaction rows of exported CSV / JSON-lines files (optionally .gz / .xz) as text cells."""
+    for path in paths:
+        with open_text(path, "r") as f:
+            if ".jsonl" not in path.suffixes:
+                yield from _csv_rows(f)
+                continue
+            for line in f:
+                if line.strip():
+                    rec = json.loads(line)
+                    yield {c: _cell(c, rec.get(c)) for c in TRANSACTION_COLUMNS}
+
+
+def row_key(row: Row) -> Key:
+    """Join key: (archivo, fecha, operation_id, importe, normalized descripcion)."""
+    return (row["archivo"], row["fecha"], row["operation_id"], row["importe"], normalize_description(row["descripcion"]))
+
+
+@dataclass
+class FileDiff:
+    added: int = 0
+    removed: int = 0
+    changed: int = 0
+    unchanged: int = 0
+
+    @property
+    def differs(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+@dataclass
+class RunDiff:
+    files: Dict[str, FileDiff] = field(default_factory=dict)
+    columns: Dict[str, int] = field(default_factory=dict)  # changed rows per column
+    mode: str = "merge"  # "merge" (both runs sorted by archivo) or "partitioned" (spilled to hash partitions)
+
+    def total(self) -> FileDiff:
+        t = FileDiff()
+        for f in self.files.values():
+            t.added += f.added
+            t.removed += f.removed
+            t.changed += f.changed
+            t.unchanged += f.unchanged
+        return t
+
+    @property
+    def differs(self) -> bool:
+        return any(f.differs for f in self.files.values())
+
+
+class _Unsorted(Exception):
+    pass
+
+
+class _Joiner:
+    def __init__(self, result: RunDiff, writer):
+        self.result = result
+        self.writer = writer
+
+    def _emit(self, change: str, row: Row, changed: List[str] = (), before: Optional[Row] = None) -> None:
+        if self.writer is not None:
+            old = json.dumps({c: before[c] for c in changed}, ensure_ascii=False) if before else ""
+            self.writer.writerow([change, *(row[c] for c in TRANSACTION_COLUMNS), ",".join(changed), old])
+
+    def join(self, archivo: str, old_rows: List[Row], new_rows: List[Row]) -> None:
+        """Hash-join one archivo's rows on `row_key`; repeated keys pair up in order, identical rows first."""
+        stats = self.result.files.setdefault(archivo, FileDiff())
+        index: Dict[Key, List[Row]] = {}
+        for row in old_rows:
+            index.setdefault(row_key(row), []).append(row)
+        for row in new_rows:
+            key = row_key(row)
+            bucket = index.get(key)
+            if not bucket:
+                stats.added += 1
+                self._emit("added", row)
+                continue
+            old = bucket.pop(next((i for i, o in enumerate(bucket) if o == row), 0))
+            if not bucket:
+                del index[key]
+            changed = [c for c in TRANSACTION_COLUMNS if old[c] != row[c]]
+            if not changed:
+                stats.unchanged += 1
+                continue
+            stats.changed += 1
+            for c in changed:
+                self.result.columns[c] = self.result.columns.get(c, 0) + 1
+            self._emit("changed", row, changed, old)
+        for bucket in index.values():
+            for row in bucket:
+                stats.removed += 1
+                self._emit("removed", row)
+
+
+def _groups(rows: Iterator[Row]) -> Iterator[Tuple[str, List[Row]]]:
+    last = None
+    for archivo, group in itertools.groupby(rows, key=itemgetter("archivo")):
+        if last is not None and archivo <= last:
+            raise _Unsorted(archivo)
+        last = archivo
+        yield archivo, list(group)
+
+
+def _merge_join(old: List[Path], new: List[Path], joiner: _Joiner) -> None:
+    # Both runs sorted by archivo (what a flat export or `hsbc-parser merge` writes): one file group in memory.
+    olds, news = _groups(iter_transactions(old)), _groups(iter_transactions(new))
+    o, n = next(olds, None), next(news, None)
+    while o is not None or n is not None:
+        if n is None or (o is not None and o[0] < n[0]):
+            joiner.join(o[0], o[1], [])
+            o = next(olds, None)
+        elif o is None or n[0] < o[0]:
+            joiner.join(n[0], [], n[1])
+            n = next(news, None)
+        else:
+            joiner.join(o[0], o[1], n[1])
+            o, n = next(olds, None), next(news, None)
+
+
+def _spill(paths: List[Path], tmp: Path, side: str, partitions: int) -> None:
+    files = [open(tmp / f"{side}-{i}.csv", "w", encoding="utf-8", newline="") for i in range(partitions)]
+    writers = [csv.writer(f) for f in files]
+    archivo, writer = None, None
+    try:
+        for row in iter_transactions(paths):
+            if row["archivo"] != archivo:  # rows of one file are (nearly always) contiguous: hash once per file
+                archivo = row["archivo"]
+                writer = writers[shard_of(archivo, partitions) - 1]
+            writer.writerow([row[c] for c in TRANSACTION_COLUMNS])
+    finally:
+        for f in files:
+            f.close()
+
+
+def _load_partition(path: Path) -> Dict[str, List[Row]]:
+    by_file: Dict[str, List[Row]] = {}
+    with path.open(encoding="utf-8", newline="") as f:
+        for cells in csv.reader(f):
+            row = dict(zip(TRANSACTION_COLUMNS, cells))
+            by_file.setdefault(row["archivo"], []).append(row)
+    return by_file
+
+
+def _partitioned_join(old: List[Path], new: List[Path], joiner: _Joiner, partitions: int) -> None:
+    # Unsorted or multi-file runs: spill both to hash partitions by archivo, then join one partition at a time.
+    with tempfile.TemporaryDirectory(prefix="hsbc-diff-") as tmp:
+        tmp_path = Path(tmp)
+        _spill(old, tmp_path, "old", partitions)
+        _spill(new, tmp_path, "new", partitions)
+        for i in range(partitions):
+            olds = _load_partition(tmp_path / f"old-{i}.csv")
+            news = _load_partition(tmp_path / f"new-{i}.csv")
+            for archivo in sorted(olds.keys() | news.keys()):
+                joiner.join(archivo, olds.get(archivo, []), news.get(archivo, []))
+
+
+def diff_runs(
+    old: str | Path,
+    new: str | Path,
+    *,
+    out: str | Path | None = None,
+    partitions: int = DEFAULT_PARTITIONS,
+) -> RunDiff:
+    """Compare the transactions of two output runs (folders in any layout, or transactions files).
+
+    Rows are joined per `archivo` on `row_key`; a matched row whose other columns differ is "changed",
+    unmatched rows are "added" (only in `new`) or "removed" (only in `old`). When each run is a single file
+    sorted by archivo, both are streamed in one merge pass holding one statement's rows at a time; otherwise
+    (or on meeting an out-of-order archivo) both runs are spilled to `partitions` hash partitions on disk and
+    joined a partition at a time. With `out`, every difference is written there as CSV (`DIFF_COLUMNS`: the
+    new row, or the old one when removed, plus the changed columns and their old values as JSON).
+    """
+    old_paths, new_paths = transaction_files(old), transaction_files(new)
+    sorted_inputs = len(old_paths) <= 1 and len(new_paths) <= 1
+    while True:
+        result = RunDiff(mode="merge" if sorted_inputs else "partitioned")
+        f = open_text(out, "w") if out is not None else None
+        try:
+            writer = None
+            if f is not None:
+                writer = csv.writer(f, lineterminator="\n")
+                writer.writerow(DIFF_COLUMNS)
+            joiner = _Joiner(result, writer)
+            if sorted_inputs:
+                _merge_join(old_paths, new_paths, joiner)
+            else:
+                _partitioned_join(old_paths, new_paths, joiner, partitions)
+            return result
+        except _Unsorted as e:
+            logger.info("Transactions are not sorted by archivo (at %s); diffing through hash partitions", e)
+            sorted_inputs = False
+        finally:
+            if f is not None:
+                f.close()
@@ -1,10 +1,20 @@
 from __future__ import annotations
-import pdfplumber
+from pathlib import Path
+from typing import List
 
 from .parsers.mastercard import HSBCMastercardParser
 from .parsers.visa import HSBCVisaParser
 from .parsers.cuenta import HSBCCajaAhorroParser
+from . import metrics, tracing
 from .logging_utils import get_logger
+from .merchants import default_rules
+from .parsers.types import DEFAULT_WARNING_SAMPLES
+
+PARSERS = {
+    "mastercard": HSBCMastercardParser,
+    "visa": HSBCVisaParser,
+    "cuenta": HSBCCajaAhorroParser,
+}
 
 def detect_type(text: str) -> str:
     up = text.upper()
@@ -17,28 +27,126 @@ def detect_type(text: str) -> str:
     # fallback
     return "mastercard"
 
-def parse_pdf(pdf_path: str, tipo: str | None = None):
-    """Parse an HSBC PDF.
+class PageLimitExceeded(ValueError):
+    """The PDF has more pages than the configured `max_pages`."""
+
+    def __init__(self, pdf_path: str, pages: int, limit: int):
+        super().__init__(f"{pdf_path} has {pages} pages (limit: {limit})")
+        self.pages = pages
+        self.limit = limit
+
+def extract_pages(pdf_path: str, *, max_pages: int | None = None) -> List[str]:
+    """Extract the text of every page (same extraction the parsers do on their own).
+
+    Raises `PageLimitExceeded` before extracting anything when the PDF has more than `max_pages` pages.
+    """
+    import pdfplumber
+
+    with metrics.timed("extract"):
+        with tracing.span("open", archivo=Path(pdf_path).name):
+            pdf = pdfplumber.open(pdf_path)
+        with pdf:
+            if max_pages is not None and len(pdf.pages) > max_pages:
+                raise PageLimitExceeded(pdf_path, len(pdf.pages), max_pages)
+            pages = []
+            for i, page in enumerate(pdf.pages, 1):
+                with tracing.span("extract", page=i):
+                    pages.append(page.extract_text() or "")
+            return pages
+
+def _count(kind: str, pages: List[str], parser) -> None:
+    metrics.inc("hsbc_parser_pdfs_total", tipo=kind)
+    metrics.inc("hsbc_parser_pages_total", len(pages), tipo=kind)
+    metrics.inc("hsbc_parser_lines_scanned_total", sum(p.count("\n") + 1 for p in pages if p), tipo=kind)
+    metrics.inc("hsbc_parser_transactions_total", len(parser.transactions), tipo=kind)
+
+def parse_pages(
+    pdf_path: str,
+    pages: List[str],
+    tipo: str | None = None,
+    *,
+    cache=None,
+    warning_samples: int | None = DEFAULT_WARNING_SAMPLES,
+):
+    """Parse already-extracted page text; `pdf_path` is only used to name the statement (`archivo`).
+
+    Repeats of a warning code are folded into one row keeping `warning_samples` contexts (None: every row).
+    """
+    if tipo:
+        kind = tipo
+    else:
+        with tracing.span("detect"):
+            kind = detect_type("\n".join(pages))
+
+    logger = get_logger("parse").getChild(kind)
+    if cache is not None:
+        cached = cache.get(kind, pages, pdf_path, logger=logger, warning_samples=warning_samples)
+        if cached is not None:
+            # Re-applied on hits so rule edits take effect without invalidating the cache.
+            default_rules().apply(cached)
+            if metrics.enabled():
+                _count(kind, pages, cached)
+                for w in cached.warnings:  # warn() is not re-run on a hit; folded rows stand for `count` warnings
+                    metrics.inc(
+                        "hsbc_parser_warnings_total", w.get("count") or 1, code=w["code"], level=str(w["level"]).upper()
+                    )
+            return cached
+
+    with metrics.timed("parse"), tracing.span("parse", archivo=Path(pdf_path).name, tipo=kind):
+        p = PARSERS.get(kind, HSBCMastercardParser)(
+            pdf_path, pages=pages, logger=logger, warning_samples=warning_samples
+        )
+        p.parse()
+        default_rules().apply(p)
+    if metrics.enabled():
+        _count(kind, pages, p)
+
+    if cache is not None:
+        cache.put(kind, pages, p, warning_samples=warning_samples)
+    return p
+
+def parse_text(
+    pages: List[str] | str,
+    kind: str | None = None,
+    name: str = "statement.txt",
+    *,
+    warning_samples: int | None = DEFAULT_WARNING_SAMPLES,
+):
+    """Parse pre-extracted statement text, without touching pdfplumber or any PDF.
 
     Args:
-        pdf_path: path to the PDF
-        tipo: 'visa' | 'mastercard' | 'cuenta' | None (auto)
+        pages: page texts (a single string is treated as one page)
+        kind: 'visa' | 'mastercard' | 'cuenta' | None (auto)
+        name: reported as `archivo` in the statement, transactions and warnings
+        warning_samples: contexts kept per repeated warning code (None: one warning row per occurrence)
 
     Returns:
         parser: parser instance used (has .statement, .transactions, .warnings)
     """
-    with pdfplumber.open(pdf_path) as pdf:
-        text = "\n".join((p.extract_text() or "") for p in pdf.pages)
+    if isinstance(pages, str):
+        pages = [pages]
+    return parse_pages(name, list(pages), kind, warning_samples=warning_samples)
 
-    kind = tipo or detect_type(text)
+def parse_pdf(
+    pdf_path: str,
+    tipo: str | None = None,
+    *,
+    cache=None,
+    max_pages: int | None = None,
+    warning_samples: int | None = DEFAULT_WARNING_SAMPLES,
+):
+    """Parse an HSBC PDF.
 
-    logger = get_logger("parse").getChild(kind)
-    if kind == "cuenta":
-        p = HSBCCajaAhorroParser(pdf_path, logger=logger)
-    elif kind == "visa":
-        p = HSBCVisaParser(pdf_path, logger=logger)
-    else:
-        p = HSBCMastercardParser(pdf_path, logger=logger)
+    Args:
+        pdf_path: path to the PDF
+        tipo: 'visa' | 'mastercard' | 'cuenta' | None (auto)
+        cache: optional `ParseCache`; on a hit the parse stage is skipped entirely
+        max_pages: refuse PDFs with more pages (raises `PageLimitExceeded`)
+        warning_samples: contexts kept per repeated warning code (None: one warning row per occurrence)
 
-    p.parse()
-    return p
+    Returns:
+        parser: parser instance used (has .statement, .transactions, .warnings)
+    """
+    # The text is extracted once and handed to the parser instead of letting it re-open the PDF.
+    pages = extract_pages(pdf_path, max_pages=max_pages)
+    return parse_pages(pdf_path, pages, tipo, cache=cache, warning_samples=warning_samples)
@@ -1,37 +1,311 @@
 from __future__ import annotations
 import csv
 import json
-from dataclasses import asdict
+from collections import OrderedDict
+from dataclasses import asdict, fields
 from pathlib import Path
+from typing import Any, Dict, List, Tuple
 import pandas as pd
 
-def export_csv(parsers, out_dir: str | Path):
+from . import tracing
+from .io_utils import open_text
+from .parsers.types import Statement, Transaction
+
+STATEMENT_COLUMNS = [f.name for f in fields(Statement)]
+TRANSACTION_COLUMNS = [f.name for f in fields(Transaction)]
+WARNING_COLUMNS = ["archivo", "level", "code", "message", "context", "count"]
+TABLES = ("statements", "transactions", "warnings")
+FORMATS = ("csv", "jsonl")
+COMPRESSIONS = (None, "gz", "xz")
+
+
+def table_path(out_dir: str | Path, table: str, fmt: str = "csv", compress: str | None = None) -> Path:
+    """`<out_dir>/<table>.<fmt>[.gz|.xz]`; the extension is what selects the compressor (see `open_text`)."""
+    if fmt not in FORMATS:
+        raise ValueError(f"unsupported format {fmt!r}; expected one of {FORMATS}")
+    if compress not in COMPRESSIONS:
+        raise ValueError(f"unsupported compression {compress!r}; expected gz, xz or None")
+    return Path(out_dir) / (f"{table}.{fmt}" + (f".{compress}" if compress else ""))
+
+
+def _warning_record(w: dict) -> dict:
+    # Records built outside warn() (batch failures, ...) have no count; each stands for one occurrence.
+    return w if w.get("count") else {**w, "count": 1}
+
+
+def _warning_row(w: dict) -> dict:
+    w = _warning_record(w)
+    # ensure json-serializable context
+    if isinstance(w.get("context"), (dict, list)):
+        w = dict(w)
+        w["context"] = json.dumps(w["context"], ensure_ascii=False)
+    return w
+
+
+def parser_to_dict(p) -> dict:
+    """JSON-friendly view of a parsed statement: {"statement": {...}, "transactions": [...], "warnings": [...]}."""
+    return {
+        "statement": asdict(p.statement) if p.statement is not None else None,
+        "transactions": [asdict(t) for t in p.transactions],
+        "warnings": [dict(w) for w in p.warnings],
+    }
+
+
+def _json_line(row: dict) -> str:
+    return json.dumps(row, ensure_ascii=False, default=str, separators=(",", ":")) + "\n"
+
+
+def _open_csv(path: Path, columns: List[str], append: bool):
+    """Open `path` for CSV rows (header only when the file is new); returns (file, writer)."""
+    header = not (append and path.exists())
+    f = open_text(path, "a" if append else "w")
+    writer = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC, lineterminator="\n")
+    if header:
+        writer.writerow(columns)
+    return f, writer
+
+
+_CATEGORY_COLUMNS = {
+    "statements": ("archivo", "banco", "origen"),
+    "transactions": ("archivo", "origen", "moneda", "persona"),
+    "warnings": ("archivo", "level", "code"),
+}
+_DATE_COLUMNS = {"statements": ("fecha_desde", "fecha_hasta"), "transactions": ("fecha",)}
+
+
+def compact_frame(table: str, rows: List[list]) -> pd.DataFrame:
+    """DataFrame for `table` (rows in column order) with compact dtypes.
+
+    Low-cardinality text columns are categoricals, installments are nullable Int16 and ISO dates are
+    datetime64 (anything that isn't YYYY-MM-DD becomes NaT).
+    """
+    columns = {"statements": STATEMENT_COLUMNS, "transactions": TRANSACTION_COLUMNS, "warnings": WARNING_COLUMNS}
+    df = pd.DataFrame(rows, columns=columns[table])
+    for c in _CATEGORY_COLUMNS[table]:
+        df[c] = df[c].astype("category")
+    for c in _DATE_COLUMNS.get(table, ()):
+        df[c] = pd.to_datetime(df[c], format="%Y-%m-%d", errors="coerce")
+    if table == "transactions":
+        df["installment_number"] = df["installment_number"].astype("Int16")
+        df["installment_total"] = df["installment_total"].astype("Int16")
+    return df
+
+
+def _archivo_of(p) -> str:
+    return p.statement.archivo or ""
+
+
+def export_csv(
+    parsers,
+    out_dir: str | Path,
+    *,
+    append: bool = False,
+    extra_warnings=None,
+    compress: str | None = None,
+    frames: bool = True,
+):
+    """Write statements.csv / transactions.csv / warnings.csv.
+
+    All three tables are written in `archivo` order, whatever order `parsers` comes in (a stable sort: each
+    statement's transactions and warnings keep their order), so every run of the same inputs gives the same
+    files. The parsers are collected before writing; their rows are not copied. With `frames=True` (default)
+    the three tables are also returned as DataFrames with compact dtypes (see `compact_frame`); with
+    `frames=False` no rows are kept and only the row counts are returned, e.g. `{"statements": 3, ...}`.
+
+    With `compress="gz"` or `"xz"` the files are written through a gzip/xz stream as `<table>.csv.gz` / `.xz`.
+
+    With `append=True`, rows are appended to existing files (the header is only written when a
+    file is created), which lets long-running modes add results incrementally.
+
+    `extra_warnings` are batch-level warning records (same keys as `BaseParser.warnings`) that don't
+    belong to a parser, e.g. skipped inputs; they are written after the parsers' warnings.
+    """
     out = Path(out_dir)
     out.mkdir(parents=True, exist_ok=True)
 
-    statements = []
-    transactions = []
+    kept: Dict[str, List[list]] = {t: [] for t in TABLES}
+    counts = dict.fromkeys(TABLES, 0)
     warnings = []
 
-    for p in parsers:
-        statements.append(asdict(p.statement))
-        transactions.extend(asdict(t) for t in p.transactions)
-        for w in p.warnings:
-            # ensure json-serializable context
-            if isinstance(w.get("context"), (dict, list)):
-                w = dict(w)
-                w["context"] = json.dumps(w["context"], ensure_ascii=False)
-            warnings.append(w)
-
-    df_s = pd.DataFrame(statements)
-    df_t = pd.DataFrame(transactions)
-    df_w = pd.DataFrame(
-        warnings,
-        columns=["archivo", "level", "code", "message", "context"],
-    )
-
-    df_s.to_csv(out / "statements.csv", index=False, quoting=csv.QUOTE_NONNUMERIC)
-    df_t.to_csv(out / "transactions.csv", index=False, quoting=csv.QUOTE_NONNUMERIC)
-    df_w.to_csv(out / "warnings.csv", index=False, quoting=csv.QUOTE_NONNUMERIC)
-
-    return df_s, df_t, df_w
+    parsers = sorted(parsers, key=_archivo_of)
+    f_s, w_s = _open_csv(table_path(out, "statements", "csv", compress), STATEMENT_COLUMNS, append)
+    try:
+        f_t, w_t = _open_csv(table_path(out, "transactions", "csv", compress), TRANSACTION_COLUMNS, append)
+        try:
+            for p in parsers:
+                with tracing.span("export", archivo=p.statement.archivo):
+                    # getattr rows, not asdict(): asdict deep-copies every field and dominates export time.
+                    row = [getattr(p.statement, c) for c in STATEMENT_COLUMNS]
+                    w_s.writerow(row)
+                    counts["statements"] += 1
+                    if frames:
+                        kept["statements"].append(row)
+                    for t in p.transactions:
+                        row = [getattr(t, c) for c in TRANSACTION_COLUMNS]
+                        w_t.writerow(row)
+                        counts["transactions"] += 1
+                        if frames:
+                            kept["transactions"].append(row)
+                    warnings.extend(_warning_row(w) for w in p.warnings)
+        finally:
+            f_t.close()
+    finally:
+        f_s.close()
+
+    warnings.extend(_warning_row(w) for w in extra_warnings or ())
+    # Keep warnings grouped by file (stable, so each file's warnings stay in emission order).
+    warnings.sort(key=lambda w: w.get("archivo") or "")
+    with tracing.span("export", table="warnings"):
+        f_w, w_w = _open_csv(table_path(out, "warnings", "csv", compress), WARNING_COLUMNS, append)
+        with f_w:
+            w_w.writerows([w.get(c) for c in WARNING_COLUMNS] for w in warnings)
+    counts["warnings"] = len(warnings)
+
+    if not frames:
+        return counts
+    kept["warnings"] = [[w.get(c) for c in WARNING_COLUMNS] for w in warnings]
+    return tuple(compact_frame(t, kept[t]) for t in TABLES)
+
+
+def export_jsonl(
+    parsers, out_dir: str | Path, *, append: bool = False, extra_warnings=None, compress: str | None = None
+) -> Dict[str, int]:
+    """Write statements / transactions / warnings as JSON lines, row by row (no DataFrames).
+
+    Same records and ordering (by `archivo`) as `export_csv`, except that warning `context` stays a JSON
+    object. Returns the number of rows written per table.
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    mode = "a" if append else "w"
+    counts = dict.fromkeys(TABLES, 0)
+    warnings = []
+    parsers = sorted(parsers, key=_archivo_of)
+
+    with open_text(table_path(out, "statements", "jsonl", compress), mode) as f_s, open_text(
+        table_path(out, "transactions", "jsonl", compress), mode
+    ) as f_t:
+        for p in parsers:
+            with tracing.span("export", archivo=p.statement.archivo):
+                f_s.write(_json_line({c: getattr(p.statement, c) for c in STATEMENT_COLUMNS}))
+                counts["statements"] += 1
+                for t in p.transactions:
+                    f_t.write(_json_line({c: getattr(t, c) for c in TRANSACTION_COLUMNS}))
+                    counts["transactions"] += 1
+                warnings.extend(p.warnings)
+    warnings.extend(extra_warnings or ())
+    warnings.sort(key=lambda w: w.get("archivo") or "")
+
+    with tracing.span("export", table="warnings"):
+        with open_text(table_path(out, "warnings", "jsonl", compress), mode) as f_w:
+            for w in warnings:
+                f_w.write(_json_line({c: _warning_record(w).get(c) for c in WARNING_COLUMNS}))
+    counts["warnings"] = len(warnings)
+    return counts
+
+
+PARTITION_INDEX = "_partitions.json"
+
+
+def partition_of(statement: Statement) -> Tuple[str, str]:
+    """(origen, mes) partition for a statement; `mes` is YYYY-MM of `fecha_hasta` (or 'unknown')."""
+    fecha = statement.fecha_hasta or ""
+    mes = fecha[:7] if len(fecha) >= 7 else "unknown"
+    return statement.origen or "unknown", mes
+
+
+class _PartitionWriter:
+    """Streams rows into `<out>/origen=X/mes=YYYY-MM/<name>` files, keeping at most `max_open` handles open."""
+
+    def __init__(self, out: Path, fmt: str = "csv", max_open: int = 64):
+        self.out = out
+        self.fmt = fmt
+        self.max_open = max_open
+        self._handles: "OrderedDict[Path, Any]" = OrderedDict()
+        self._created: set = set()
+
+    def writerow(self, rel: Path, columns: List[str], row: dict) -> None:
+        path = self.out / rel
+        handle = self._handles.get(path)
+        if handle is None:
+            if len(self._handles) >= self.max_open:
+                _, (f, _) = self._handles.popitem(last=False)
+                f.close()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            new = path not in self._created
+            if self.fmt == "csv":
+                handle = _open_csv(path, columns, append=not new)
+            else:
+                handle = (open_text(path, "w" if new else "a"), None)
+            self._created.add(path)
+            self._handles[path] = handle
+        else:
+            self._handles.move_to_end(path)
+        f, writer = handle
+        if writer is None:
+            f.write(_json_line(row))
+        else:
+            writer.writerow([row.get(c) for c in columns])
+
+    def close(self) -> None:
+        for f, _ in self._handles.values():
+            f.close()
+        self._handles.clear()
+
+
+def export_partitioned(
+    parsers, out_dir: str | Path, *, extra_warnings=None, fmt: str = "csv", compress: str | None = None
+) -> List[Dict[str, Any]]:
+    """Write a Hive-style layout: `origen=<origen>/mes=<YYYY-MM>/{statements,transactions}.csv`.
+
+    Rows are streamed to their partition as each parser is consumed (`parsers` may be a generator), so memory
+    stays flat regardless of corpus size. `warnings.csv` stays unpartitioned at the top level. A small
+    `_partitions.json` index lists every partition with its row counts and transaction date range, so readers
+    can prune partitions without opening them. Returns the index entries.
+
+    `fmt` ("csv" | "jsonl") and `compress` (None | "gz" | "xz") select the file format as in `export_jsonl`.
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+
+    index: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    warnings = []
+    writer = _PartitionWriter(out, fmt)
+    s_name = table_path("", "statements", fmt, compress)
+    t_name = table_path("", "transactions", fmt, compress)
+    try:
+        for p in parsers:
+            origen, mes = partition_of(p.statement)
+            rel = Path(f"origen={origen}") / f"mes={mes}"
+            entry = index.setdefault(
+                (origen, mes),
+                {"origen": origen, "mes": mes, "path": rel.as_posix(), "statements": 0, "transactions": 0,
+                 "fecha_min": None, "fecha_max": None},
+            )
+            writer.writerow(rel / s_name, STATEMENT_COLUMNS, asdict(p.statement))
+            entry["statements"] += 1
+            for t in p.transactions:
+                writer.writerow(rel / t_name, TRANSACTION_COLUMNS, asdict(t))
+                entry["transactions"] += 1
+                if t.fecha:
+                    if entry["fecha_min"] is None or t.fecha < entry["fecha_min"]:
+                        entry["fecha_min"] = t.fecha
+                    if entry["fecha_max"] is None or t.fecha > entry["fecha_max"]:
+                        entry["fecha_max"] = t.fecha
+            warnings.extend(p.warnings)
+    finally:
+        writer.close()
+
+    warnings.extend(extra_warnings or ())
+    warnings.sort(key=lambda w: w.get("archivo") or "")
+    if fmt == "csv":
+        f, w_writer = _open_csv(table_path(out, "warnings", fmt, compress), WARNING_COLUMNS, append=False)
+        with f:
+            w_writer.writerows([_warning_row(w).get(c) for c in WARNING_COLUMNS] for w in warnings)
+    else:
+        with open_text(table_path(out, "warnings", fmt, compress), "w") as f:
+            f.writelines(_json_line({c: _warning_record(w).get(c) for c in WARNING_COLUMNS}) for w in warnings)
+
+    entries = [index[k] for k in sorted(index)]
+    (out / PARTITION_INDEX).write_text(json.dumps({"partitions": entries}, indent=2) + "\n", encoding="utf-8")
+    return entries
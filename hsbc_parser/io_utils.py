@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import lzma
+from pathlib import Path
+from typing import IO, List
+
+
+def open_text(path: str | Path, mode: str = "r") -> IO[str]:
+    """Open a UTF-8 text file, transparently (de)compressing `.gz` (gzip) and `.xz` (lzma) paths."""
+    path = Path(path)
+    if mode not in ("r", "w", "a"):
+        raise ValueError(f"unsupported mode {mode!r}")
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8", newline="")
+    if path.suffix == ".xz":
+        return lzma.open(path, mode + "t", encoding="utf-8", newline="")
+    return path.open(mode, encoding="utf-8", newline="")
+
+
+def file_sha256(path: str | Path) -> str:
+    h = hashlib.sha256()
+    with Path(path).open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def read_text_pages(path: str | Path) -> List[str]:
+    """Page texts of a pre-extracted statement; pages are separated by form feeds (\\f)."""
+    return Path(path).read_text(encoding="utf-8").split("\f")
@@ -1,11 +1,202 @@
 from __future__ import annotations
 
+import atexit
 import logging
+import multiprocessing
+import os
+import queue as queue_mod
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
+_CONFIG: Dict[str, Any] | None = None
+_LISTENER: Optional["_FlushingListener"] = None
 
-def configure_logging(*, log_file: str | Path = "data/logs/hsbc_parser.log", level: str = "INFO") -> logging.Logger:
+FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+# Queued mode merges records from every worker into one file, so each line says which process wrote it.
+QUEUED_FORMAT = "%(asctime)s %(levelname)s %(processName)s[%(process)d] %(name)s: %(message)s"
+
+_PLAIN = (str, int, float, bool, type(None), dict, list, tuple)
+
+
+class _OnceFormatter(logging.Formatter):
+    """Formatter shared by the console and file handlers that formats each record only once."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = record.__dict__.get("_hsbc_line")
+        if line is None:
+            line = record._hsbc_line = super().format(record)  # type: ignore[attr-defined]
+        return line
+
+
+class BufferedFileHandler(logging.FileHandler):
+    """FileHandler that writes formatted lines in batches of `capacity` (ERROR and above are written at once)."""
+
+    def __init__(self, filename: str | Path, *, capacity: int = 256, encoding: str = "utf-8"):
+        super().__init__(filename, encoding=encoding)
+        self.capacity = capacity
+        self._buffer: List[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._buffer.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+            return
+        if len(self._buffer) >= self.capacity or record.levelno >= logging.ERROR:
+            self.flush()
+
+    def flush(self) -> None:
+        self.acquire()
+        try:
+            if self._buffer and self.stream:
+                self.stream.write(self.terminator.join(self._buffer) + self.terminator)
+                self._buffer.clear()
+            super().flush()
+        finally:
+            self.release()
+
+    def close(self) -> None:
+        self.flush()
+        super().close()
+
+
+class _LazyQueueHandler(QueueHandler):
+    """Enqueue records in batches, without formatting them: the listener does the `%` formatting.
+
+    Records are sent `capacity` at a time (one pickle and one pipe write per batch instead of per record), and
+    immediately at ERROR or on `flush()`. A timer thread sends a partial batch once its oldest record is
+    `flush_interval` seconds old, so a lone record is never stuck waiting for the next one. Only arguments that
+    pickle safely (plain containers and scalars) are kept lazy; anything else, and tracebacks, are rendered here
+    so the record can cross the process boundary.
+    """
+
+    def __init__(self, q, *, capacity: int = 64, flush_interval: float = 1.0):
+        super().__init__(q)
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self._batch: List[logging.LogRecord] = []
+        self._pending_since = 0.0
+        self._wakeup = threading.Condition(self.lock)
+        self._timer_pid: Optional[int] = None
+        self._closed = False
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info or record.stack_info or not all(isinstance(a, _PLAIN) for a in record.args or ()):
+            return super().prepare(record)
+        return record
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._batch.append(self.prepare(record))
+        except Exception:
+            self.handleError(record)
+            return
+        if len(self._batch) >= self.capacity or record.levelno >= logging.ERROR:
+            self.flush()
+        elif len(self._batch) == 1:
+            with self._wakeup:  # the handler's own (reentrant) lock, already held when called from handle()
+                self._pending_since = time.monotonic()
+                self._ensure_timer()
+                self._wakeup.notify()
+
+    def _ensure_timer(self) -> None:
+        # Per process: a handler inherited through fork has no timer thread in the child.
+        if self._timer_pid != os.getpid():
+            self._timer_pid = os.getpid()
+            threading.Thread(target=self._run_timer, name="hsbc-log-flush", daemon=True).start()
+
+    def _run_timer(self) -> None:
+        with self._wakeup:
+            while not self._closed:
+                if not self._batch:
+                    self._wakeup.wait()
+                    continue
+                delay = self._pending_since + self.flush_interval - time.monotonic()
+                if delay > 0:
+                    self._wakeup.wait(delay)
+                    continue
+                self._send()
+
+    def _send(self) -> None:
+        if self._batch:
+            batch, self._batch = self._batch, []
+            self.enqueue(batch)
+
+    def flush(self) -> None:
+        self.acquire()
+        try:
+            self._send()
+        finally:
+            self.release()
+
+    def close(self) -> None:
+        self.acquire()
+        try:
+            self._send()
+            self._closed = True
+            self._wakeup.notify_all()
+        finally:
+            self.release()
+        super().close()
+
+
+class _FlushingListener(QueueListener):
+    """QueueListener that flushes its handlers at least every `flush_interval` seconds, busy or idle."""
+
+    def __init__(self, q, *handlers: logging.Handler, flush_interval: float = 1.0):
+        super().__init__(q, *handlers, respect_handler_level=True)
+        self.flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+
+    def handle(self, record) -> None:
+        for r in record if isinstance(record, list) else (record,):
+            super().handle(r)
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self._flush_handlers()
+
+    def _flush_handlers(self) -> None:
+        for h in self.handlers:
+            h.flush()
+        self._last_flush = time.monotonic()
+
+    def dequeue(self, block: bool):
+        while True:
+            try:
+                return self.queue.get(block, self.flush_interval if block else None)
+            except queue_mod.Empty:
+                if not block:
+                    raise
+                self._flush_handlers()
+
+
+def _queue_context():
+    # Same start method as the batch pool, so the queue can be handed to its workers.
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context()
+
+
+def configure_logging(
+    *,
+    log_file: str | Path = "data/logs/hsbc_parser.log",
+    level: str = "INFO",
+    queued: bool = False,
+    queue=None,
+    flush_interval: float = 1.0,
+) -> logging.Logger:
+    """Log to the console and `log_file`.
+
+    With `queued=True`, loggers only put records on a multiprocessing queue and a single listener thread formats
+    them and writes the file in batches. Every record reaches the file within about twice `flush_interval`
+    seconds (the sending handler and the listener each hold a batch for at most that long), at once at ERROR,
+    and at exit.
+    Worker processes replay `logging_config()`, which then carries the queue, so they share that listener and
+    their lines are tagged with the process name and pid instead of interleaving in the file.
+    """
+    global _CONFIG, _LISTENER
     logger = logging.getLogger("hsbc_parser")
     logger.setLevel(getattr(logging, level.upper(), logging.INFO))
 
@@ -13,7 +204,17 @@ def configure_logging(*, log_file: str | Path = "data/logs/hsbc_parser.log", lev
     if getattr(logger, "_hsbc_configured", False):
         return logger
 
-    fmt = logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if queue is not None:
+        # Worker side of queued mode: the parent's listener does the rest.
+        _CONFIG = {"log_file": str(log_file), "level": level, "queued": True, "queue": queue}
+        _CONFIG["flush_interval"] = flush_interval
+        logger.addHandler(_LazyQueueHandler(queue, flush_interval=flush_interval))
+        logger.propagate = False
+        logger._hsbc_configured = True  # type: ignore[attr-defined]
+        return logger
+
+    _CONFIG = {"log_file": str(log_file), "level": level}
+    fmt = _OnceFormatter(QUEUED_FORMAT if queued else FORMAT)
 
     stream = logging.StreamHandler()
     stream.setFormatter(fmt)
@@ -21,19 +222,49 @@ def configure_logging(*, log_file: str | Path = "data/logs/hsbc_parser.log", lev
 
     log_path = Path(log_file)
     log_path.parent.mkdir(parents=True, exist_ok=True)
-    file_handler = logging.FileHandler(log_path, encoding="utf-8")
+    file_handler = BufferedFileHandler(log_path) if queued else logging.FileHandler(log_path, encoding="utf-8")
     file_handler.setFormatter(fmt)
     file_handler.setLevel(logger.level)
 
-    logger.addHandler(stream)
-    logger.addHandler(file_handler)
+    if queued:
+        q = _queue_context().Queue()
+        _LISTENER = _FlushingListener(q, stream, file_handler, flush_interval=flush_interval)
+        _LISTENER.start()
+        atexit.register(shutdown_logging)
+        _CONFIG.update(queued=True, queue=q, flush_interval=flush_interval)
+        logger.addHandler(_LazyQueueHandler(q, flush_interval=flush_interval))
+    else:
+        logger.addHandler(stream)
+        logger.addHandler(file_handler)
     logger.propagate = False
 
     logger._hsbc_configured = True  # type: ignore[attr-defined]
-    logger.debug("Logging configured (file=%s level=%s)", str(log_path), level.upper())
+    logger.debug("Logging configured (file=%s level=%s queued=%s)", str(log_path), level.upper(), queued)
     return logger
 
 
+def flush_logging() -> None:
+    """Push buffered records out (workers call this after every file, so queued lines arrive per file)."""
+    for h in logging.getLogger("hsbc_parser").handlers:
+        h.flush()
+
+
+def shutdown_logging() -> None:
+    """Drain and stop the queued-mode listener (registered with atexit; safe to call more than once)."""
+    global _LISTENER
+    flush_logging()
+    if _LISTENER is not None:
+        listener, _LISTENER = _LISTENER, None
+        listener.stop()
+        for h in listener.handlers:
+            h.close()
+
+
+def logging_config() -> Optional[Dict[str, Any]]:
+    """Arguments of the last `configure_logging` call (worker processes replay them), or None."""
+    return dict(_CONFIG) if _CONFIG else None
+
+
 def get_logger(name: Optional[str] = None) -> logging.Logger:
     base = logging.getLogger("hsbc_parser")
     return base if not name else base.getChild(name)
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import json
+import threading
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import tracing
+
+DEFAULT_TOP_SITES = 10
+DEFAULT_SNAPSHOTS_PER_STAGE = 3
+_IGNORED = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+# Parser group of the stages that run outside any parser (file, open, extract, detect, export).
+COMMON = "common"
+
+
+@dataclass
+class StageMemory:
+    calls: int = 0
+    peak_bytes: int = 0  # highest traced memory above the stage's starting point, over all calls
+    retained_bytes: int = 0  # memory still allocated when the stage ended, summed over calls
+    max_retained_bytes: int = 0
+    snapshots: int = 0
+    sites: Dict[str, List[int]] = field(default_factory=dict)  # "file:line" -> [bytes, blocks] retained
+
+
+class _Frame:
+    __slots__ = ("key", "start", "peak", "snapshot", "overhead")
+
+    def __init__(self, key: Tuple[str, str], start: int, snapshot: Optional[tracemalloc.Snapshot], overhead: int):
+        self.key = key  # (tipo, stage)
+        self.start = start
+        self.peak = start
+        self.snapshot = snapshot
+        self.overhead = overhead  # traced size of `snapshot` itself, not charged to the enclosing stages
+
+
+class MemoryProfiler:
+    """Peak and retained tracemalloc memory per parser and stage, hooked into the `tracing.span()` boundaries.
+
+    Stats are keyed by (tipo, stage): the `parse` span's `tipo` applies to the header/reconcile spans nested
+    in it, and stages outside any parser are grouped under `COMMON`.
+    Stages nest (file > parse > header/reconcile, open/extract per page, export); each one is charged
+    the peak of traced memory above its starting point, including its children, and what is still allocated
+    when it ends. For the first `snapshots_per_stage` calls of each stage a snapshot pair is diffed to find the
+    allocation sites behind the retained memory. Only the recording thread of this process is measured, so
+    profile with a single in-process worker.
+    """
+
+    def __init__(self, *, top_sites: int = DEFAULT_TOP_SITES, snapshots_per_stage: int = DEFAULT_SNAPSHOTS_PER_STAGE):
+        self.enabled = False
+        self.top_sites = top_sites
+        self.snapshots_per_stage = snapshots_per_stage
+        self.stages: Dict[Tuple[str, str], StageMemory] = {}
+        self.peak_bytes = 0
+        self._stack: List[_Frame] = []
+        self._thread: Optional[int] = None
+        self._started_tracemalloc = False
+
+    def start(self, frames: int = 1) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            self._started_tracemalloc = True
+        self._thread = threading.get_ident()
+        self.enabled = True
+        tracing.set_stage_hook(self.stage)
+
+    def stop(self) -> None:
+        tracing.set_stage_hook(None)
+        self.enabled = False
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def reset(self) -> None:
+        self.stages.clear()
+        self._stack.clear()
+        self.peak_bytes = 0
+
+    def stage(self, name: str, args: Dict[str, Any], inner: Any) -> "_Stage":
+        return _Stage(self, name, args.get("tipo"), inner)
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(_IGNORED)
+
+    def _enter(self, name: str, tipo: Optional[str]) -> bool:
+        if threading.get_ident() != self._thread:
+            return False
+        current, peak = tracemalloc.get_traced_memory()
+        if self._stack:
+            parent = self._stack[-1]
+            parent.peak = max(parent.peak, peak)
+            tipo = tipo or parent.key[0]
+        key = (tipo or COMMON, name)
+        stats = self.stages.setdefault(key, StageMemory())
+        snapshot, overhead = None, 0
+        if stats.snapshots < self.snapshots_per_stage:
+            stats.snapshots += 1
+            snapshot = self._snapshot()
+            overhead = tracemalloc.get_traced_memory()[0] - current
+        self._stack.append(_Frame(key, current + overhead, snapshot, overhead))
+        tracemalloc.reset_peak()
+        return True
+
+    def _exit(self) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        frame = self._stack.pop()
+        frame.peak = max(frame.peak, peak)
+        self.peak_bytes = max(self.peak_bytes, frame.peak - frame.overhead)
+        if self._stack:
+            self._stack[-1].peak = max(self._stack[-1].peak, frame.peak - frame.overhead)
+        stats = self.stages[frame.key]
+        stats.calls += 1
+        stats.peak_bytes = max(stats.peak_bytes, frame.peak - frame.start)
+        retained = current - frame.start
+        stats.retained_bytes += retained
+        stats.max_retained_bytes = max(stats.max_retained_bytes, retained)
+        if frame.snapshot is not None:
+            for diff in self._snapshot().compare_to(frame.snapshot, "lineno"):
+                if diff.size_diff <= 0:
+                    continue
+                site = f"{diff.traceback[0].filename}:{diff.traceback[0].lineno}"
+                totals = stats.sites.setdefault(site, [0, 0])
+                totals[0] += diff.size_diff
+                totals[1] += diff.count_diff
+            frame.snapshot = None
+            tracemalloc.reset_peak()  # forget the snapshots' own allocations
+
+    def report(self) -> Dict[str, Any]:
+        """JSON-friendly report: overall peak plus, per parser and stage, calls, peak/retained bytes and top
+        allocation sites (`{"peak_bytes": ..., "parsers": {tipo: {stage: {...}}}}`, largest peak first)."""
+        parsers: Dict[str, Dict[str, Any]] = {}
+        for (tipo, name), s in sorted(self.stages.items(), key=lambda kv: (kv[0][0], -kv[1].peak_bytes)):
+            top = sorted(s.sites.items(), key=lambda kv: -kv[1][0])[: self.top_sites]
+            parsers.setdefault(tipo, {})[name] = {
+                "calls": s.calls,
+                "peak_bytes": s.peak_bytes,
+                "retained_bytes": s.retained_bytes,
+                "max_retained_bytes": s.max_retained_bytes,
+                "sampled_calls": s.snapshots,
+                "top_sites": [{"site": site, "bytes": b, "blocks": n} for site, (b, n) in top],
+            }
+        return {"peak_bytes": self.peak_bytes, "parsers": parsers}
+
+    def format_report(self) -> str:
+        """The report as a plain-text table (MB), largest peak first."""
+        mb = 1024 * 1024
+        r = self.report()
+        lines = [
+            f"traced peak {r['peak_bytes'] / mb:.2f} MB",
+            f"{'parser':<11} {'stage':<10} {'calls':>7} {'peak MB':>9} {'retained MB':>12} {'max ret. MB':>12}",
+        ]
+        stages = [(tipo, name, s) for tipo, group in r["parsers"].items() for name, s in group.items()]
+        for tipo, name, s in stages:
+            lines.append(
+                f"{tipo:<11} {name:<10} {s['calls']:>7} {s['peak_bytes'] / mb:>9.2f} "
+                f"{s['retained_bytes'] / mb:>12.2f} {s['max_retained_bytes'] / mb:>12.2f}"
+            )
+        for tipo, name, s in stages:
+            if s["top_sites"]:
+                lines.append(f"{tipo} {name}: top retained allocation sites (first {s['sampled_calls']} calls)")
+                lines.extend(f"  {t['bytes'] / 1024:10.1f} KiB {t['blocks']:>8} blocks  {t['site']}" for t in s["top_sites"])
+        return "\n".join(lines)
+
+    def write(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.report(), ensure_ascii=False, indent=1), encoding="utf-8")
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "tipo", "inner", "active")
+
+    def __init__(self, profiler: MemoryProfiler, name: str, tipo: Optional[str], inner: Any):
+        self.profiler = profiler
+        self.name = name
+        self.tipo = tipo
+        self.inner = inner
+
+    def __enter__(self) -> "_Stage":
+        self.active = self.profiler._enter(self.name, self.tipo)
+        self.inner.__enter__()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.inner.__exit__(*exc)
+        if self.active:
+            self.profiler._exit()
+
+
+PROFILER = MemoryProfiler()
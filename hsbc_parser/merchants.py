@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import csv
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from .logging_utils import get_logger
+from .parsers.utils import normalize_description
+
+logger = get_logger("merchants")
+
+DEFAULT_RULES = Path(__file__).parent / "data" / "merchant_rules.csv"
+RULES_ENV = "HSBC_PARSER_MERCHANT_RULES"
+
+_END = ""  # trie key holding the rule of the node (no other key is empty)
+_MEMO_SIZE = 100_000
+
+Match = Tuple[Optional[str], Optional[str]]
+
+
+class MerchantRules:
+    """Canonical merchant key and category for transaction descriptions.
+
+    Rules are `(prefix, merchant, categoria)` with `prefix` in `normalize_description` form, compiled into a
+    character trie; the longest prefix ending on a word boundary wins. Rules with an empty merchant mark payment
+    processors (`MERCPAGO`, `DLO`, ...) that are stripped before matching the rest, so `DLO*UBER RIDES` and
+    `UBER RIDES` both resolve to `UBER`. Descriptions that match no rule get their digit-free leading words as
+    merchant and no category. Results are memoized per raw description.
+    """
+
+    def __init__(self, rules: Iterable[Tuple[str, str, str]]):
+        self._trie: Dict[str, dict] = {}
+        self.size = 0
+        for prefix, merchant, categoria in rules:
+            key = normalize_description(prefix)
+            if not key:
+                continue
+            node = self._trie
+            for ch in key:
+                node = node.setdefault(ch, {})
+            node[_END] = (merchant or None, categoria or None)
+            self.size += 1
+        self._memo: Dict[str, Match] = {}
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> "MerchantRules":
+        """Load a CSV with `prefix,merchant,categoria` columns."""
+        with Path(path).open(newline="", encoding="utf-8") as f:
+            rules = [(r["prefix"], r.get("merchant") or "", r.get("categoria") or "") for r in csv.DictReader(f)]
+        logger.debug("Loaded %d merchant rules from %s", len(rules), path)
+        return cls(rules)
+
+    def _longest(self, text: str) -> Tuple[int, Optional[Match]]:
+        node, best, best_end = self._trie, None, 0
+        for i, ch in enumerate(text):
+            node = node.get(ch)
+            if node is None:
+                break
+            if _END in node and (i + 1 == len(text) or text[i + 1] == " "):
+                best, best_end = node[_END], i + 1
+        return best_end, best
+
+    def _classify(self, descripcion: str) -> Match:
+        text = normalize_description(descripcion)
+        for _ in range(3):
+            end, rule = self._longest(text)
+            if rule is None:
+                break
+            if rule[0] is not None:
+                return rule
+            text = text[end:].lstrip()  # payment processor prefix
+        words = [w for w in text.split() if not any(c.isdigit() for c in w)][:3]
+        return (" ".join(words) or None, None)
+
+    def classify(self, descripcion: Optional[str]) -> Match:
+        """(merchant, categoria) for one description; either may be None."""
+        if not descripcion:
+            return None, None
+        hit = self._memo.get(descripcion)
+        if hit is None:
+            if len(self._memo) >= _MEMO_SIZE:
+                self._memo.clear()
+            hit = self._memo[descripcion] = self._classify(descripcion)
+        return hit
+
+    def apply(self, parser) -> None:
+        """Fill `merchant` / `categoria` on every transaction of a parsed statement."""
+        for t in parser.transactions:
+            t.merchant, t.categoria = self.classify(t.descripcion)
+
+
+@lru_cache(maxsize=None)
+def _rules_for(path: str) -> MerchantRules:
+    return MerchantRules.from_file(path)
+
+
+def default_rules() -> MerchantRules:
+    """Rules from `$HSBC_PARSER_MERCHANT_RULES` if set, else the bundled `data/merchant_rules.csv` (loaded once)."""
+    return _rules_for(os.environ.get(RULES_ENV) or str(DEFAULT_RULES))
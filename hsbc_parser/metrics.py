@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+# Seconds; covers a fast text-only parse up to a slow multi-page pdfplumber extraction.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+METRICS = {
+    "hsbc_parser_pdfs_total": ("counter", "Statements parsed, by parser type"),
+    "hsbc_parser_pages_total": ("counter", "Pages parsed, by parser type"),
+    "hsbc_parser_lines_scanned_total": ("counter", "Text lines scanned by the parsers, by parser type"),
+    "hsbc_parser_transactions_total": ("counter", "Transactions emitted, by parser type"),
+    "hsbc_parser_warnings_total": ("counter", "Warnings emitted, by code and level"),
+    "hsbc_parser_stage_seconds": ("histogram", "Wall time per pipeline stage"),
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+Key = Tuple[str, LabelKey]
+
+
+class Registry:
+    """Counters and histograms in Prometheus text format, without any dependency.
+
+    Disabled by default: the module-level helpers (`inc`, `observe`, `timed`) check one attribute and return,
+    so instrumented code costs next to nothing unless a run asks for metrics. Worker processes ship their
+    values to the parent with `drain()` / `merge()`.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.enabled = False
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters: Dict[Key, float] = {}
+        self._histograms: Dict[Key, List[float]] = {}  # per-bucket counts (+Inf last), then sum, then count
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            h = self._histograms.get(key)
+            if h is None:
+                h = self._histograms[key] = [0.0] * (len(self.buckets) + 3)
+            h[bisect_left(self.buckets, value)] += 1
+            h[-2] += value
+            h[-1] += 1
+
+    def snapshot(self) -> Dict[str, Dict[Key, Any]]:
+        with self._lock:
+            return {"counters": dict(self._counters), "histograms": {k: list(v) for k, v in self._histograms.items()}}
+
+    def drain(self) -> Dict[str, Dict[Key, Any]]:
+        """Snapshot and reset (what a worker sends to its parent after each file)."""
+        with self._lock:
+            snap = {"counters": self._counters, "histograms": self._histograms}
+            self._counters, self._histograms = {}, {}
+        return snap
+
+    def merge(self, snap: Dict[str, Dict[Key, Any]]) -> None:
+        with self._lock:
+            for key, value in snap.get("counters", {}).items():
+                self._counters[key] = self._counters.get(key, 0.0) + value
+            for key, values in snap.get("histograms", {}).items():
+                h = self._histograms.setdefault(key, [0.0] * len(values))
+                for i, v in enumerate(values):
+                    h[i] += v
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self, extra: Iterable[Tuple[str, str, str, float]] = ()) -> str:
+        """Prometheus text exposition; `extra` adds (name, type, help, value) samples such as service gauges."""
+        snap = self.snapshot()
+        by_name: Dict[str, List[str]] = {}
+
+        def fmt(labels: LabelKey, more: Tuple[Tuple[str, str], ...] = ()) -> str:
+            pairs = labels + more
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+        for (name, labels), value in sorted(snap["counters"].items()):
+            by_name.setdefault(name, []).append(f"{name}{fmt(labels)} {_num(value)}")
+        for (name, labels), h in sorted(snap["histograms"].items()):
+            lines = by_name.setdefault(name, [])
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), h):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _num(bound)
+                lines.append(f"{name}_bucket{fmt(labels, (('le', le),))} {_num(cumulative)}")
+            lines.append(f"{name}_sum{fmt(labels)} {_num(h[-2])}")
+            lines.append(f"{name}_count{fmt(labels)} {_num(h[-1])}")
+
+        out: List[str] = []
+        for name in sorted(by_name):
+            kind, help_text = METRICS.get(name, ("untyped", name))
+            out += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", *by_name[name]]
+        for name, kind, help_text, value in extra:
+            out += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {_num(value)}"]
+        return "\n".join(out) + "\n"
+
+    def write(self, path: str | Path) -> None:
+        """Atomically (re)write a Prometheus textfile (e.g. for node_exporter's textfile collector)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(self.render(), encoding="utf-8")
+        os.replace(tmp, path)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _num(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+REGISTRY = Registry()
+
+
+def enable(on: bool = True) -> None:
+    REGISTRY.enabled = on
+
+
+def enabled() -> bool:
+    return REGISTRY.enabled
+
+
+def inc(name: str, value: float = 1.0, **labels: Any) -> None:
+    if REGISTRY.enabled:
+        REGISTRY.inc(name, value, **labels)
+
+
+def observe(name: str, value: float, **labels: Any) -> None:
+    if REGISTRY.enabled:
+        REGISTRY.observe(name, value, **labels)
+
+
+class _StageTimer:
+    __slots__ = ("stage", "t0")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self) -> "_StageTimer":
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        REGISTRY.observe("hsbc_parser_stage_seconds", time.perf_counter() - self.t0, stage=self.stage)
+
+
+_NULL = nullcontext()
+
+
+def timed(stage: str):
+    """Context manager feeding `hsbc_parser_stage_seconds{stage=...}`; a shared no-op when metrics are off."""
+    return _StageTimer(stage) if REGISTRY.enabled else _NULL
@@ -1,21 +1,38 @@
 from __future__ import annotations
 import logging
 from typing import List, Dict, Any, Optional
-from .types import Statement, Transaction
+from .types import DEFAULT_WARNING_SAMPLES, Statement, Transaction, WarningCollector
 from .types import warn as _warn
 
 class BaseParser:
-    def __init__(self, pdf_path: str, *, pages: Optional[List[str]] = None, logger: logging.Logger | None = None):
+    def __init__(
+        self,
+        pdf_path: str,
+        *,
+        pages: Optional[List[str]] = None,
+        logger: logging.Logger | None = None,
+        warning_samples: int | None = DEFAULT_WARNING_SAMPLES,
+    ):
         self.pdf_path = pdf_path
         self._pages_override = pages
         self.logger = logger or logging.getLogger("hsbc_parser").getChild(self.__class__.__name__)
         self.statement: Statement | None = None
         self.transactions: List[Transaction] = []
-        self.warnings: List[Dict[str, Any]] = []
+        # Repeated codes are folded into one row with a count; `warning_samples=None` keeps every occurrence.
+        self.warnings: List[Dict[str, Any]] = [] if warning_samples is None else WarningCollector(warning_samples)
 
     def warn(self, level: str, code: str, message: str, context: Any = None) -> None:
         archivo = (self.pdf_path or "").split("/")[-1]
         _warn(self.warnings, archivo, level, code, message, context=context, logger=self.logger)
 
+    def _load_pages(self) -> List[str]:
+        if self._pages_override is not None:
+            return self._pages_override
+        # Imported lazily so text-only parsing (pages=...) never loads pdfplumber.
+        import pdfplumber
+
+        with pdfplumber.open(self.pdf_path) as pdf:
+            return [(p.extract_text() or "") for p in pdf.pages]
+
     def parse(self) -> None:
         raise NotImplementedError
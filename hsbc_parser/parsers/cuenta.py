@@ -1,6 +1,6 @@
 from __future__ import annotations
 import re
-import pdfplumber
+from .. import tracing
 from .base import BaseParser
 from .types import Statement, Transaction
 from .utils import (
@@ -21,27 +21,24 @@ class HSBCCajaAhorroParser(BaseParser):
     """
 
     def parse(self) -> None:
-        if self._pages_override is None:
-            with pdfplumber.open(self.pdf_path) as pdf:
-                pages = [(p.extract_text() or "") for p in pdf.pages]
-        else:
-            pages = self._pages_override
-        text = "\n".join(pages)
-
-        archivo = self.pdf_path.split("/")[-1]
-
-        m_period = re.search(r"EXTRACTO\s+DEL\s+(\d{2}/\d{2}/\d{4})\s+AL\s+(\d{2}/\d{2}/\d{4})", text, re.I)
-        default_year = None
-        if m_period:
-            default_year = int(m_period.group(2).split("/")[-1])
-
-        self.statement = Statement(
-            archivo=archivo,
-            banco="HSBC",
-            origen="cuenta",
-            fecha_desde=parse_date_iso(m_period.group(1)) if m_period else None,
-            fecha_hasta=parse_date_iso(m_period.group(2)) if m_period else None,
-        )
+        pages = self._load_pages()
+        with tracing.span("header"):
+            text = "\n".join(pages)
+
+            archivo = self.pdf_path.split("/")[-1]
+
+            m_period = re.search(r"EXTRACTO\s+DEL\s+(\d{2}/\d{2}/\d{4})\s+AL\s+(\d{2}/\d{2}/\d{4})", text, re.I)
+            default_year = None
+            if m_period:
+                default_year = int(m_period.group(2).split("/")[-1])
+
+            self.statement = Statement(
+                archivo=archivo,
+                banco="HSBC",
+                origen="cuenta",
+                fecha_desde=parse_date_iso(m_period.group(1)) if m_period else None,
+                fecha_hasta=parse_date_iso(m_period.group(2)) if m_period else None,
+            )
 
         if not m_period:
             self.warn("WARNING", "NO_PERIOD", "Could not detect statement period")
@@ -183,30 +180,31 @@ class HSBCCajaAhorroParser(BaseParser):
                 ))
 
         # Section-level validations: start + sum == end
-        for cur, start_val in section_start.items():
-            if cur in section_end:
-                expected_end = round(start_val + section_sum.get(cur, 0.0), 2)
-                actual_end = round(section_end[cur], 2)
-                if expected_end != actual_end:
-                    diff = round(expected_end - actual_end, 2)
-                    denom = max(abs(actual_end), 1.0)
-                    within = abs(diff) / denom <= 0.05
-                    level = "INFO" if within else "WARNING"
-                    code = "BALANCE_SUM_WITHIN_TOLERANCE" if within else "BALANCE_SUM_MISMATCH"
-                    self.warn(
-                        level,
-                        code,
-                        "PDF balances do not reconcile with parsed transactions",
-                        {
-                            "moneda": cur,
-                            "saldo_anterior": start_val,
-                            "suma_movimientos": round(section_sum.get(cur, 0.0), 2),
-                            "saldo_final_esperado": expected_end,
-                            "saldo_final_pdf": actual_end,
-                            "diff": diff,
-                            "tolerance_ratio": 0.05,
-                        },
-                    )
+        with tracing.span("reconcile"):
+            for cur, start_val in section_start.items():
+                if cur in section_end:
+                    expected_end = round(start_val + section_sum.get(cur, 0.0), 2)
+                    actual_end = round(section_end[cur], 2)
+                    if expected_end != actual_end:
+                        diff = round(expected_end - actual_end, 2)
+                        denom = max(abs(actual_end), 1.0)
+                        within = abs(diff) / denom <= 0.05
+                        level = "INFO" if within else "WARNING"
+                        code = "BALANCE_SUM_WITHIN_TOLERANCE" if within else "BALANCE_SUM_MISMATCH"
+                        self.warn(
+                            level,
+                            code,
+                            "PDF balances do not reconcile with parsed transactions",
+                            {
+                                "moneda": cur,
+                                "saldo_anterior": start_val,
+                                "suma_movimientos": round(section_sum.get(cur, 0.0), 2),
+                                "saldo_final_esperado": expected_end,
+                                "saldo_final_pdf": actual_end,
+                                "diff": diff,
+                                "tolerance_ratio": 0.05,
+                            },
+                        )
 
         # Expose end balances in statement row (best-effort)
         if "ARS" in section_end:
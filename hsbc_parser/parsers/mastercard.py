@@ -1,6 +1,6 @@
 from __future__ import annotations
 import re
-import pdfplumber
+from .. import tracing
 from .base import BaseParser
 from .types import Statement, Transaction
 from .utils import (
@@ -25,43 +25,40 @@ class HSBCMastercardParser(BaseParser):
     """
 
     def parse(self) -> None:
-        if self._pages_override is None:
-            with pdfplumber.open(self.pdf_path) as pdf:
-                pages = [(p.extract_text() or "") for p in pdf.pages]
-        else:
-            pages = self._pages_override
-        text = "\n".join(pages)
-        text_compact = compact_spaced_month_letters(compact_spaced_numbers(text))
-
-        archivo = self.pdf_path.split("/")[-1]
-        cierre = re.search(r"Estado de cuenta al:?\s+(\d{2}-[A-Za-z]{3}-\d{2})", text_compact)
-        cierre_anterior = re.search(r"Cierre Anterior:\s+(\d{2}-[A-Za-z]{3}-\d{2})", text_compact, re.I)
-        m_prev_balance = re.search(r"SALDO ANTERIOR\s+([-\d.,]+)\s+([-\d.,]+)", text_compact, re.I)
-        m_cur_balance = re.search(r"SALDO ACTUAL\s+([-\d.,]+)\s+([-\d.,]+)", text_compact, re.I)
-
-        saldo_anterior_ars = saldo_anterior_usd = None
-        saldo_actual_ars = saldo_actual_usd = None
-        if m_prev_balance:
-            saldo_anterior_ars = parse_amount(m_prev_balance.group(1))
-            saldo_anterior_usd = parse_amount(m_prev_balance.group(2))
-        if m_cur_balance:
-            saldo_actual_ars = parse_amount(m_cur_balance.group(1))
-            saldo_actual_usd = parse_amount(m_cur_balance.group(2))
-
-        fecha_hasta = parse_date_iso(cierre.group(1)) if cierre else None
-        fecha_desde = add_days_iso(parse_date_iso(cierre_anterior.group(1)), 1) if cierre_anterior else None
-
-        self.statement = Statement(
-            archivo=archivo,
-            banco="HSBC",
-            origen="mastercard",
-            fecha_desde=fecha_desde,
-            fecha_hasta=fecha_hasta,
-            saldo_anterior_ars=saldo_anterior_ars,
-            saldo_anterior_usd=saldo_anterior_usd,
-            saldo_actual_ars=saldo_actual_ars,
-            saldo_actual_usd=saldo_actual_usd,
-        )
+        pages = self._load_pages()
+        with tracing.span("header"):
+            text = "\n".join(pages)
+            text_compact = compact_spaced_month_letters(compact_spaced_numbers(text))
+
+            archivo = self.pdf_path.split("/")[-1]
+            cierre = re.search(r"Estado de cuenta al:?\s+(\d{2}-[A-Za-z]{3}-\d{2})", text_compact)
+            cierre_anterior = re.search(r"Cierre Anterior:\s+(\d{2}-[A-Za-z]{3}-\d{2})", text_compact, re.I)
+            m_prev_balance = re.search(r"SALDO ANTERIOR\s+([-\d.,]+)\s+([-\d.,]+)", text_compact, re.I)
+            m_cur_balance = re.search(r"SALDO ACTUAL\s+([-\d.,]+)\s+([-\d.,]+)", text_compact, re.I)
+
+            saldo_anterior_ars = saldo_anterior_usd = None
+            saldo_actual_ars = saldo_actual_usd = None
+            if m_prev_balance:
+                saldo_anterior_ars = parse_amount(m_prev_balance.group(1))
+                saldo_anterior_usd = parse_amount(m_prev_balance.group(2))
+            if m_cur_balance:
+                saldo_actual_ars = parse_amount(m_cur_balance.group(1))
+                saldo_actual_usd = parse_amount(m_cur_balance.group(2))
+
+            fecha_hasta = parse_date_iso(cierre.group(1)) if cierre else None
+            fecha_desde = add_days_iso(parse_date_iso(cierre_anterior.group(1)), 1) if cierre_anterior else None
+
+            self.statement = Statement(
+                archivo=archivo,
+                banco="HSBC",
+                origen="mastercard",
+                fecha_desde=fecha_desde,
+                fecha_hasta=fecha_hasta,
+                saldo_anterior_ars=saldo_anterior_ars,
+                saldo_anterior_usd=saldo_anterior_usd,
+                saldo_actual_ars=saldo_actual_ars,
+                saldo_actual_usd=saldo_actual_usd,
+            )
 
         current_person = "TITULAR"
         saw_total_row = False
@@ -373,41 +370,42 @@ class HSBCMastercardParser(BaseParser):
         pending_tx_indexes.clear()
 
         # Reconciliation: saldo_anterior + sum(transactions) == saldo_actual (per currency)
-        if m_prev_balance and m_cur_balance:
-            prev_ars, prev_usd = parse_amount(m_prev_balance.group(1)), parse_amount(m_prev_balance.group(2))
-            cur_ars, cur_usd = parse_amount(m_cur_balance.group(1)), parse_amount(m_cur_balance.group(2))
-            sum_ars = round(sum(t.importe for t in self.transactions if t.moneda == "ARS"), 2)
-            sum_usd = round(sum(t.importe for t in self.transactions if t.moneda == "USD"), 2)
-            exp_ars = round(prev_ars + sum_ars, 2)
-            exp_usd = round(prev_usd + sum_usd, 2)
-
-            if exp_ars != round(cur_ars, 2) or exp_usd != round(cur_usd, 2):
-                denom = max(abs(cur_ars), 1.0)
-                diff_ars = round(exp_ars - round(cur_ars, 2), 2)
-                diff_usd = round(exp_usd - round(cur_usd, 2), 2)
-                within = abs(diff_ars) / denom <= 0.05
-                level = "INFO" if within else "WARNING"
-                code = "BALANCE_SUM_WITHIN_TOLERANCE" if within else "BALANCE_SUM_MISMATCH"
-                self.warn(
-                    level,
-                    code,
-                    "PDF balances do not reconcile with parsed transactions",
-                    {
-                        "prev_ars": prev_ars,
-                        "sum_ars": sum_ars,
-                        "expected_ars": exp_ars,
-                        "pdf_ars": cur_ars,
-                        "diff_ars": diff_ars,
-                        "prev_usd": prev_usd,
-                        "sum_usd": sum_usd,
-                        "expected_usd": exp_usd,
-                        "pdf_usd": cur_usd,
-                        "diff_usd": diff_usd,
-                        "tolerance_ratio": 0.05,
-                    },
-                )
-        else:
-            self.warn("WARNING", "MISSING_BALANCE_FIELDS", "Could not extract SALDO ANTERIOR/SALDO ACTUAL from PDF")
+        with tracing.span("reconcile"):
+            if m_prev_balance and m_cur_balance:
+                prev_ars, prev_usd = parse_amount(m_prev_balance.group(1)), parse_amount(m_prev_balance.group(2))
+                cur_ars, cur_usd = parse_amount(m_cur_balance.group(1)), parse_amount(m_cur_balance.group(2))
+                sum_ars = round(sum(t.importe for t in self.transactions if t.moneda == "ARS"), 2)
+                sum_usd = round(sum(t.importe for t in self.transactions if t.moneda == "USD"), 2)
+                exp_ars = round(prev_ars + sum_ars, 2)
+                exp_usd = round(prev_usd + sum_usd, 2)
+
+                if exp_ars != round(cur_ars, 2) or exp_usd != round(cur_usd, 2):
+                    denom = max(abs(cur_ars), 1.0)
+                    diff_ars = round(exp_ars - round(cur_ars, 2), 2)
+                    diff_usd = round(exp_usd - round(cur_usd, 2), 2)
+                    within = abs(diff_ars) / denom <= 0.05
+                    level = "INFO" if within else "WARNING"
+                    code = "BALANCE_SUM_WITHIN_TOLERANCE" if within else "BALANCE_SUM_MISMATCH"
+                    self.warn(
+                        level,
+                        code,
+                        "PDF balances do not reconcile with parsed transactions",
+                        {
+                            "prev_ars": prev_ars,
+                            "sum_ars": sum_ars,
+                            "expected_ars": exp_ars,
+                            "pdf_ars": cur_ars,
+                            "diff_ars": diff_ars,
+                            "prev_usd": prev_usd,
+                            "sum_usd": sum_usd,
+                            "expected_usd": exp_usd,
+                            "pdf_usd": cur_usd,
+                            "diff_usd": diff_usd,
+                            "tolerance_ratio": 0.05,
+                        },
+                    )
+            else:
+                self.warn("WARNING", "MISSING_BALANCE_FIELDS", "Could not extract SALDO ANTERIOR/SALDO ACTUAL from PDF")
 
         if not self.transactions:
             self.warn("ERROR", "NO_TRANSACTIONS", "No transactions detected")
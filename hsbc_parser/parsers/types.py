@@ -3,6 +3,8 @@ from dataclasses import dataclass
 import logging
 from typing import Optional, Dict, Any, List
 
+from .. import metrics
+
 @dataclass
 class Statement:
     archivo: str
@@ -27,6 +29,56 @@ class Transaction:
     operation_id: Optional[str] = None
     installment_number: Optional[int] = None
     installment_total: Optional[int] = None
+    merchant: Optional[str] = None  # canonical merchant key (see hsbc_parser.merchants)
+    categoria: Optional[str] = None
+
+# Repeats of a warning code within one file are folded into one row; this many contexts are kept as samples.
+DEFAULT_WARNING_SAMPLES = 5
+
+_SEVERITY = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+
+
+class WarningCollector(list):
+    """Warning records with one row per (`archivo`, `code`).
+
+    The first occurrence is stored like any record, with `count=1`. Repeats bump `count`, raise `level` if they
+    are more severe, and keep the contexts of the first `samples` occurrences as
+    `context={"samples": [...]}`; later ones are only counted. A plain list gives one row per occurrence instead.
+    """
+
+    def __init__(self, samples: int = DEFAULT_WARNING_SAMPLES):
+        super().__init__()
+        self.samples = samples
+        self._rows: Dict[tuple, Dict[str, Any]] = {}
+
+    def add(self, record: Dict[str, Any]) -> bool:
+        """Fold `record` in; True when it is one of the first `samples` occurrences (worth logging)."""
+        key = (record["archivo"], record["code"])
+        row = self._rows.get(key)
+        if row is None:
+            row = self._rows[key] = {**record, "count": record.get("count") or 1}
+            self.append(row)
+            return True
+        if row["count"] == 1:
+            row["context"] = {"samples": [] if row["context"] is None else [row["context"]]}
+        row["count"] += record.get("count") or 1
+        if _SEVERITY.get(record["level"].upper(), 0) > _SEVERITY.get(row["level"].upper(), 0):
+            row["level"] = record["level"]
+        if row["count"] > self.samples:
+            return False
+        if record["context"] is not None:
+            row["context"]["samples"].append(record["context"])
+        return True
+
+    def load(self, rows: List[Dict[str, Any]]) -> None:
+        """Replace the contents with rows that were already aggregated (e.g. read back from the cache)."""
+        self.clear()
+        self._rows = {}
+        for row in rows:
+            row = {**row, "count": row.get("count") or 1}
+            self._rows[(row["archivo"], row["code"])] = row
+            self.append(row)
+
 
 def warn(
     warnings: List[Dict[str, Any]],
@@ -43,10 +95,17 @@ def warn(
         "code": code,
         "message": message,
         "context": context,
+        "count": 1,
     }
-    warnings.append(record)
+    if isinstance(warnings, WarningCollector):
+        detailed = warnings.add(record)
+    else:
+        warnings.append(record)
+        detailed = True
+    metrics.inc("hsbc_parser_warnings_total", code=code, level=level.upper())
 
-    if logger is not None:
+    # Folded repeats are only counted: no log line (and no %r of their context) past the samples.
+    if logger is not None and detailed:
         log_method = logger.warning
         if level.upper() in ("ERROR", "CRITICAL"):
             log_method = logger.error
@@ -3,6 +3,7 @@ from __future__ import annotations
 import re
 import unicodedata
 from datetime import date, timedelta
+from functools import lru_cache
 
 def parse_amount(s: str) -> float:
     """Parse monetary strings that may use '.' or ',' as thousands/decimal separators."""
@@ -33,6 +34,23 @@ def norm_space(s: str) -> str:
     return " ".join(s.split()).strip()
 
 
+_NON_ALNUM_RE = re.compile(r"[^A-Z0-9]+")
+
+
+@lru_cache(maxsize=65536)
+def normalize_description(s: str) -> str:
+    """Comparable form of a description: no accents, upper-case, installment tags and punctuation dropped.
+
+    'Mercpago*Tienda Ejemplo C.07/18' -> 'MERCPAGO TIENDA EJEMPLO'.
+    """
+    text = s or ""
+    if not text.isascii():
+        text = "".join(ch for ch in unicodedata.normalize("NFKD", text) if not unicodedata.combining(ch))
+    text = text.upper()
+    text = _INSTALLMENT_RE.sub(" ", text)
+    return _NON_ALNUM_RE.sub(" ", text).strip()
+
+
 _SPACED_NUMBER_RE = re.compile(r"(?<![\d/])(\d[\d\s.,]*\d)")
 
 
@@ -1,6 +1,6 @@
 from __future__ import annotations
 import re
-import pdfplumber
+from .. import tracing
 from .base import BaseParser
 from .types import Statement, Transaction
 from .utils import (
@@ -30,40 +30,37 @@ class HSBCVisaParser(BaseParser):
     _AMOUNT_RE = re.compile(r"-?[\d.]+,\d{2}-?(?!%)")
 
     def parse(self) -> None:
-        if self._pages_override is None:
-            with pdfplumber.open(self.pdf_path) as pdf:
-                pages = [(p.extract_text() or "") for p in pdf.pages]
-        else:
-            pages = self._pages_override
-        text = "\n".join(pages)
-        text_compact = compact_spaced_month_letters(compact_spaced_numbers(text))
-
-        archivo = self.pdf_path.split("/")[-1]
-
-        # Metadata best-effort (Visa suele variar; no forzamos)
-        m_prev = re.search(r"SALDO\s+ANTERIOR\s+([\d.]+,\d{2})\s+([\d.]+,\d{2})", text_compact, re.I)
-        m_cur = re.search(r"SALDO\s+ACTUAL\s+\$?\s*([\d.]+,\d{2})\s+U\$S\s*([\d.]+,\d{2})", text_compact, re.I)
-        cierre = re.search(r"CIERRE\s+ACTUAL\s+([0-9A-Za-z\s]{4,20})", text_compact, re.I)
-        cierre_ant = re.search(r"CIERRE\s+ANTERIOR\s+([0-9A-Za-z\s]{4,20})", text_compact, re.I)
-        prev_ars = parse_amount(m_prev.group(1)) if m_prev else None
-        prev_usd = parse_amount(m_prev.group(2)) if m_prev else None
-        cur_ars = parse_amount(m_cur.group(1)) if m_cur else None
-        cur_usd = parse_amount(m_cur.group(2)) if m_cur else None
-
-        fecha_hasta = parse_date_iso_loose(cierre.group(1)) if cierre else None
-        fecha_desde = add_days_iso(parse_date_iso_loose(cierre_ant.group(1)), 1) if cierre_ant else None
-
-        self.statement = Statement(
-            archivo=archivo,
-            banco="HSBC",
-            origen="visa",
-            fecha_desde=fecha_desde,
-            fecha_hasta=fecha_hasta,
-            saldo_anterior_ars=prev_ars,
-            saldo_anterior_usd=prev_usd,
-            saldo_actual_ars=cur_ars,
-            saldo_actual_usd=cur_usd,
-        )
+        pages = self._load_pages()
+        with tracing.span("header"):
+            text = "\n".join(pages)
+            text_compact = compact_spaced_month_letters(compact_spaced_numbers(text))
+
+            archivo = self.pdf_path.split("/")[-1]
+
+            # Metadata best-effort (Visa suele variar; no forzamos)
+            m_prev = re.search(r"SALDO\s+ANTERIOR\s+([\d.]+,\d{2})\s+([\d.]+,\d{2})", text_compact, re.I)
+            m_cur = re.search(r"SALDO\s+ACTUAL\s+\$?\s*([\d.]+,\d{2})\s+U\$S\s*([\d.]+,\d{2})", text_compact, re.I)
+            cierre = re.search(r"CIERRE\s+ACTUAL\s+([0-9A-Za-z\s]{4,20})", text_compact, re.I)
+            cierre_ant = re.search(r"CIERRE\s+ANTERIOR\s+([0-9A-Za-z\s]{4,20})", text_compact, re.I)
+            prev_ars = parse_amount(m_prev.group(1)) if m_prev else None
+            prev_usd = parse_amount(m_prev.group(2)) if m_prev else None
+            cur_ars = parse_amount(m_cur.group(1)) if m_cur else None
+            cur_usd = parse_amount(m_cur.group(2)) if m_cur else None
+
+            fecha_hasta = parse_date_iso_loose(cierre.group(1)) if cierre else None
+            fecha_desde = add_days_iso(parse_date_iso_loose(cierre_ant.group(1)), 1) if cierre_ant else None
+
+            self.statement = Statement(
+                archivo=archivo,
+                banco="HSBC",
+                origen="visa",
+                fecha_desde=fecha_desde,
+                fecha_hasta=fecha_hasta,
+                saldo_anterior_ars=prev_ars,
+                saldo_anterior_usd=prev_usd,
+                saldo_actual_ars=cur_ars,
+                saldo_actual_usd=cur_usd,
+            )
 
         current_person = "TITULAR"
         ignored = 0
@@ -206,35 +203,36 @@ class HSBCVisaParser(BaseParser):
         elif ignored:
             self.warn("WARNING", "IGNORED_ROWS", "Date lines that could not be parsed", {"count": ignored})
 
-        if prev_ars is not None and prev_usd is not None and cur_ars is not None and cur_usd is not None:
-            sum_ars = round(sum(t.importe for t in self.transactions if t.moneda == "ARS"), 2)
-            sum_usd = round(sum(t.importe for t in self.transactions if t.moneda == "USD"), 2)
-            exp_ars = round(prev_ars + sum_ars, 2)
-            exp_usd = round(prev_usd + sum_usd, 2)
-            if exp_ars != round(cur_ars, 2) or exp_usd != round(cur_usd, 2):
-                diff_ars = round(exp_ars - round(cur_ars, 2), 2)
-                diff_usd = round(exp_usd - round(cur_usd, 2), 2)
-                denom = max(abs(cur_ars), 1.0)
-                within = abs(diff_ars) / denom <= 0.05
-                level = "INFO" if within else "WARNING"
-                code = "BALANCE_SUM_WITHIN_TOLERANCE" if within else "BALANCE_SUM_MISMATCH"
-                self.warn(
-                    level,
-                    code,
-                    "PDF balances do not reconcile with parsed transactions",
-                    {
-                        "prev_ars": prev_ars,
-                        "sum_ars": sum_ars,
-                        "expected_ars": exp_ars,
-                        "pdf_ars": cur_ars,
-                        "diff_ars": diff_ars,
-                        "prev_usd": prev_usd,
-                        "sum_usd": sum_usd,
-                        "expected_usd": exp_usd,
-                        "pdf_usd": cur_usd,
-                        "diff_usd": diff_usd,
-                        "tolerance_ratio": 0.05,
-                    },
-                )
-        else:
-            self.warn("WARNING", "MISSING_BALANCE_FIELDS", "Could not extract SALDO ANTERIOR/SALDO ACTUAL from PDF")
+        with tracing.span("reconcile"):
+            if prev_ars is not None and prev_usd is not None and cur_ars is not None and cur_usd is not None:
+                sum_ars = round(sum(t.importe for t in self.transactions if t.moneda == "ARS"), 2)
+                sum_usd = round(sum(t.importe for t in self.transactions if t.moneda == "USD"), 2)
+                exp_ars = round(prev_ars + sum_ars, 2)
+                exp_usd = round(prev_usd + sum_usd, 2)
+                if exp_ars != round(cur_ars, 2) or exp_usd != round(cur_usd, 2):
+                    diff_ars = round(exp_ars - round(cur_ars, 2), 2)
+                    diff_usd = round(exp_usd - round(cur_usd, 2), 2)
+                    denom = max(abs(cur_ars), 1.0)
+                    within = abs(diff_ars) / denom <= 0.05
+                    level = "INFO" if within else "WARNING"
+                    code = "BALANCE_SUM_WITHIN_TOLERANCE" if within else "BALANCE_SUM_MISMATCH"
+                    self.warn(
+                        level,
+                        code,
+                        "PDF balances do not reconcile with parsed transactions",
+                        {
+                            "prev_ars": prev_ars,
+                            "sum_ars": sum_ars,
+                            "expected_ars": exp_ars,
+                            "pdf_ars": cur_ars,
+                            "diff_ars": diff_ars,
+                            "prev_usd": prev_usd,
+                            "sum_usd": sum_usd,
+                            "expected_usd": exp_usd,
+                            "pdf_usd": cur_usd,
+                            "diff_usd": diff_usd,
+                            "tolerance_ratio": 0.05,
+                        },
+                    )
+            else:
+                self.warn("WARNING", "MISSING_BALANCE_FIELDS", "Could not extract SALDO ANTERIOR/SALDO ACTUAL from PDF")
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .export import TRANSACTION_COLUMNS
+from .logging_utils import get_logger
+from .shards import transaction_files
+
+logger = get_logger("query")
+
+# Columns with a hash index (value -> sorted row positions); they are stored dictionary-encoded.
+INDEXED_COLUMNS = ("persona", "origen", "moneda", "operation_id")
+_CODED_COLUMNS = ("archivo", "merchant", "categoria") + INDEXED_COLUMNS
+# `mes` (YYYY-MM of `fecha`) is a virtual column usable in group_sum().
+GROUP_COLUMNS = _CODED_COLUMNS + ("mes",)
+
+_NO_DATE = np.iinfo(np.int64).max
+_EPOCH = date(1970, 1, 1).toordinal()
+
+
+def _day(value: Any) -> int:
+    """Days since 1970-01-01 for an ISO date (or date), `_NO_DATE` when missing/unparseable."""
+    if isinstance(value, date):
+        return value.toordinal() - _EPOCH
+    try:
+        return date.fromisoformat(str(value)[:10]).toordinal() - _EPOCH
+    except ValueError:
+        return _NO_DATE
+
+
+def _encode(values: Sequence[Any]) -> Tuple[np.ndarray, List[str]]:
+    """Dictionary-encode values as int32 codes; missing values map to ''."""
+    vocab: Dict[str, int] = {}
+    codes = np.fromiter(
+        (vocab.setdefault("" if v is None else str(v), len(vocab)) for v in values), dtype=np.int32, count=len(values)
+    )
+    return codes, list(vocab)
+
+
+class TransactionStore:
+    """Columnar, indexed in-memory copy of `transactions` for repeated ad-hoc queries.
+
+    Rows are physically sorted by `fecha`, so a date range is a contiguous slice found by binary search.
+    `persona`, `origen`, `moneda` and `operation_id` have hash indexes mapping each value to its (date-sorted)
+    row positions; the most selective equality filter drives a query and the others are checked on its rows.
+    """
+
+    def __init__(self, columns: Mapping[str, Sequence[Any]]):
+        n = len(columns["fecha"])
+        days = np.fromiter((_day(v) for v in columns["fecha"]), dtype=np.int64, count=n)
+        order = np.argsort(days, kind="stable")
+        self.days = days[order]
+        self.importe = np.asarray(
+            [np.nan if v in (None, "") else float(v) for v in columns["importe"]], dtype=np.float64
+        )[order]
+        self.fecha = np.asarray(columns["fecha"], dtype=object)[order]
+        self.descripcion = np.asarray(columns["descripcion"], dtype=object)[order]
+        self.installments = [
+            np.asarray(columns.get(c, [None] * n), dtype=object)[order] for c in ("installment_number", "installment_total")
+        ]
+        self.codes: Dict[str, np.ndarray] = {}
+        self.vocab: Dict[str, List[str]] = {}
+        for name in _CODED_COLUMNS:
+            codes, vocab = _encode(columns[name] if name in columns else [None] * n)
+            self.codes[name], self.vocab[name] = codes[order], vocab
+        self._lookup = {name: {v: i for i, v in enumerate(vocab)} for name, vocab in self.vocab.items()}
+        # Hash index as CSR arrays: rows of code c are positions[bounds[c]:bounds[c + 1]], ascending (= date order).
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for name in INDEXED_COLUMNS:
+            codes = self.codes[name]
+            positions = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[positions], np.arange(len(self.vocab[name]) + 1))
+            self._postings[name] = (positions, bounds)
+        valid = self.days[self.days != _NO_DATE]
+        months = (valid.astype("datetime64[D]").astype("datetime64[M]")).astype(str)
+        self._mes = np.concatenate([months, np.full(n - len(valid), "", dtype=months.dtype)]) if n else months
+        logger.debug("Loaded %d transactions", n)
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def postings(self, column: str, value: str) -> np.ndarray:
+        """Date-ordered row positions where `column == value` (hash-index lookup)."""
+        code = self._lookup[column].get("" if value is None else str(value))
+        if code is None:
+            return np.empty(0, dtype=np.int64)
+        positions, bounds = self._postings[column]
+        return positions[bounds[code] : bounds[code + 1]]
+
+    # -- loading -----------------------------------------------------------------------------------------
+
+    @classmethod
+    def from_records(cls, records: Iterable[Mapping[str, Any]]) -> "TransactionStore":
+        columns: Dict[str, List[Any]] = {c: [] for c in TRANSACTION_COLUMNS}
+        for rec in records:
+            for c in TRANSACTION_COLUMNS:
+                columns[c].append(rec.get(c))
+        return cls(columns)
+
+    @classmethod
+    def from_parsers(cls, parsers: Iterable[Any]) -> "TransactionStore":
+        columns: Dict[str, List[Any]] = {c: [] for c in TRANSACTION_COLUMNS}
+        for p in parsers:
+            for t in p.transactions:
+                for c in TRANSACTION_COLUMNS:
+                    columns[c].append(getattr(t, c))
+        return cls(columns)
+
+    @classmethod
+    def from_files(cls, paths: Iterable[str | Path]) -> "TransactionStore":
+        """Load exported `transactions.csv` / `.jsonl` files (optionally .gz / .xz)."""
+        import pandas as pd
+
+        frames = []
+        for path in map(Path, paths):
+            if ".jsonl" in path.suffixes:
+                frames.append(pd.read_json(path, lines=True, dtype=False))
+            else:
+                frames.append(pd.read_csv(path, dtype=str, keep_default_na=False))
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=TRANSACTION_COLUMNS)
+        df = df.astype(object).where(df.notna(), None)
+        return cls({c: df[c].tolist() if c in df else [None] * len(df) for c in TRANSACTION_COLUMNS})
+
+    @classmethod
+    def load(cls, out_dir: str | Path) -> "TransactionStore":
+        """Load every `transactions.*` file under an output folder (flat, sharded or partitioned layout)."""
+        return cls.from_files(transaction_files(out_dir))
+
+    # -- querying ----------------------------------------------------------------------------------------
+
+    def query(
+        self,
+        *,
+        fecha_desde: str | date | None = None,
+        fecha_hasta: str | date | None = None,
+        importe_min: float | None = None,
+        importe_max: float | None = None,
+        **equals: str,
+    ) -> "Selection":
+        """Rows matching all filters. Dates are inclusive; equality filters are on `INDEXED_COLUMNS`."""
+        unknown = set(equals) - set(INDEXED_COLUMNS)
+        if unknown:
+            raise ValueError(f"cannot filter on {sorted(unknown)}; indexed columns are {INDEXED_COLUMNS}")
+        lo = 0 if fecha_desde is None else int(np.searchsorted(self.days, _day(fecha_desde), "left"))
+        hi = (
+            int(np.searchsorted(self.days, _NO_DATE, "left"))
+            if fecha_hasta is None
+            else int(np.searchsorted(self.days, _day(fecha_hasta), "right"))
+        )
+        if fecha_desde is None and fecha_hasta is None:
+            hi = len(self.days)
+
+        filters = sorted(
+            ((name, self.postings(name, value)) for name, value in equals.items()), key=lambda f: len(f[1])
+        )
+        if filters:
+            # Drive from the smallest posting list; it is date-sorted, so the date range is a binary search.
+            postings = filters[0][1]
+            rows = postings[np.searchsorted(postings, lo) : np.searchsorted(postings, hi)]
+            for name, value in equals.items():
+                if name != filters[0][0] and len(rows):
+                    rows = rows[self.codes[name][rows] == self._lookup[name]["" if value is None else str(value)]]
+        else:
+            rows = np.arange(lo, hi)
+
+        if importe_min is not None:
+            rows = rows[self.importe[rows] >= importe_min]
+        if importe_max is not None:
+            rows = rows[self.importe[rows] <= importe_max]
+        return Selection(self, rows)
+
+
+class Selection:
+    """Row positions selected by `TransactionStore.query`, in date order."""
+
+    def __init__(self, store: TransactionStore, rows: np.ndarray):
+        self.store = store
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def total(self) -> float:
+        return float(np.nansum(self.store.importe[self.rows]))
+
+    def _key_codes(self, column: str) -> Tuple[np.ndarray, List[str]]:
+        if column == "mes":
+            values, codes = np.unique(self.store._mes[self.rows], return_inverse=True)
+            return codes.reshape(-1), [str(v) for v in values]
+        if column not in self.store.codes:
+            raise ValueError(f"cannot group by {column!r}; use one of {GROUP_COLUMNS}")
+        return self.store.codes[column][self.rows], self.store.vocab[column]
+
+    def group_sum(self, *by: str) -> Dict[Tuple[str, ...], Tuple[float, int]]:
+        """{(key values...): (sum of importe, row count)} for the selected rows, sorted by key."""
+        if not by:
+            return {(): (self.total(), len(self))}
+        combined = np.zeros(len(self.rows), dtype=np.int64)
+        vocabs = []
+        for column in by:
+            codes, vocab = self._key_codes(column)
+            combined = combined * len(vocab) + codes
+            vocabs.append(vocab)
+        groups, inverse = np.unique(combined, return_inverse=True)
+        weights = np.nan_to_num(self.store.importe[self.rows])
+        sums = np.bincount(inverse.reshape(-1), weights=weights, minlength=len(groups))
+        counts = np.bincount(inverse.reshape(-1), minlength=len(groups))
+        out = {}
+        for g, s, c in zip(groups.tolist(), sums.tolist(), counts.tolist()):
+            key = []
+            for vocab in reversed(vocabs):
+                g, i = divmod(g, len(vocab))
+                key.append(vocab[i])
+            out[tuple(reversed(key))] = (round(s, 2), c)
+        return dict(sorted(out.items()))
+
+    def records(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        s = self.store
+        rows = self.rows if limit is None else self.rows[:limit]
+        out = []
+        for i in rows.tolist():
+            rec = {c: s.vocab[c][s.codes[c][i]] or None for c in _CODED_COLUMNS}
+            rec.update(
+                fecha=s.fecha[i],
+                descripcion=s.descripcion[i],
+                importe=float(s.importe[i]),
+                installment_number=s.installments[0][i],
+                installment_total=s.installments[1][i],
+            )
+            out.append({c: rec[c] for c in TRANSACTION_COLUMNS})
+        return out
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .batch import BatchResult, run_batch
+from .export import parser_to_dict
+from .logging_utils import get_logger
+
+logger = get_logger("regress")
+
+TIMINGS_FILE = "timings.json"
+DEFAULT_MAX_SLOWDOWN = 0.25
+DEFAULT_MIN_DELTA_S = 0.05
+_SECTIONS = ("statement", "transactions", "warnings")
+_INPUT_SUFFIXES = (".txt", ".pdf")
+
+
+def corpus_inputs(corpus: str | Path) -> List[Path]:
+    """Reference inputs of a corpus folder: page-text fixtures (*.txt) and PDFs, sorted by name."""
+    return sorted(p for p in Path(corpus).iterdir() if p.is_file() and p.suffix.lower() in _INPUT_SUFFIXES)
+
+
+def golden_path(goldens: str | Path, archivo: str) -> Path:
+    return Path(goldens) / f"{archivo}.json"
+
+
+def result_output(result: BatchResult) -> Dict[str, Any]:
+    """What a golden stores for one input: `parser_to_dict()` as JSON sees it, or the failure code and stage."""
+    if not result.ok:
+        return {"failed": result.code, "stage": result.stage, "message": result.message}
+    # Round-trip through JSON so goldens read back from disk compare equal (dates, tuples, ...).
+    return json.loads(json.dumps(parser_to_dict(result.parser), ensure_ascii=False, default=str))
+
+
+def _fmt(value: Any) -> str:
+    text = json.dumps(value, ensure_ascii=False, default=str)
+    return text if len(text) <= 120 else text[:117] + "..."
+
+
+def _diff_rows(section: str, expected: List[Dict[str, Any]], actual: List[Dict[str, Any]]) -> Iterable[str]:
+    for i in range(max(len(expected), len(actual))):
+        if i >= len(actual):
+            yield f"{section}[{i}] removed: {_fmt(expected[i])}"
+        elif i >= len(expected):
+            yield f"{section}[{i}] added: {_fmt(actual[i])}"
+        elif expected[i] != actual[i]:
+            for key in sorted(set(expected[i]) | set(actual[i])):
+                if expected[i].get(key) != actual[i].get(key):
+                    yield f"{section}[{i}].{key}: {_fmt(expected[i].get(key))} -> {_fmt(actual[i].get(key))}"
+
+
+def diff_outputs(expected: Dict[str, Any], actual: Dict[str, Any], limit: int = 20) -> List[str]:
+    """Human-readable differences between a golden and a fresh output (at most `limit` lines, plus a tail count)."""
+    lines: List[str] = []
+    if "failed" in expected or "failed" in actual:
+        if expected != actual:
+            lines.append(f"outcome: {_fmt(expected.get('failed', 'ok'))} -> {_fmt(actual.get('failed', 'ok'))}")
+    else:
+        es, as_ = expected.get("statement") or {}, actual.get("statement") or {}
+        for key in sorted(set(es) | set(as_)):
+            if es.get(key) != as_.get(key):
+                lines.append(f"statement.{key}: {_fmt(es.get(key))} -> {_fmt(as_.get(key))}")
+        for section in _SECTIONS[1:]:
+            lines.extend(_diff_rows(section, expected.get(section) or [], actual.get(section) or []))
+    if len(lines) > limit:
+        lines = lines[:limit] + [f"... {len(lines) - limit} more differences"]
+    return lines
+
+
+@dataclass
+class FileResult:
+    archivo: str
+    status: str  # "ok", "changed", "new" (no golden yet), "missing" (golden without input) or "updated"
+    diffs: List[str] = field(default_factory=list)
+    elapsed: Optional[float] = None
+    baseline: Optional[float] = None
+
+    @property
+    def slowdown(self) -> Optional[float]:
+        if self.elapsed is None or not self.baseline:
+            return None
+        return self.elapsed / self.baseline - 1
+
+
+@dataclass
+class RegressionReport:
+    files: List[FileResult]
+    max_slowdown: float = DEFAULT_MAX_SLOWDOWN
+    min_delta_s: float = DEFAULT_MIN_DELTA_S
+    elapsed: float = 0.0  # summed per-file parse time of the inputs that have a timing baseline
+    baseline: float = 0.0
+
+    @property
+    def slowdown(self) -> Optional[float]:
+        """Relative throughput loss over the files with a baseline (0.3 = 30% slower), or None without baselines."""
+        return self.elapsed / self.baseline - 1 if self.baseline else None
+
+    @property
+    def too_slow(self) -> bool:
+        s = self.slowdown
+        return s is not None and s > self.max_slowdown and self.elapsed - self.baseline > self.min_delta_s
+
+    @property
+    def mismatches(self) -> List[FileResult]:
+        return [f for f in self.files if f.status in ("changed", "new", "missing")]
+
+    @property
+    def ok(self) -> bool:
+        return not self.mismatches and not self.too_slow
+
+    def slow_files(self) -> List[FileResult]:
+        """Files individually over the slowdown threshold (reported, but only the total decides `ok`)."""
+        return [
+            f
+            for f in self.files
+            if f.slowdown is not None
+            and f.slowdown > self.max_slowdown
+            and f.elapsed - f.baseline > self.min_delta_s
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ok": self.ok,
+            "elapsed_s": round(self.elapsed, 6),
+            "baseline_s": round(self.baseline, 6),
+            "slowdown": None if self.slowdown is None else round(self.slowdown, 4),
+            "max_slowdown": self.max_slowdown,
+            "files": [
+                {
+                    "archivo": f.archivo,
+                    "status": f.status,
+                    "elapsed_s": None if f.elapsed is None else round(f.elapsed, 6),
+                    "baseline_s": f.baseline,
+                    "diffs": f.diffs,
+                }
+                for f in self.files
+            ],
+        }
+
+
+def load_timings(goldens: str | Path) -> Dict[str, float]:
+    path = Path(goldens) / TIMINGS_FILE
+    if not path.exists():
+        return {}
+    return {k: float(v) for k, v in json.loads(path.read_text(encoding="utf-8"))["files"].items()}
+
+
+def _write_json(path: Path, payload: Any) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(payload, ensure_ascii=False, indent=1) + "\n", encoding="utf-8")
+    tmp.replace(path)
+
+
+def run_regression(
+    corpus: str | Path,
+    goldens: str | Path,
+    *,
+    workers: int = 1,
+    update: bool = False,
+    timing: bool = True,
+    max_slowdown: float = DEFAULT_MAX_SLOWDOWN,
+    min_delta_s: float = DEFAULT_MIN_DELTA_S,
+    timeout: float | None = None,
+) -> RegressionReport:
+    """Parse every input of `corpus` (through `run_batch`, `workers` processes) and compare with `goldens`.
+
+    Each input `<archivo>` has a golden `<goldens>/<archivo>.json` holding its statement, transactions and
+    warnings (or the failure code); `<goldens>/timings.json` holds per-file parse seconds. The run fails on
+    any changed, new or missing golden, and when the summed parse time of the inputs with a baseline is more
+    than `max_slowdown` (and `min_delta_s` seconds) above the summed baselines. Timings are only comparable
+    between runs on the same machine with the same `workers`. With `update`, goldens and timings are
+    rewritten from this run instead (review the diff before committing them).
+    """
+    goldens = Path(goldens)
+    inputs = corpus_inputs(corpus)
+    baselines = load_timings(goldens) if timing and not update else {}
+    report = RegressionReport([], max_slowdown=max_slowdown, min_delta_s=min_delta_s)
+    timings: Dict[str, float] = {}
+
+    for result in run_batch(inputs, workers=workers, timeout=timeout, keep_going=True):
+        archivo = Path(result.path).name
+        actual = result_output(result)
+        timings[archivo] = round(result.elapsed, 6)
+        path = golden_path(goldens, archivo)
+        if update:
+            _write_json(path, actual)
+            report.files.append(FileResult(archivo, "updated", elapsed=result.elapsed))
+            continue
+        if not path.exists():
+            report.files.append(FileResult(archivo, "new", ["no golden; run with --update to record it"], result.elapsed))
+            continue
+        diffs = diff_outputs(json.loads(path.read_text(encoding="utf-8")), actual)
+        f = FileResult(archivo, "changed" if diffs else "ok", diffs, result.elapsed, baselines.get(archivo))
+        if f.baseline:
+            report.elapsed += f.elapsed
+            report.baseline += f.baseline
+        report.files.append(f)
+        logger.debug("%s: %s in %.3f s", archivo, f.status, result.elapsed)
+
+    names = {p.name for p in inputs}
+    for path in sorted(goldens.glob("*.json")):
+        archivo = path.name[: -len(".json")]
+        if path.name == TIMINGS_FILE or archivo in names:
+            continue
+        if update:
+            path.unlink()
+            logger.info("Removed golden of missing input %s", archivo)
+        else:
+            report.files.append(FileResult(archivo, "missing", ["golden has no input in the corpus"]))
+
+    if update and timing:
+        _write_json(goldens / TIMINGS_FILE, {"workers": workers, "files": timings})
+    return report
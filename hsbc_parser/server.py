@@ -0,0 +1,384 @@
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterable, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from . import metrics
+from .export import parser_to_dict
+from .logging_utils import configure_logging, get_logger
+
+logger = get_logger("server")
+
+_TIPOS = {"auto": None, "mastercard": "mastercard", "visa": "visa", "cuenta": "cuenta", "account": "cuenta"}
+
+
+# Set in each worker by `_init_worker`: where jobs report (job id, pid) when they start running.
+_starts = None
+
+
+def _init_worker(metrics_on: bool, starts) -> None:
+    global _starts
+    metrics.enable(metrics_on)
+    _starts = starts
+
+
+def _warm_worker() -> None:
+    from . import dispatcher  # noqa: F401
+
+
+def _metered_job(job_id: int, fn, *args) -> Tuple[Any, Dict[str, Any]]:
+    # Runs in a worker: hand this job's metrics back with its result so /metrics sees the whole pool.
+    _starts.put((job_id, os.getpid()))
+    return fn(*args), metrics.REGISTRY.drain()
+
+
+def _parse_path_job(pdf_path: str, tipo: str | None) -> Dict[str, Any]:
+    from .dispatcher import parse_pdf
+
+    return parser_to_dict(parse_pdf(pdf_path, tipo))
+
+
+def _parse_upload_job(data: bytes, name: str, tipo: str | None) -> Dict[str, Any]:
+    # Keep the client's file name so `archivo` matches what a CLI run would produce.
+    with tempfile.TemporaryDirectory(prefix="hsbc-parser-") as tmp:
+        path = Path(tmp) / name
+        path.write_bytes(data)
+        return _parse_path_job(str(path), tipo)
+
+
+class QueueFull(Exception):
+    pass
+
+
+class ParseTimeout(Exception):
+    pass
+
+
+class ParseService:
+    """Pre-warmed process pool with a bounded number of queued + running parses.
+
+    At most `workers + queue_size` jobs are accepted at once; beyond that `submit` raises `QueueFull`
+    immediately (the HTTP layer turns it into `503 Retry-After`) instead of letting requests pile up.
+
+    A worker that dies (killed, OOM in pdfminer) breaks the whole executor: the pool is then rebuilt and the
+    request retried once, so one bad file doesn't fail every later request. A parse running longer than
+    `timeout` seconds, counted from when a worker picks it up (time spent queued doesn't count), raises
+    `ParseTimeout` (504). Only the process running it is killed, but that breaks the executor like any dead
+    worker: the pool is rebuilt and the other parses that were running are retried once on it. Worker metrics
+    are collected when `metrics` is enabled (e.g. by `main()`), not forced on here.
+    """
+
+    def __init__(self, *, workers: int = 2, queue_size: int = 8, timeout: float | None = 120.0):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+        self._pool_lock = threading.Lock()
+        self._started = time.monotonic()
+        self._job_ids = itertools.count()
+        self._starts = multiprocessing.SimpleQueue()
+        self._running: Dict[int, int] = {}  # job id -> pid of the worker running it
+        self._running_cond = threading.Condition()
+        threading.Thread(target=self._collect_starts, name="hsbc-parse-starts", daemon=True).start()
+        self.stats = {
+            "requests": 0,
+            "ok": 0,
+            "errors": 0,
+            "rejected": 0,
+            "timeouts": 0,
+            "restarts": 0,
+            "inflight": 0,
+            "parse_seconds": 0.0,
+        }
+        self._pool = self._new_pool()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        pool = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker, initargs=(metrics.enabled(), self._starts)
+        )
+        for f in [pool.submit(_warm_worker) for _ in range(self.workers)]:
+            f.result()
+        return pool
+
+    def _broken(self) -> bool:
+        # Set by the executor as soon as one of its processes dies, even between requests.
+        return bool(getattr(self._pool, "_broken", False))
+
+    def _replace_pool(self, old: ProcessPoolExecutor) -> None:
+        with self._pool_lock:
+            if self._pool is not old:
+                return  # another request already replaced it
+            old.shutdown(wait=False, cancel_futures=True)
+            self._pool = self._new_pool()
+            self._bump("restarts")
+            logger.warning("Parse worker pool replaced")
+
+    def _collect_starts(self) -> None:
+        while True:
+            job_id, pid = self._starts.get()
+            with self._running_cond:
+                self._running[job_id] = pid
+                self._running_cond.notify_all()
+
+    def _wait_started(self, job_id: int, future) -> int | None:
+        """Pid of the worker once it starts the job; None if the job failed (or was cancelled) before starting."""
+        with self._running_cond:
+            while job_id not in self._running:
+                if future.done() and (future.cancelled() or future.exception() is not None):
+                    return None
+                self._running_cond.wait(0.05)
+            return self._running.pop(job_id)
+
+    def _run(self, fn, *args, retry: bool = True) -> Tuple[Any, Dict[str, Any]]:
+        pool = self._pool
+        if self._broken():
+            self._replace_pool(pool)
+            pool = self._pool
+        job_id = next(self._job_ids)
+        try:
+            future = pool.submit(_metered_job, job_id, fn, *args)
+            pid = self._wait_started(job_id, future)
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            self._bump("timeouts")
+            # ProcessPoolExecutor can't cancel a running job: kill the process running it.
+            proc = (getattr(pool, "_processes", None) or {}).get(pid)
+            if proc is not None:
+                proc.kill()
+                logger.warning("Parse timed out after %g s; killed worker %d", self.timeout, pid)
+            self._replace_pool(pool)
+            raise ParseTimeout(f"parse took longer than {self.timeout:g} s") from None
+        except BrokenProcessPool:
+            self._replace_pool(pool)
+            if not retry:
+                raise
+            logger.warning("Parse worker died; retrying the request on a fresh pool")
+            return self._run(fn, *args, retry=False)
+
+    def _bump(self, key: str, value: float = 1) -> None:
+        with self._lock:
+            self.stats[key] += value
+
+    def submit(self, fn, *args) -> Dict[str, Any]:
+        self._bump("requests")
+        if not self._slots.acquire(blocking=False):
+            self._bump("rejected")
+            raise QueueFull()
+        self._bump("inflight")
+        t0 = time.perf_counter()
+        try:
+            result, worker_metrics = self._run(fn, *args)
+        except Exception:
+            self._bump("errors")
+            raise
+        finally:
+            elapsed = time.perf_counter() - t0
+            self._bump("inflight", -1)
+            self._bump("parse_seconds", elapsed)
+            metrics.observe("hsbc_parser_stage_seconds", elapsed, stage="request")
+            self._slots.release()
+        metrics.REGISTRY.merge(worker_metrics)
+        self._bump("ok")
+        return result
+
+    def parse_path(self, pdf_path: str, tipo: str | None = None) -> Dict[str, Any]:
+        return self.submit(_parse_path_job, pdf_path, tipo)
+
+    def parse_upload(self, data: bytes, name: str, tipo: str | None = None) -> Dict[str, Any]:
+        return self.submit(_parse_upload_job, data, name, tipo)
+
+    def health(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        stats["parse_seconds"] = round(stats["parse_seconds"], 3)
+        return {
+            "status": "degraded" if self._broken() else "ok",
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "uptime_s": round(time.monotonic() - self._started, 3),
+            **stats,
+        }
+
+    def prometheus(self) -> str:
+        """Parse metrics from the workers plus the service counters, in Prometheus text format."""
+        health = self.health()
+        gauges = [
+            ("hsbc_parser_service_requests_total", "counter", "Parse requests received", health["requests"]),
+            ("hsbc_parser_service_ok_total", "counter", "Parse requests answered successfully", health["ok"]),
+            ("hsbc_parser_service_errors_total", "counter", "Parse requests that failed", health["errors"]),
+            ("hsbc_parser_service_rejected_total", "counter", "Requests rejected with 503 (queue full)", health["rejected"]),
+            ("hsbc_parser_service_timeouts_total", "counter", "Parses stopped at the request timeout", health["timeouts"]),
+            ("hsbc_parser_service_pool_restarts_total", "counter", "Worker pool rebuilds", health["restarts"]),
+            ("hsbc_parser_service_inflight", "gauge", "Requests queued or running", health["inflight"]),
+            ("hsbc_parser_service_uptime_seconds", "gauge", "Seconds since the service started", health["uptime_s"]),
+        ]
+        return metrics.REGISTRY.render(gauges)
+
+    def close(self) -> None:
+        with self._pool_lock:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "ParseHTTPServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send_json(self, status: int, payload: Any, headers: Dict[str, str] | None = None) -> None:
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        path = urlparse(self.path).path
+        if path == "/health":
+            self._send_json(200, self.server.service.health())
+        elif path == "/metrics":
+            body = self.server.service.prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        if url.path != "/parse":
+            self._send_json(404, {"error": "not found"})
+            return
+
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > self.server.max_upload_bytes:
+            self._send_json(413, {"error": f"upload larger than {self.server.max_upload_bytes} bytes"})
+            return
+        body = self.rfile.read(length)
+        content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+
+        try:
+            if content_type == "application/json":
+                req = json.loads(body or b"{}")
+                tipo = _TIPOS[req.get("type", query.get("type", "auto"))]
+                if not req.get("path"):
+                    self._send_json(400, {"error": "JSON body must include 'path'"})
+                    return
+                result = self.server.service.parse_path(str(req["path"]), tipo)
+            else:
+                tipo = _TIPOS[query.get("type", "auto")]
+                if not body:
+                    self._send_json(400, {"error": "empty upload"})
+                    return
+                name = Path(query.get("name") or "upload.pdf").name
+                result = self.server.service.parse_upload(body, name, tipo)
+        except KeyError:
+            self._send_json(400, {"error": f"unknown type; expected one of {sorted(_TIPOS)}"})
+        except json.JSONDecodeError as e:
+            self._send_json(400, {"error": f"invalid JSON: {e}"})
+        except QueueFull:
+            self._send_json(503, {"error": "parse queue is full"}, headers={"Retry-After": "1"})
+        except ParseTimeout as e:
+            self._send_json(504, {"error": str(e)})
+        except BrokenProcessPool:
+            logger.exception("Parse worker died twice on one request")
+            self._send_json(503, {"error": "parse worker died"}, headers={"Retry-After": "1"})
+        except Exception as e:
+            logger.exception("Parse request failed")
+            self._send_json(422, {"error": f"{type(e).__name__}: {e}"})
+        else:
+            self._send_json(200, result)
+
+
+class ParseHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service: ParseService, *, max_upload_bytes: int = 50 * 1024 * 1024):
+        super().__init__(address, _Handler)
+        self.service = service
+        self.max_upload_bytes = max_upload_bytes
+
+
+def make_server(
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    *,
+    workers: int = 2,
+    queue_size: int = 8,
+    max_upload_bytes: int = 50 * 1024 * 1024,
+    timeout: float | None = 120.0,
+) -> ParseHTTPServer:
+    """Create (but don't start) the HTTP server; call `.serve_forever()` and finally `.service.close()`."""
+    service = ParseService(workers=workers, queue_size=queue_size, timeout=timeout)
+    return ParseHTTPServer((host, port), service, max_upload_bytes=max_upload_bytes)
+
+
+def main(argv: Iterable[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Local HTTP service: POST a PDF (or a JSON {\"path\": ...}) to /parse, get JSON back."
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port (default: 8765)")
+    parser.add_argument("--workers", type=int, default=2, help="Worker processes (default: 2)")
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=8,
+        help="Requests allowed to wait for a worker before answering 503 (default: 8)",
+    )
+    parser.add_argument("--max-upload-mb", type=float, default=50, help="Max upload size in MB (default: 50)")
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=120.0,
+        help="Per-request parse time limit in seconds; slower parses get 504 and their worker is killed (default: 120)",
+    )
+    parser.add_argument("--no-metrics", action="store_true", help="Don't collect the parse metrics served at /metrics")
+    parser.add_argument("--log-file", default="data/logs/hsbc_parser.log", help="Log file path")
+    parser.add_argument("--log-level", default="INFO", help="Log level (default: INFO)")
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    configure_logging(log_file=args.log_file, level=args.log_level)
+    metrics.enable(not args.no_metrics)
+
+    httpd = make_server(
+        args.host,
+        args.port,
+        workers=args.workers,
+        queue_size=args.queue_size,
+        max_upload_bytes=int(args.max_upload_mb * 1024 * 1024),
+        timeout=args.timeout,
+    )
+    host, port = httpd.server_address[:2]
+    logger.info("Serving on http://%s:%d (workers=%d, queue=%d)", host, port, args.workers, args.queue_size)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        httpd.service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import csv
+import hashlib
+import heapq
+import json
+from pathlib import Path
+from typing import Iterator, List, Sequence, Tuple
+
+from .export import TABLES
+from .io_utils import open_text
+from .logging_utils import get_logger
+
+logger = get_logger("shards")
+
+
+def parse_shard_spec(spec: str) -> Tuple[int, int]:
+    """Parse 'i/N' (1-based, e.g. '2/4') into (i, N)."""
+    try:
+        i_raw, n_raw = spec.split("/")
+        i, n = int(i_raw), int(n_raw)
+    except ValueError:
+        raise ValueError(f"invalid shard spec {spec!r}; expected i/N, e.g. 1/4") from None
+    if n < 1 or not 1 <= i <= n:
+        raise ValueError(f"invalid shard spec {spec!r}; need 1 <= i <= N")
+    return i, n
+
+
+def shard_dir_name(i: int, n: int) -> str:
+    return f"shard-{i}-of-{n}"
+
+
+def shard_of(key: str, n: int) -> int:
+    """Deterministic 1-based shard for `key` (same answer on every machine and Python version)."""
+    digest = hashlib.sha1(key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % n + 1
+
+
+def _is_jsonl(path: Path) -> bool:
+    return ".jsonl" in path.suffixes
+
+
+def _iter_records(path: Path) -> Iterator[Tuple[List[str], str]]:
+    """Yield (parsed row, raw text) per record; raw text keeps quoting exactly as written.
+
+    For JSON lines the parsed row is just `[archivo]`, which is all the merge needs.
+    """
+    if _is_jsonl(path):
+        with open_text(path, "r") as f:
+            for line in f:
+                if line.strip():
+                    yield [json.loads(line).get("archivo") or ""], line
+        return
+    with open_text(path, "r") as f:
+        consumed: List[str] = []
+
+        def lines() -> Iterator[str]:
+            for line in f:
+                consumed.append(line)
+                yield line
+
+        for row in csv.reader(lines()):
+            raw = "".join(consumed)
+            consumed.clear()
+            yield row, raw
+
+
+def merge_csv(inputs: Sequence[Path], out_path: Path) -> int:
+    """Streaming k-way merge of CSVs that are each sorted by their first column (`archivo`).
+
+    Records are copied verbatim; rows of the same `archivo` keep their original relative order.
+    JSON-lines inputs (merged by their `archivo` key) and `.gz` / `.xz` files work the same way.
+    Returns the number of data rows written.
+    """
+    header_raw = None
+    streams = []
+    for path in inputs:
+        if not path.exists():
+            continue
+        records = _iter_records(path)
+        if _is_jsonl(path):
+            streams.append(records)
+            continue
+        first = next(records, None)
+        if first is None:
+            continue
+        if header_raw is None:
+            header_raw = first[1]
+        elif first[1] != header_raw:
+            raise ValueError(f"{path}: header differs from the other shards")
+        streams.append(records)
+
+    rows = 0
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with open_text(out_path, "w") as out:
+        if header_raw is not None:
+            out.write(header_raw)
+        for _, raw in heapq.merge(*streams, key=lambda rec: rec[0][0] if rec[0] else ""):
+            out.write(raw)
+            rows += 1
+    return rows
+
+
+def expand_shard_dirs(dirs: Sequence[str | Path]) -> List[Path]:
+    """Accept shard output folders directly, or a parent folder containing `shard-*` folders."""
+    out: List[Path] = []
+    for d in map(Path, dirs):
+        children = sorted(p for p in d.glob("shard-*") if p.is_dir())
+        out.extend(children if children and not any(d.glob("statements.*")) else [d])
+    return out
+
+
+def transaction_files(source: str | Path) -> List[Path]:
+    """`transactions.*` files of an output folder (flat, sharded or partitioned layout), or the file itself.
+
+    A folder with its own `transactions.*` is a flat (or merged) output and only those are read, even next to the
+    `shard-*` folders it was merged from; otherwise each `shard-*` folder is read, or the whole partitioned tree.
+    """
+    root = Path(source)
+    if root.is_file():
+        return [root]
+    top = sorted(root.glob("transactions.*"))
+    if top:
+        return top
+    shards = [d for d in expand_shard_dirs([root]) if d != root]
+    if shards:
+        return [p for d in shards for p in transaction_files(d)]
+    return sorted(root.rglob("transactions.*"))
+
+
+def _output_name(dirs: Sequence[Path], table: str) -> str:
+    """File name the shards used for `table` (e.g. `transactions.csv.gz`); all shards must agree."""
+    names = {p.name for d in dirs for p in d.glob(f"{table}.*")}
+    if len(names) > 1:
+        raise ValueError(f"shards mix output formats for {table}: {sorted(names)}")
+    return names.pop() if names else f"{table}.csv"
+
+
+def merge_outputs(shard_dirs: Sequence[str | Path], out_dir: str | Path) -> dict:
+    """Merge per-shard statements/transactions/warnings files into `out_dir` in canonical (archivo) order.
+
+    The output keeps the shards' format and compression. Returns data row counts per table.
+    """
+    dirs = expand_shard_dirs(shard_dirs)
+    out = Path(out_dir)
+    counts = {}
+    for table in TABLES:
+        name = _output_name(dirs, table)
+        counts[table] = merge_csv([d / name for d in dirs], out / name)
+    logger.info("Merged %d shard folders into %s: %s", len(dirs), out, counts)
+    return counts
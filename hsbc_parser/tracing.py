@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+
+class Tracer:
+    """Timeline spans in Chrome trace-event format (open the file in chrome://tracing or ui.perfetto.dev).
+
+    Disabled by default; `span()` then returns a shared no-op context manager. Each span becomes a complete
+    ("X") event stamped with the recording process and thread ids and wall-clock microseconds, so events
+    drained from worker processes (`drain()` / `merge()`) line up with the parent's on one timeline.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._events: List[Dict[str, Any]] = []
+
+    def enable(self, on: bool = True) -> None:
+        self.enabled = on
+        if on:
+            # Metadata event so the viewer labels the row with the process name instead of its pid.
+            self.record(
+                {
+                    "ph": "M",
+                    "name": "process_name",
+                    "pid": os.getpid(),
+                    "tid": 0,
+                    "args": {"name": f"{multiprocessing.current_process().name} ({os.getpid()})"},
+                }
+            )
+
+    def record(self, event: Dict[str, Any]) -> None:
+        with self._lock:
+            self._events.append(event)
+
+    def drain(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            events, self._events = self._events, []
+        return events
+
+    def merge(self, events: Iterable[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._events.extend(events)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._events.clear()
+
+    def events(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._events)
+
+    def write(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        events = sorted(self.events(), key=lambda e: (e["ph"] != "M", e.get("ts", 0)))
+        with path.open("w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False, default=str)
+
+
+class _Span:
+    __slots__ = ("name", "args", "ts", "t0")
+
+    def __init__(self, name: str, args: Dict[str, Any]):
+        self.name = name
+        self.args = args
+
+    def __enter__(self) -> "_Span":
+        self.ts = time.time_ns() // 1000
+        self.t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        TRACER.record(
+            {
+                "ph": "X",
+                "name": self.name,
+                "cat": "hsbc_parser",
+                "ts": self.ts,
+                "dur": (time.perf_counter_ns() - self.t0) // 1000,
+                "pid": os.getpid(),
+                "tid": threading.get_native_id(),
+                "args": self.args,
+            }
+        )
+
+
+TRACER = Tracer()
+_NULL = nullcontext()
+# Called as hook(name, args, span) to wrap every span (memory profiling); see `memprof.MemoryProfiler.start`.
+_stage_hook = None
+
+
+def enable(on: bool = True) -> None:
+    TRACER.enable(on)
+
+
+def enabled() -> bool:
+    return TRACER.enabled
+
+
+def set_stage_hook(hook) -> None:
+    global _stage_hook
+    _stage_hook = hook
+
+
+def span(name: str, **args: Any):
+    """Context manager recording one span; a shared no-op when tracing (and memory profiling) is off."""
+    inner = _Span(name, args) if TRACER.enabled else _NULL
+    return inner if _stage_hook is None else _stage_hook(name, args, inner)
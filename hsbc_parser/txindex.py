@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+from pathlib import Path
+from typing import Tuple
+
+from .logging_utils import get_logger
+from .parsers.types import Transaction
+from .parsers.utils import normalize_description
+
+logger = get_logger("txindex")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tx (
+    fingerprint TEXT NOT NULL,
+    installment INTEGER NOT NULL,
+    archivo TEXT NOT NULL,
+    installment_total INTEGER,
+    PRIMARY KEY (fingerprint, installment, archivo)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tx_archivo ON tx (archivo);
+"""
+
+
+def transaction_fingerprint(t: Transaction) -> str:
+    """Stable key for "the same purchase": origen, fecha, amount in cents, operation_id, normalized description.
+
+    Installment numbers are deliberately left out, so `C.07/18` and `C.08/18` of one purchase share a fingerprint.
+    """
+    key = "|".join(
+        (
+            t.origen or "",
+            t.fecha or "",
+            str(round((t.importe or 0.0) * 100)),
+            (t.operation_id or "").rstrip("*"),
+            normalize_description(t.descripcion),
+        )
+    )
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=10).hexdigest()
+
+
+class TransactionIndex:
+    """Persistent (SQLite) index of exported transactions, used to flag rows already seen in other statements.
+
+    `update(parser)` checks every transaction of one statement against rows from *other* statements
+    (one primary-key lookup per row) and then records them:
+
+    - DUPLICATE_TRANSACTION (WARNING): same fingerprint and installment number, e.g. an overlapping re-download.
+    - INSTALLMENT_CONTINUATION (INFO): same purchase, another installment (`C.08/18` after `C.07/18`).
+
+    Re-indexing a statement replaces its rows, so re-runs over the same inputs are idempotent.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path))
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def __enter__(self) -> "TransactionIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._db.commit()
+        self._db.close()
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM tx").fetchone()[0]
+
+    def _others(self, fingerprint: str, archivo: str) -> list[Tuple[int, str]]:
+        return self._db.execute(
+            "SELECT installment, archivo FROM tx WHERE fingerprint = ? AND archivo <> ? ORDER BY installment, archivo",
+            (fingerprint, archivo),
+        ).fetchall()
+
+    def update(self, parser) -> Tuple[int, int]:
+        """Flag and index one parsed statement; returns (duplicates, installment continuations)."""
+        if parser.statement is None:
+            return 0, 0
+        archivo = parser.statement.archivo
+        duplicates = continuations = 0
+        rows = []
+        with self._db:
+            self._db.execute("DELETE FROM tx WHERE archivo = ?", (archivo,))
+            for i, t in enumerate(parser.transactions):
+                fp = transaction_fingerprint(t)
+                installment = t.installment_number or 0
+                rows.append((fp, installment, archivo, t.installment_total))
+                others = self._others(fp, archivo)
+                if not others:
+                    continue
+                context = {"row": i, "fecha": t.fecha, "importe": t.importe, "descripcion": t.descripcion}
+                same = [a for n, a in others if n == installment]
+                if same:
+                    duplicates += 1
+                    parser.warn(
+                        "WARNING",
+                        "DUPLICATE_TRANSACTION",
+                        "Transaction already exported from another statement",
+                        {**context, "other_archivo": same[0]},
+                    )
+                elif installment:
+                    previous = max(others, key=lambda o: (o[0] < installment, o[0]))
+                    continuations += 1
+                    parser.warn(
+                        "INFO",
+                        "INSTALLMENT_CONTINUATION",
+                        "Installment of a purchase already exported from another statement",
+                        {
+                            **context,
+                            "installment": f"{installment}/{t.installment_total}",
+                            "other_archivo": previous[1],
+                            "other_installment": previous[0],
+                        },
+                    )
+            self._db.executemany("INSERT OR IGNORE INTO tx VALUES (?, ?, ?, ?)", rows)
+        logger.debug("Indexed %s: %d rows, %d duplicates, %d continuations", archivo, len(rows), duplicates, continuations)
+        return duplicates, continuations
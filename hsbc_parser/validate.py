@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import bisect
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .logging_utils import get_logger
+from .parsers.types import Statement
+from .parsers.types import warn as _warn
+
+logger = get_logger("validate")
+
+BALANCE_TOLERANCE = 0.01
+_CURRENCIES = ("ars", "usd")
+_FLOAT_FIELDS = ("saldo_anterior_ars", "saldo_anterior_usd", "saldo_actual_ars", "saldo_actual_usd")
+
+
+def statement_from_row(row: Dict[str, str]) -> Statement:
+    """Rebuild a `Statement` from a statements.csv row (empty cells -> None)."""
+    values: Dict[str, Any] = {k: (v if v != "" else None) for k, v in row.items() if k in Statement.__dataclass_fields__}
+    for name in _FLOAT_FIELDS:
+        if values.get(name) is not None:
+            values[name] = float(values[name])
+    return Statement(**values)
+
+
+def _iso(value: Optional[str]) -> Optional[date]:
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def _sort_key(s: Statement) -> Tuple[str, str, str]:
+    return (s.fecha_hasta or "", s.fecha_desde or "", s.archivo)
+
+
+class BalanceChain:
+    """Statements of each `origen`, kept sorted by (fecha_hasta, fecha_desde, archivo), checked link by link.
+
+    For every pair of consecutive statements (prev, cur) of the same origen:
+
+    - STATEMENT_GAP: `cur.fecha_desde` is more than one day after `prev.fecha_hasta` (a missing statement);
+      STATEMENT_OVERLAP: the periods overlap. Balances aren't compared across a gap.
+    - BALANCE_CHAIN_MISMATCH: `cur.saldo_anterior_<ars|usd>` != `prev.saldo_actual_<ars|usd>`.
+
+    Warnings are attributed to `cur`. The constructor sorts each chain once and `check()` is one pass over
+    them; `add()` inserts a new statement by binary search and checks only the links it changes, for
+    incremental use (e.g. watch mode).
+    """
+
+    def __init__(self, statements: Iterable[Statement] = ()):
+        self._chains: Dict[str, List[Statement]] = {}
+        for s in statements:
+            self._chains.setdefault(s.origen, []).append(s)
+        for chain in self._chains.values():
+            chain.sort(key=_sort_key)
+        self._keys: Dict[str, List[Tuple[str, str, str]]] = {
+            origen: [_sort_key(s) for s in chain] for origen, chain in self._chains.items()
+        }
+
+    def __len__(self) -> int:
+        return sum(len(c) for c in self._chains.values())
+
+    def add(self, statement: Statement) -> List[Dict[str, Any]]:
+        """Insert one statement; returns warnings for the links to its neighbours.
+
+        When it lands between two statements, their link no longer exists: any warnings it had (e.g. the
+        STATEMENT_GAP this statement fills) are retracted with one CHAIN_WARNING_RETRACTED (INFO) record.
+        """
+        keys = self._keys.setdefault(statement.origen, [])
+        chain = self._chains.setdefault(statement.origen, [])
+        key = _sort_key(statement)
+        i = bisect.bisect_right(keys, key)
+        keys.insert(i, key)
+        chain.insert(i, statement)
+        warnings: List[Dict[str, Any]] = []
+        if 0 < i < len(chain) - 1:
+            prev, nxt = chain[i - 1], chain[i + 1]
+            codes = [code for code, _, _ in self._link_issues(prev, nxt)]
+            if codes:
+                _warn(
+                    warnings,
+                    nxt.archivo,
+                    "INFO",
+                    "CHAIN_WARNING_RETRACTED",
+                    "A statement was inserted before this one: the warnings against the previous one no longer apply",
+                    {
+                        "previous_archivo": prev.archivo,
+                        "inserted_archivo": statement.archivo,
+                        "origen": statement.origen,
+                        "codes": codes,
+                    },
+                    logger=logger,
+                )
+        if i > 0:
+            self._check_link(chain[i - 1], chain[i], warnings)
+        if i + 1 < len(chain):
+            self._check_link(chain[i], chain[i + 1], warnings)
+        return warnings
+
+    def check(self) -> List[Dict[str, Any]]:
+        """Check every link of every chain (sorted by origen, then date); returns warning records."""
+        warnings: List[Dict[str, Any]] = []
+        for origen in sorted(self._chains):
+            chain = self._chains[origen]
+            for prev, cur in zip(chain, chain[1:]):
+                self._check_link(prev, cur, warnings)
+        logger.debug("Checked %d statements: %d chain warnings", len(self), len(warnings))
+        return warnings
+
+    @classmethod
+    def _check_link(cls, prev: Statement, cur: Statement, warnings: List[Dict[str, Any]]) -> None:
+        for code, message, context in cls._link_issues(prev, cur):
+            _warn(warnings, cur.archivo, "WARNING", code, message, context, logger=logger)
+
+    @staticmethod
+    def _link_issues(prev: Statement, cur: Statement) -> List[Tuple[str, str, Dict[str, Any]]]:
+        base = {"previous_archivo": prev.archivo, "origen": cur.origen}
+        issues: List[Tuple[str, str, Dict[str, Any]]] = []
+        prev_end, cur_start = _iso(prev.fecha_hasta), _iso(cur.fecha_desde)
+        if prev_end is not None and cur_start is not None:
+            days = (cur_start - prev_end).days
+            period = {**base, "previous_fecha_hasta": prev.fecha_hasta, "fecha_desde": cur.fecha_desde, "days": days}
+            if days > 1:
+                message = "Statement period does not start right after the previous statement (missing statement?)"
+                return [("STATEMENT_GAP", message, period)]
+            if days < 1:
+                issues.append(("STATEMENT_OVERLAP", "Statement period overlaps the previous statement", period))
+        for moneda in _CURRENCIES:
+            closing = getattr(prev, f"saldo_actual_{moneda}")
+            opening = getattr(cur, f"saldo_anterior_{moneda}")
+            if closing is None or opening is None:
+                continue
+            if abs(opening - closing) > BALANCE_TOLERANCE:
+                issues.append(
+                    (
+                        "BALANCE_CHAIN_MISMATCH",
+                        "Opening balance differs from the previous statement's closing balance",
+                        {
+                            **base,
+                            "moneda": moneda.upper(),
+                            "saldo_actual_previo": closing,
+                            "saldo_anterior": opening,
+                            "diff": round(opening - closing, 2),
+                        },
+                    )
+                )
+        return issues
+
+
+def check_balance_chain(statements: Iterable[Statement]) -> List[Dict[str, Any]]:
+    """Corpus-level check of consecutive statements per origen (see `BalanceChain`)."""
+    return BalanceChain(statements).check()
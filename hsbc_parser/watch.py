@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import csv
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from . import metrics
+from .batch import SupervisedPool
+from .export import export_csv
+from .logging_utils import get_logger
+from .parsers.types import DEFAULT_WARNING_SAMPLES
+from .validate import BalanceChain, statement_from_row
+
+logger = get_logger("watch")
+
+
+def _exported_statements(out_dir: Path) -> List[Dict[str, str]]:
+    """Rows already present in statements.csv (so restarts don't duplicate rows)."""
+    path = out_dir / "statements.csv"
+    if not path.exists():
+        return []
+    with path.open(newline="", encoding="utf-8") as f:
+        return [row for row in csv.DictReader(f) if row.get("archivo")]
+
+
+def _failed_inputs(out_dir: Path) -> Set[str]:
+    """Files with an ERROR row in warnings.csv: failed in an earlier run, so restarts don't retry them."""
+    path = out_dir / "warnings.csv"
+    if not path.exists():
+        return set()
+    with path.open(newline="", encoding="utf-8") as f:
+        return {row["archivo"] for row in csv.DictReader(f) if row.get("archivo") and row.get("level") == "ERROR"}
+
+
+@dataclass
+class _Candidate:
+    size: int
+    mtime_ns: int
+    stable_polls: int = 0
+
+
+class StableFileTracker:
+    """Track files across polls and report them once their size/mtime stopped changing.
+
+    A file copied into the folder grows over several polls; it becomes ready after its (size, mtime)
+    stayed identical for `settle_polls` consecutive polls. Empty files are never ready.
+    """
+
+    def __init__(self, settle_polls: int = 1):
+        self.settle_polls = max(1, settle_polls)
+        self._candidates: Dict[Path, _Candidate] = {}
+
+    def poll(self, paths: List[Path]) -> List[Path]:
+        ready: List[Path] = []
+        seen = set()
+        for path in paths:
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            seen.add(path)
+            cand = self._candidates.get(path)
+            if cand is None or (cand.size, cand.mtime_ns) != (st.st_size, st.st_mtime_ns) or st.st_size == 0:
+                self._candidates[path] = _Candidate(st.st_size, st.st_mtime_ns)
+                continue
+            cand.stable_polls += 1
+            if cand.stable_polls >= self.settle_polls:
+                ready.append(path)
+                del self._candidates[path]
+        for gone in set(self._candidates) - seen:
+            del self._candidates[gone]
+        return ready
+
+
+def watch(
+    input_dir: str | Path,
+    out_dir: str | Path,
+    *,
+    tipo: str | None = None,
+    interval: float = 2.0,
+    settle_polls: int = 1,
+    workers: int = 2,
+    stop_event: Optional[threading.Event] = None,
+    max_cycles: int | None = None,
+    cache=None,
+    timeout: float | None = None,
+    max_pages: int | None = None,
+    max_tasks_per_worker: int | None = None,
+    max_worker_rss_mb: float | None = None,
+    tx_index=None,
+    check_chain: bool = False,
+    metrics_file: str | Path | None = None,
+    warning_samples: int | None = DEFAULT_WARNING_SAMPLES,
+) -> int:
+    """Poll `input_dir` for new PDFs, parse them in a warm worker pool and append to the CSVs in `out_dir`.
+
+    Files already listed in `out_dir/statements.csv`, or with an ERROR row in `warnings.csv` (failed before), are
+    skipped, so the watcher can be restarted safely; remove a failed file's ERROR rows to have it retried.
+    A file is picked up once its size stayed stable between polls (partially-copied PDFs are not parsed).
+    Failing files never stop the watcher: they are reported in warnings.csv like `--keep-going` does.
+    With a `TransactionIndex` as `tx_index`, each new statement is checked against everything exported before.
+    With `check_chain=True`, each new statement is linked into a `BalanceChain` seeded from statements.csv.
+    With `metrics_file`, metrics are enabled and the Prometheus textfile is rewritten after every batch.
+    Runs until `stop_event` is set, `max_cycles` polls have been done, or Ctrl+C.
+
+    Returns the number of PDFs parsed.
+    """
+    in_dir = Path(input_dir)
+    out = Path(out_dir)
+    if metrics_file is not None:
+        metrics.enable()
+    exported = _exported_statements(out)
+    done = {row["archivo"] for row in exported} | _failed_inputs(out)
+    chain = BalanceChain(statement_from_row(row) for row in exported) if check_chain else None
+    tracker = StableFileTracker(settle_polls=settle_polls)
+    options = {"max_pages": max_pages, "cache": cache, "keep_going": True, "warning_samples": warning_samples}
+    parsed = 0
+    cycles = 0
+
+    logger.info("Watching %s (interval=%.1fs, workers=%d, already exported=%d)", in_dir, interval, workers, len(done))
+    pool = SupervisedPool(
+        workers,
+        timeout=timeout,
+        max_tasks_per_worker=max_tasks_per_worker,
+        max_worker_rss_mb=max_worker_rss_mb,
+    )
+    with pool.start():
+        try:
+            while True:
+                candidates = [p for p in sorted(in_dir.glob("*.pdf")) if p.name not in done]
+                ready = tracker.poll(candidates)
+                if ready:
+                    parsers, failures = [], []
+                    for result in pool.run(ready, tipo, options):
+                        done.add(Path(result.path).name)
+                        if result.ok:
+                            parsers.append(result.parser)
+                        else:
+                            failures.append(result.warning())
+                    for p in parsers:
+                        if tx_index is not None:
+                            tx_index.update(p)
+                        if chain is not None:
+                            failures.extend(chain.add(p.statement))
+                    with metrics.timed("export"):
+                        export_csv(parsers, out, append=True, extra_warnings=failures, frames=False)
+                    parsed += len(parsers)
+                    if metrics_file is not None:
+                        metrics.REGISTRY.write(metrics_file)
+                    logger.info(
+                        "Parsed %d new PDFs (%d failed): %s",
+                        len(parsers),
+                        len(failures),
+                        ", ".join(p.name for p in ready),
+                    )
+
+                cycles += 1
+                if max_cycles is not None and cycles >= max_cycles:
+                    break
+                if stop_event is not None and stop_event.wait(interval):
+                    break
+                if stop_event is None:
+                    time.sleep(interval)
+        except KeyboardInterrupt:
+            logger.info("Stopping watcher")
+    return parsed
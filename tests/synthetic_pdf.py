@@ -0,0 +1,62 @@
+"""Minimal text-only PDF builder for tests (no extra dependencies).
+
+Each page is a block of text; every line becomes one Helvetica text row, which pdfplumber extracts
+back line by line (blank lines are dropped by the extractor).
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List
+
+
+def _escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def build_text_pdf(pages: List[str]) -> bytes:
+    objs: List[bytes | None] = []
+
+    def add(body: bytes) -> int:
+        objs.append(body)
+        return len(objs)
+
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    objs.append(None)
+    pages_id = len(objs)
+    kids = []
+    for text in pages:
+        ops = ["BT", "/F1 9 Tf", "11 TL", "36 806 Td"]
+        ops.extend(f"({_escape(line)}) Tj T*" for line in text.split("\n"))
+        ops.append("ET")
+        stream = "\n".join(ops).encode("cp1252")
+        contents = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        kids.append(
+            add(
+                b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] "
+                b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (pages_id, font, contents)
+            )
+        )
+    objs[pages_id - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids),
+        len(kids),
+    )
+    catalog = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objs, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + (body or b"") + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1)
+    for off in offsets:
+        out += b"%010d 00000 n \n" % off
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objs) + 1, catalog, xref)
+    return bytes(out)
+
+
+def write_text_pdf(path: str | Path, pages: List[str]) -> Path:
+    path = Path(path)
+    path.write_bytes(build_text_pdf(pages))
+    return path
@@ -0,0 +1,103 @@
+import asyncio
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from synthetic_pdf import write_text_pdf
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+class TestAsyncApi(unittest.TestCase):
+    def test_parse_many_async_matches_sync_api(self):
+        from hsbc_parser.aio import parse_many_async
+        from hsbc_parser.dispatcher import parse_pdf
+
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for name in ("visa", "mastercard", "cuenta"):
+                page = (FIXTURES_DIR / f"{name}_full_page.txt").read_text(encoding="utf-8")
+                paths.append(str(write_text_pdf(Path(tmp) / f"HSBC {name}.pdf", [page])))
+
+            results = asyncio.run(parse_many_async(paths, max_concurrency=2))
+            expected = [parse_pdf(p) for p in paths]
+
+        self.assertEqual([r.statement for r in results], [e.statement for e in expected])
+        self.assertEqual([r.transactions for r in results], [e.transactions for e in expected])
+        self.assertEqual([r.statement.origen for r in results], ["visa", "mastercard", "cuenta"])
+
+    def test_parse_options_are_passed_to_parse_pdf(self):
+        from hsbc_parser import aio
+
+        calls = []
+
+        def fake_parse(path, tipo=None, **kwargs):
+            calls.append((path, tipo, kwargs))
+            return path
+
+        with mock.patch.object(aio, "parse_pdf", fake_parse):
+            asyncio.run(aio.parse_pdf_async("a.pdf", "visa", max_pages=3))
+            asyncio.run(aio.parse_many_async(["b.pdf"], warning_samples=None))
+
+        self.assertEqual(calls, [("a.pdf", "visa", {"max_pages": 3}), ("b.pdf", None, {"warning_samples": None})])
+
+    def test_max_pages_is_enforced_on_a_real_pdf(self):
+        from hsbc_parser.aio import parse_pdf_async
+        from hsbc_parser.dispatcher import PageLimitExceeded
+
+        page = (FIXTURES_DIR / "visa_full_page.txt").read_text(encoding="utf-8")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(write_text_pdf(Path(tmp) / "HSBC visa.pdf", [page, page]))
+            with self.assertRaises(PageLimitExceeded):
+                asyncio.run(parse_pdf_async(path, max_pages=1))
+
+    def test_parse_many_async_limits_concurrency(self):
+        from hsbc_parser import aio
+
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        def fake_parse(path, tipo=None):
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.02)
+            with lock:
+                state["running"] -= 1
+            return path
+
+        with mock.patch.object(aio, "parse_pdf", fake_parse):
+            out = asyncio.run(aio.parse_many_async([f"{i}.pdf" for i in range(8)], max_concurrency=3))
+
+        self.assertEqual(out, [f"{i}.pdf" for i in range(8)])
+        self.assertLessEqual(state["peak"], 3)
+
+    def test_cancellation_stops_pending_parses(self):
+        from hsbc_parser import aio
+
+        started = []
+
+        def fake_parse(path, tipo=None):
+            started.append(path)
+            time.sleep(0.05)
+            return path
+
+        async def run():
+            task = asyncio.ensure_future(aio.parse_many_async([f"{i}.pdf" for i in range(10)], max_concurrency=1))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        with mock.patch.object(aio, "parse_pdf", fake_parse):
+            asyncio.run(run())
+            time.sleep(0.1)
+
+        self.assertLess(len(started), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from synthetic_pdf import write_text_pdf
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+def _fixture(name: str) -> str:
+    return (FIXTURES_DIR / name).read_text(encoding="utf-8")
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_page_limit_reports_error_and_keeps_going(self):
+        from hsbc_parser.batch import run_batch
+
+        big = write_text_pdf(self.tmp / "big.pdf", [_fixture("visa_full_page.txt")] * 3)
+        ok = write_text_pdf(self.tmp / "ok.pdf", [_fixture("cuenta_full_page.txt")])
+
+        results = list(run_batch([big, ok], max_pages=2))
+
+        self.assertEqual([r.ok for r in results], [False, True])
+        w = results[0].warning()
+        self.assertEqual((w["archivo"], w["level"], w["code"]), ("big.pdf", "ERROR", "PAGE_LIMIT_EXCEEDED"))
+        self.assertEqual(w["context"]["stage"], "extract")
+        self.assertEqual(w["context"]["pages"], 3)
+        self.assertEqual(results[1].parser.statement.origen, "cuenta")
+
+    def test_worker_pool_matches_in_process_results_in_input_order(self):
+        from hsbc_parser.batch import run_batch
+
+        paths = [
+            write_text_pdf(self.tmp / f"{i}-{name}.pdf", [_fixture(f"{name}_full_page.txt")])
+            for i, name in enumerate(["visa", "mastercard", "cuenta", "visa"])
+        ]
+        serial = list(run_batch(paths))
+        pooled = list(run_batch(paths, workers=2, timeout=60))
+
+        self.assertEqual([r.path for r in pooled], [str(p) for p in paths])
+        self.assertEqual([r.parser.transactions for r in pooled], [r.parser.transactions for r in serial])
+
+    def test_workers_are_recycled_after_n_files_or_rss_threshold(self):
+        from hsbc_parser.batch import run_batch
+
+        paths = [write_text_pdf(self.tmp / f"{i}.pdf", [_fixture("visa_full_page.txt")]) for i in range(6)]
+
+        by_count = list(run_batch(paths, workers=1, max_tasks_per_worker=2))
+        self.assertTrue(all(r.ok for r in by_count))
+        self.assertEqual(len({r.worker_pid for r in by_count}), 3)
+        self.assertTrue(all(r.worker_rss and r.worker_rss > 0 for r in by_count))
+
+        by_rss = list(run_batch(paths[:3], workers=1, max_worker_rss_mb=0.001))
+        self.assertEqual(len({r.worker_pid for r in by_rss}), 3)
+
+    @unittest.skipUnless(hasattr(os, "mkfifo"), "needs named pipes")
+    def test_hanging_file_is_killed_after_timeout(self):
+        from hsbc_parser.batch import run_batch
+
+        # Opening a FIFO with no writer blocks forever: a stand-in for a PDF that hangs extraction.
+        hang = self.tmp / "hang.pdf"
+        os.mkfifo(hang)
+        ok = write_text_pdf(self.tmp / "ok.pdf", [_fixture("visa_full_page.txt")])
+
+        t0 = time.perf_counter()
+        results = list(run_batch([hang, ok], workers=1, timeout=1.0))
+        elapsed = time.perf_counter() - t0
+
+        self.assertLess(elapsed, 30)
+        self.assertEqual(results[0].code, "PARSE_TIMEOUT")
+        self.assertEqual(results[0].warning()["context"]["stage"], "extract")
+        self.assertTrue(results[1].ok)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from synthetic_pdf import write_text_pdf
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+class TestParseCache(unittest.TestCase):
+    def test_cache_hit_returns_same_records_and_renames_archivo(self):
+        from hsbc_parser.cache import ParseCache
+        from hsbc_parser.dispatcher import parse_pdf
+
+        page = (FIXTURES_DIR / "mastercard_full_page.txt").read_text(encoding="utf-8")
+        with tempfile.TemporaryDirectory() as tmp:
+            a = write_text_pdf(Path(tmp) / "a.pdf", [page])
+            b = write_text_pdf(Path(tmp) / "b.pdf", [page])
+            cache = ParseCache(Path(tmp) / "cache")
+
+            first = parse_pdf(str(a), cache=cache)
+            again = parse_pdf(str(a), cache=cache)
+            renamed = parse_pdf(str(b), cache=cache)
+
+        self.assertEqual((cache.misses, cache.hits), (1, 2))
+        self.assertEqual(again.statement, first.statement)
+        self.assertEqual(again.transactions, first.transactions)
+        self.assertEqual(again.warnings, first.warnings)
+        self.assertEqual(renamed.statement.archivo, "b.pdf")
+        self.assertTrue(all(t.archivo == "b.pdf" for t in renamed.transactions))
+
+    def test_fingerprint_change_only_invalidates_that_parser(self):
+        from hsbc_parser import cache as cache_mod
+        from hsbc_parser.parsers.cuenta import HSBCCajaAhorroParser
+        from hsbc_parser.parsers.visa import HSBCVisaParser
+
+        visa_pages = [(FIXTURES_DIR / "visa_full_page.txt").read_text(encoding="utf-8")]
+        cuenta_pages = [(FIXTURES_DIR / "cuenta_full_page.txt").read_text(encoding="utf-8")]
+        self.assertNotEqual(cache_mod.parser_fingerprint("visa"), cache_mod.parser_fingerprint("cuenta"))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = cache_mod.ParseCache(tmp)
+            for kind, cls, pages in (("visa", HSBCVisaParser, visa_pages), ("cuenta", HSBCCajaAhorroParser, cuenta_pages)):
+                p = cls(f"{kind}.pdf", pages=pages)
+                p.parse()
+                cache.put(kind, pages, p)
+
+            real = cache_mod.parser_fingerprint
+            edited = lambda kind: "edited-visa" if kind == "visa" else real(kind)  # noqa: E731
+            with mock.patch.object(cache_mod, "parser_fingerprint", edited):
+                self.assertIsNone(cache.get("visa", visa_pages, "visa.pdf"))
+                self.assertIsNotNone(cache.get("cuenta", cuenta_pages, "cuenta.pdf"))
+                self.assertEqual(cache.prune(), 1)
+
+            self.assertTrue((Path(tmp) / "cuenta" / real("cuenta")).exists())
+            self.assertFalse((Path(tmp) / "visa" / real("visa")).exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,205 @@
+import csv
+import gzip
+import io
+import lzma
+import json
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from synthetic_pdf import write_text_pdf
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+def _fixture(name: str) -> str:
+    return (FIXTURES_DIR / name).read_text(encoding="utf-8")
+
+
+def _read_rows(path: Path):
+    with path.open(newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def _run_cli(*argv: str) -> str:
+    from hsbc_parser.cli import main
+
+    buf = io.StringIO()
+    with redirect_stdout(buf):
+        main(list(argv))
+    return buf.getvalue()
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.in_dir = self.tmp / "in"
+        self.out_dir = self.tmp / "out"
+        self.in_dir.mkdir()
+        self.log_file = str(self.tmp / "hsbc_parser.log")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_identical_pdfs_are_parsed_once_and_reported(self):
+        original = write_text_pdf(self.in_dir / "HSBC MasterCard 2024-05.pdf", [_fixture("mastercard_full_page.txt")])
+        shutil.copy(original, self.in_dir / "HSBC MasterCard 2024-05 (1).pdf")
+        write_text_pdf(self.in_dir / "HSBC Visa 2024-01.pdf", [_fixture("visa_full_page.txt")])
+
+        _run_cli(str(self.in_dir), "--out", str(self.out_dir), "--log-file", self.log_file)
+
+        statements = _read_rows(self.out_dir / "statements.csv")
+        self.assertEqual(
+            [s["archivo"] for s in statements],
+            ["HSBC MasterCard 2024-05.pdf", "HSBC Visa 2024-01.pdf"],
+        )
+        dups = [w for w in _read_rows(self.out_dir / "warnings.csv") if w["code"] == "DUPLICATE_INPUT"]
+        self.assertEqual(len(dups), 1)
+        self.assertEqual(dups[0]["archivo"], "HSBC MasterCard 2024-05 (1).pdf")
+        self.assertIn("HSBC MasterCard 2024-05.pdf", dups[0]["context"])
+
+    def test_keep_duplicates_parses_every_file(self):
+        original = write_text_pdf(self.in_dir / "a.pdf", [_fixture("visa_full_page.txt")])
+        shutil.copy(original, self.in_dir / "b.pdf")
+
+        _run_cli(str(self.in_dir), "--out", str(self.out_dir), "--log-file", self.log_file, "--keep-duplicates")
+
+        self.assertEqual(len(_read_rows(self.out_dir / "statements.csv")), 2)
+
+    def test_keep_going_exports_successes_and_quarantines_failures(self):
+        write_text_pdf(self.in_dir / "good.pdf", [_fixture("visa_full_page.txt")])
+        (self.in_dir / "broken.pdf").write_bytes(b"definitely not a pdf")
+        quarantine = self.tmp / "quarantine"
+
+        _run_cli(
+            str(self.in_dir),
+            "--out", str(self.out_dir),
+            "--log-file", self.log_file,
+            "--keep-going",
+            "--quarantine", str(quarantine),
+        )
+
+        self.assertEqual([s["archivo"] for s in _read_rows(self.out_dir / "statements.csv")], ["good.pdf"])
+        failed = [w for w in _read_rows(self.out_dir / "warnings.csv") if w["code"] == "PARSE_FAILED"]
+        self.assertEqual(len(failed), 1)
+        self.assertEqual((failed[0]["archivo"], failed[0]["level"]), ("broken.pdf", "ERROR"))
+        context = json.loads(failed[0]["context"])
+        self.assertEqual(context["stage"], "extract")
+        self.assertIn("Traceback", context["traceback"])
+        self.assertTrue((quarantine / "broken.pdf").exists())
+        self.assertTrue((self.in_dir / "broken.pdf").exists())
+
+    def test_failure_aborts_without_keep_going(self):
+        (self.in_dir / "broken.pdf").write_bytes(b"definitely not a pdf")
+        with self.assertRaises(Exception):
+            _run_cli(str(self.in_dir), "--out", str(self.out_dir), "--log-file", self.log_file)
+
+    def test_extract_then_parse_matches_direct_run(self):
+        from hsbc_parser.artifacts import read_artifact
+
+        for name in ("visa", "mastercard", "cuenta"):
+            write_text_pdf(self.in_dir / f"HSBC {name}.pdf", [_fixture(f"{name}_full_page.txt")])
+        (self.in_dir / "broken.pdf").write_bytes(b"definitely not a pdf")
+        artifact = self.tmp / "pages.jsonl.gz"
+
+        _run_cli("extract", str(self.in_dir), "--out", str(artifact), "--keep-going", "--log-file", self.log_file)
+        records = list(read_artifact(artifact))
+        self.assertEqual([r["archivo"] for r in records], ["HSBC cuenta.pdf", "HSBC mastercard.pdf", "HSBC visa.pdf", "broken.pdf"])
+        self.assertEqual(records[0]["n_pages"], 1)
+        self.assertEqual(records[0]["detected_type"], "cuenta")
+        self.assertIn("error", records[3])
+
+        _run_cli("parse", str(artifact), "--out", str(self.tmp / "staged"), "--log-file", self.log_file)
+        _run_cli(str(self.in_dir), "--out", str(self.out_dir), "--keep-going", "--log-file", self.log_file)
+
+        for name in ("statements.csv", "transactions.csv"):
+            self.assertEqual(
+                (self.tmp / "staged" / name).read_text(encoding="utf-8"),
+                (self.out_dir / name).read_text(encoding="utf-8"),
+            )
+        staged_codes = [w["code"] for w in _read_rows(self.tmp / "staged" / "warnings.csv")]
+        direct_codes = [w["code"] for w in _read_rows(self.out_dir / "warnings.csv")]
+        self.assertEqual(staged_codes, direct_codes)
+        self.assertIn("PARSE_FAILED", staged_codes)
+
+    def test_text_mode_parses_page_text_files(self):
+        for name in ("visa", "cuenta"):
+            (self.in_dir / f"{name}.txt").write_text(_fixture(f"{name}_full_page.txt"), encoding="utf-8")
+        (self.in_dir / "two_pages.txt").write_text(
+            _fixture("mastercard_full_page.txt") + "\f" + "(continued)", encoding="utf-8"
+        )
+
+        out = _run_cli(str(self.in_dir), "--text", "--out", str(self.out_dir), "--log-file", self.log_file)
+
+        self.assertIn("processed 3 text files", out)
+        statements = _read_rows(self.out_dir / "statements.csv")
+        self.assertEqual(
+            [(s["archivo"], s["origen"]) for s in statements],
+            [("cuenta.txt", "cuenta"), ("two_pages.txt", "mastercard"), ("visa.txt", "visa")],
+        )
+
+        # Text inputs honour the batch options like PDFs do: worker pool, page limit, quarantine.
+        quarantine = self.tmp / "quarantine"
+        out = _run_cli(
+            str(self.in_dir), "--text", "--out", str(self.tmp / "limited"), "--workers", "2", "--max-pages", "1",
+            "--quarantine", str(quarantine), "--log-file", self.log_file,
+        )
+        self.assertIn("processed 3 text files", out)
+        statements = _read_rows(self.tmp / "limited" / "statements.csv")
+        self.assertEqual([s["archivo"] for s in statements], ["cuenta.txt", "visa.txt"])
+        (failure,) = [w for w in _read_rows(self.tmp / "limited" / "warnings.csv") if w["level"] == "ERROR"]
+        self.assertEqual((failure["archivo"], failure["code"]), ("two_pages.txt", "PAGE_LIMIT_EXCEEDED"))
+        self.assertTrue((quarantine / "two_pages.txt").exists())
+
+    def test_partitioned_layout_matches_flat_rows_and_indexes_partitions(self):
+        for name in ("visa", "mastercard", "cuenta"):
+            write_text_pdf(self.in_dir / f"HSBC {name}.pdf", [_fixture(f"{name}_full_page.txt")])
+
+        _run_cli(str(self.in_dir), "--out", str(self.out_dir), "--log-file", self.log_file)
+        parted = self.tmp / "parted"
+        _run_cli(str(self.in_dir), "--out", str(parted), "--layout", "partitioned", "--log-file", self.log_file)
+
+        index = json.loads((parted / "_partitions.json").read_text(encoding="utf-8"))["partitions"]
+        self.assertEqual(
+            [e["path"] for e in index],
+            ["origen=cuenta/mes=2024-01", "origen=mastercard/mes=2024-05", "origen=visa/mes=2024-01"],
+        )
+        flat_tx = _read_rows(self.out_dir / "transactions.csv")
+        visa = next(e for e in index if e["origen"] == "visa")
+        visa_tx = _read_rows(parted / visa["path"] / "transactions.csv")
+        self.assertEqual(visa["transactions"], len(visa_tx))
+        self.assertEqual((visa["fecha_min"], visa["fecha_max"]), (min(t["fecha"] for t in visa_tx), max(t["fecha"] for t in visa_tx)))
+        self.assertEqual(
+            [(t["archivo"], t["fecha"], t["importe"]) for t in visa_tx],
+            [(t["archivo"], t["fecha"], t["importe"]) for t in flat_tx if t["origen"] == "visa"],
+        )
+        self.assertEqual(sum(e["transactions"] for e in index), len(flat_tx))
+        self.assertEqual(
+            (parted / "warnings.csv").read_text(encoding="utf-8"),
+            (self.out_dir / "warnings.csv").read_text(encoding="utf-8"),
+        )
+
+    def test_compressed_and_jsonl_outputs_hold_the_same_rows(self):
+        for name in ("visa", "cuenta"):
+            (self.in_dir / f"{name}.txt").write_text(_fixture(f"{name}_full_page.txt"), encoding="utf-8")
+        common = (str(self.in_dir), "--text", "--log-file", self.log_file)
+
+        _run_cli(*common, "--out", str(self.out_dir))
+        _run_cli(*common, "--out", str(self.tmp / "xz"), "--compress", "xz")
+        _run_cli(*common, "--out", str(self.tmp / "jsonl"), "--format", "jsonl", "--compress", "gz")
+
+        plain = (self.out_dir / "transactions.csv").read_bytes()
+        self.assertEqual(lzma.decompress((self.tmp / "xz" / "transactions.csv.xz").read_bytes()), plain)
+        lines = gzip.decompress((self.tmp / "jsonl" / "transactions.jsonl.gz").read_bytes()).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        flat = _read_rows(self.out_dir / "transactions.csv")
+        self.assertEqual([(r["archivo"], r["operation_id"]) for r in rows], [(r["archivo"], r["operation_id"] or None) for r in flat])
+        warnings = gzip.decompress((self.tmp / "jsonl" / "warnings.jsonl.gz").read_bytes()).decode().splitlines()
+        self.assertIsInstance(json.loads(warnings[0])["context"], dict)
+
+
+if __name__ == "__main__":
+    unittest.main()
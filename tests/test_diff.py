@@ -0,0 +1,103 @@
+import csv
+import gzip
+import io
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+def _parsers(replace=None):
+    from hsbc_parser.dispatcher import parse_text
+
+    out = []
+    for name in ("cuenta", "mastercard", "visa"):
+        text = (FIXTURES_DIR / f"{name}_full_page.txt").read_text(encoding="utf-8")
+        if replace and name in replace:
+            text = text.replace(*replace[name])
+        out.append(parse_text([text], name=f"{name}_full_page.txt"))
+    return out
+
+
+class TestRunDiff(unittest.TestCase):
+    def setUp(self):
+        from hsbc_parser.export import export_csv
+
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.old = self.tmp / "old"
+        export_csv(_parsers(), self.old, frames=False)
+        self.new_parsers = _parsers({"visa": ("C.05/06", "C.06/06")})
+        visa = self.new_parsers[2]
+        visa.transactions.append(visa.transactions[0])  # a row parsed twice: one extra, identical row
+        del self.new_parsers[0].transactions[-1]
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _assert_counts(self, result):
+        files = {k: (f.added, f.removed, f.changed, f.unchanged) for k, f in result.files.items()}
+        self.assertEqual(files["cuenta_full_page.txt"], (0, 1, 0, 2))
+        self.assertEqual(files["mastercard_full_page.txt"], (0, 0, 0, 4))
+        self.assertEqual(files["visa_full_page.txt"], (1, 0, 1, 2))
+        self.assertEqual(result.columns, {"installment_number": 1})
+        self.assertTrue(result.differs)
+
+    def test_sorted_runs_are_merge_joined_and_differences_written(self):
+        from hsbc_parser.diff import diff_runs
+        from hsbc_parser.export import export_csv
+
+        export_csv(self.new_parsers, self.tmp / "new", frames=False)
+        result = diff_runs(self.old, self.tmp / "new", out=self.tmp / "diff.csv")
+
+        self.assertEqual(result.mode, "merge")
+        self._assert_counts(result)
+        with (self.tmp / "diff.csv").open(encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(sorted(r["change"] for r in rows), ["added", "changed", "removed"])
+        (changed,) = [r for r in rows if r["change"] == "changed"]
+        self.assertEqual(changed["changed_columns"], "installment_number")
+        self.assertEqual(changed["before"], '{"installment_number": "5.0"}')
+
+    def test_partitioned_and_unsorted_runs_give_the_same_counts(self):
+        from hsbc_parser.diff import diff_runs
+        from hsbc_parser.export import export_jsonl, export_partitioned
+
+        export_partitioned(self.new_parsers, self.tmp / "parts", fmt="jsonl")
+        result = diff_runs(self.old, self.tmp / "parts", partitions=4)
+        self.assertEqual(result.mode, "partitioned")
+        self._assert_counts(result)
+
+        # A single file that isn't sorted by archivo is detected mid-stream and re-diffed through partitions.
+        export_jsonl(self.new_parsers, self.tmp / "sorted")
+        lines = (self.tmp / "sorted" / "transactions.jsonl").read_text(encoding="utf-8").splitlines(keepends=True)
+        unsorted = self.tmp / "unsorted.jsonl.gz"
+        unsorted.write_bytes(gzip.compress("".join(reversed(lines)).encode("utf-8")))
+        result = diff_runs(self.old, unsorted)
+        self.assertEqual(result.mode, "partitioned")
+        self._assert_counts(result)
+
+    def test_cli_summary_and_exit_code(self):
+        from hsbc_parser.cli import main
+
+        log = ["--log-file", str(self.tmp / "diff.log")]
+        buf = io.StringIO()
+        with redirect_stdout(buf):
+            main(["diff", str(self.old), str(self.old), "--exit-code", *log])
+        self.assertRegex(buf.getvalue(), r"TOTAL\s+0\s+0\s+0\s+10")
+
+        from hsbc_parser.export import export_csv
+
+        export_csv(self.new_parsers, self.tmp / "new", frames=False)
+        buf = io.StringIO()
+        with redirect_stdout(buf), self.assertRaises(SystemExit) as cm:
+            main(["diff", str(self.old), str(self.tmp / "new"), "--exit-code", *log])
+        self.assertEqual(cm.exception.code, 1)
+        self.assertIn("visa_full_page.txt", buf.getvalue())
+        self.assertNotIn("mastercard_full_page.txt", buf.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import logging
+import re
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from synthetic_pdf import write_text_pdf
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+_LINE = re.compile(r"^\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,\d{3} [A-Z]+ \S+\[\d+\] hsbc_parser")
+
+
+class TestQueuedLogging(unittest.TestCase):
+    def test_buffered_handler_writes_in_batches_and_on_error(self):
+        from hsbc_parser.logging_utils import BufferedFileHandler
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "x.log"
+            handler = BufferedFileHandler(path, capacity=3)
+            log = logging.getLogger("test_buffered_handler")
+            log.propagate = False
+            log.addHandler(handler)
+            try:
+                log.warning("one %s", 1)
+                log.warning("two")
+                self.assertEqual(path.read_text(encoding="utf-8"), "")
+                log.warning("three")
+                self.assertEqual(path.read_text(encoding="utf-8").splitlines(), ["one 1", "two", "three"])
+                log.warning("four")
+                log.error("boom")
+                self.assertEqual(path.read_text(encoding="utf-8").splitlines()[-2:], ["four", "boom"])
+            finally:
+                log.removeHandler(handler)
+                handler.close()
+
+    def test_queue_handler_batches_and_defers_formatting_of_plain_arguments(self):
+        import queue
+
+        from hsbc_parser.logging_utils import _LazyQueueHandler
+
+        q = queue.Queue()
+        handler = _LazyQueueHandler(q, capacity=2)
+        context = {"diff": 1.5}
+        handler.emit(logging.makeLogRecord({"msg": "[%s] ctx=%r", "args": ("CODE", context), "levelno": logging.WARNING}))
+        self.assertTrue(q.empty())
+        handler.emit(logging.makeLogRecord({"msg": "obj=%r", "args": (object(),), "levelno": logging.WARNING}))
+
+        lazy, eager = q.get_nowait()
+        self.assertEqual(lazy.args, ("CODE", context))
+        self.assertIsNone(eager.args)
+        self.assertTrue(eager.msg.startswith("obj=<object"))
+
+    def test_lone_record_is_written_within_the_flush_interval(self):
+        root = Path(__file__).resolve().parents[1]
+        script = (
+            "import os, sys, time\n"
+            "from hsbc_parser.logging_utils import configure_logging, get_logger\n"
+            "configure_logging(log_file=sys.argv[1], queued=True, flush_interval=0.2)\n"
+            "get_logger('watch').info('Parsed 1 new PDFs')\n"
+            "time.sleep(1.0)\n"
+            "sys.stdout.write(open(sys.argv[1], encoding='utf-8').read())\n"
+            "sys.stdout.flush()\n"
+            "os._exit(0)  # skip the atexit drain: the line must already be on disk\n"
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            out = subprocess.run(
+                [sys.executable, "-c", script, str(Path(tmp) / "x.log")],
+                cwd=root,
+                check=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+            ).stdout
+        self.assertIn("hsbc_parser.watch: Parsed 1 new PDFs", out)
+
+    def test_cli_workers_share_one_listener(self):
+        root = Path(__file__).resolve().parents[1]
+        with tempfile.TemporaryDirectory() as tmp:
+            in_dir = Path(tmp) / "in"
+            in_dir.mkdir()
+            for i, kind in enumerate(["visa", "mastercard", "cuenta"]):
+                page = (FIXTURES_DIR / f"{kind}_full_page.txt").read_text(encoding="utf-8")
+                write_text_pdf(in_dir / f"{i}-{kind}.pdf", [page])
+            log_file = Path(tmp) / "run.log"
+            subprocess.run(
+                [sys.executable, "-m", "hsbc_parser.cli", str(in_dir), "--out", str(Path(tmp) / "out"),
+                 "--workers", "2", "--log-mode", "queued", "--log-file", str(log_file)],
+                cwd=root,
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            lines = log_file.read_text(encoding="utf-8").splitlines()
+
+        self.assertTrue(lines)
+        self.assertTrue(all(_LINE.match(line) for line in lines), lines)
+        worker_lines = [line for line in lines if "hsbc-parser-worker[" in line]
+        self.assertEqual(sum("BALANCE_SUM" in line for line in worker_lines), 3)
+        self.assertTrue(any("context={" in line for line in worker_lines))
+
+
+if __name__ == "__main__":
+    unittest.main()
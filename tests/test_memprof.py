@@ -0,0 +1,80 @@
+import io
+import json
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+def _fixture(name: str) -> str:
+    return (FIXTURES_DIR / name).read_text(encoding="utf-8")
+
+
+class TestMemoryProfiler(unittest.TestCase):
+    def setUp(self):
+        from hsbc_parser.memprof import MemoryProfiler
+
+        self.profiler = MemoryProfiler(top_sites=5)
+
+    def tearDown(self):
+        self.profiler.stop()
+
+    def test_stages_report_peak_retained_and_sites(self):
+        from hsbc_parser import tracing
+        from hsbc_parser.dispatcher import parse_text
+
+        self.profiler.start()
+        page = _fixture("cuenta_full_page.txt") * 20
+        for i in range(2):
+            parse_text([page, page], name=f"{i}.txt")
+        self.profiler.stop()
+        self.assertIs(tracing.span("parse"), tracing._NULL)
+
+        report = json.loads(json.dumps(self.profiler.report()))
+        self.assertEqual(set(report["parsers"]), {"common", "cuenta"})
+        self.assertEqual(set(report["parsers"]["common"]), {"detect"})
+        stages = report["parsers"]["cuenta"]
+        self.assertEqual(set(stages), {"parse", "header", "reconcile"})
+        self.assertEqual(stages["parse"]["calls"], 2)
+        # The joined statement text is still referenced when the header stage ends.
+        self.assertGreaterEqual(stages["header"]["max_retained_bytes"], 2 * len(page))
+        self.assertGreater(stages["parse"]["peak_bytes"], stages["reconcile"]["peak_bytes"])
+        self.assertGreaterEqual(report["peak_bytes"], stages["parse"]["peak_bytes"])
+        self.assertTrue(stages["parse"]["top_sites"])
+        self.assertLessEqual(len(stages["parse"]["top_sites"]), 5)
+        self.assertIn("parse", self.profiler.format_report())
+
+    def test_stages_are_kept_apart_per_parser(self):
+        from hsbc_parser.dispatcher import parse_text
+
+        self.profiler.start()
+        for name in ("cuenta", "visa", "visa"):
+            parse_text([_fixture(f"{name}_full_page.txt")], name=f"{name}.txt")
+        self.profiler.stop()
+
+        parsers = self.profiler.report()["parsers"]
+        self.assertEqual(set(parsers), {"common", "cuenta", "visa"})
+        for tipo, calls in (("cuenta", 1), ("visa", 2)):
+            self.assertEqual({s: parsers[tipo][s]["calls"] for s in ("parse", "header")}, {"parse": calls, "header": calls})
+        self.assertEqual(parsers["common"]["detect"]["calls"], 3)
+        self.assertRegex(self.profiler.format_report(), r"visa\s+header\s+2 ")
+
+    def test_cli_writes_json_report_and_rejects_worker_pools(self):
+        from hsbc_parser.cli import main
+
+        with tempfile.TemporaryDirectory() as tmp:
+            report = Path(tmp) / "memory.json"
+            args = [str(FIXTURES_DIR), "--text", "--out", str(Path(tmp) / "out"), "--log-file", str(Path(tmp) / "x.log")]
+            with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()) as err:
+                main([*args, "--memory-profile", str(report)])
+            self.assertIn("export", json.loads(report.read_text(encoding="utf-8"))["parsers"]["common"])
+            self.assertIn("traced peak", err.getvalue())
+
+            with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+                main([*args, "--memory-profile", str(report), "--workers", "2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
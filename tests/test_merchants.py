@@ -0,0 +1,49 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+class TestMerchantRules(unittest.TestCase):
+    def test_longest_prefix_wins_and_processors_are_stripped(self):
+        from hsbc_parser.merchants import MerchantRules
+
+        rules = MerchantRules(
+            [
+                ("UBER", "UBER", "transporte"),
+                ("UBER EATS", "UBER EATS", "comida"),
+                ("DLO", "", ""),
+                ("DIA", "DIA", "supermercado"),
+            ]
+        )
+
+        self.assertEqual(rules.classify("DLO*UBER RIDES"), ("UBER", "transporte"))
+        self.assertEqual(rules.classify("Uber Eats 1234"), ("UBER EATS", "comida"))
+        # Prefixes only match whole words: DIAGNOSTICO is not DIA.
+        self.assertEqual(rules.classify("DIAGNOSTICO 4455 SA"), ("DIAGNOSTICO SA", None))
+        self.assertEqual(rules.classify(""), (None, None))
+
+    def test_parsed_transactions_get_merchant_and_category_columns(self):
+        from hsbc_parser.dispatcher import parse_text
+        from hsbc_parser.export import export_csv
+
+        p = parse_text([(FIXTURES_DIR / "cuenta_full_page.txt").read_text(encoding="utf-8")], "cuenta")
+        self.assertEqual([(t.merchant, t.categoria) for t in p.transactions][0], ("EXTRACCION", "efectivo"))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            _, df_t, _ = export_csv([p], tmp)
+        self.assertEqual(list(df_t["categoria"]), ["efectivo", "ajustes", "transferencias"])
+
+    def test_rules_file(self):
+        from hsbc_parser.merchants import MerchantRules
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "rules.csv"
+            path.write_text("prefix,merchant,categoria\nCafé del Centro,CAFE DEL CENTRO,comida\n", encoding="utf-8")
+            rules = MerchantRules.from_file(path)
+        self.assertEqual(rules.classify("CAFE DEL CENTRO SUC 12"), ("CAFE DEL CENTRO", "comida"))
+
+
+if __name__ == "__main__":
+    unittest.main()
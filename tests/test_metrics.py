@@ -0,0 +1,121 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from synthetic_pdf import write_text_pdf
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+def _fixture(name: str) -> str:
+    return (FIXTURES_DIR / name).read_text(encoding="utf-8")
+
+
+def _samples(text):
+    """{'name{labels}': value} for the sample lines of a Prometheus exposition."""
+    out = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            key, value = line.rsplit(" ", 1)
+            out[key] = float(value)
+    return out
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        from hsbc_parser import metrics
+
+        self.metrics = metrics
+        self._was_enabled = metrics.enabled()
+        metrics.REGISTRY.reset()
+
+    def tearDown(self):
+        self.metrics.enable(self._was_enabled)
+        self.metrics.REGISTRY.reset()
+
+    def test_disabled_registry_records_nothing(self):
+        from hsbc_parser.dispatcher import parse_text
+
+        self.metrics.enable(False)
+        parse_text([_fixture("visa_full_page.txt")], "visa")
+        self.assertEqual(self.metrics.REGISTRY.snapshot(), {"counters": {}, "histograms": {}})
+
+    def test_parse_counters_and_stage_histogram(self):
+        from hsbc_parser.dispatcher import parse_text
+
+        self.metrics.enable()
+        p = parse_text([_fixture("visa_full_page.txt"), ""], "visa")
+        samples = _samples(self.metrics.REGISTRY.render())
+
+        self.assertEqual(samples['hsbc_parser_pdfs_total{tipo="visa"}'], 1)
+        self.assertEqual(samples['hsbc_parser_pages_total{tipo="visa"}'], 2)
+        self.assertEqual(samples['hsbc_parser_transactions_total{tipo="visa"}'], len(p.transactions))
+        self.assertGreater(samples['hsbc_parser_lines_scanned_total{tipo="visa"}'], 10)
+        for w in p.warnings:
+            self.assertGreaterEqual(samples[f'hsbc_parser_warnings_total{{code="{w["code"]}",level="{w["level"]}"}}'], 1)
+        self.assertEqual(samples['hsbc_parser_stage_seconds_count{stage="parse"}'], 1)
+        self.assertEqual(samples['hsbc_parser_stage_seconds_bucket{stage="parse",le="+Inf"}'], 1)
+
+    def test_cache_hit_counts_every_folded_warning(self):
+        from hsbc_parser.cache import ParseCache
+        from hsbc_parser.dispatcher import parse_pages, parse_text
+
+        page = _fixture("visa_full_page.txt")
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ParseCache(tmp)
+            p = parse_text([page], "visa", name="a.pdf")
+            for i in range(20):
+                p.warn("WARNING", "NOISY", "Row looks odd", {"row": i})
+            cache.put("visa", [page], p)
+
+            self.metrics.enable()
+            hit = parse_pages("a.pdf", [page], "visa", cache=cache)
+            self.assertEqual(cache.hits, 1)
+
+        samples = _samples(self.metrics.REGISTRY.render())
+        self.assertEqual(samples['hsbc_parser_warnings_total{code="NOISY",level="WARNING"}'], 20)
+        self.assertEqual(
+            sum(v for k, v in samples.items() if k.startswith("hsbc_parser_warnings_total")),
+            sum(w["count"] for w in hit.warnings),
+        )
+
+    def test_worker_metrics_are_merged_into_the_parent(self):
+        from hsbc_parser.batch import run_batch
+
+        self.metrics.enable()
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = [
+                write_text_pdf(Path(tmp) / f"{i}-{name}.pdf", [_fixture(f"{name}_full_page.txt")])
+                for i, name in enumerate(["visa", "cuenta", "visa"])
+            ]
+            big = write_text_pdf(Path(tmp) / "big.pdf", [_fixture("visa_full_page.txt")] * 3)
+            results = list(run_batch(paths + [big], workers=2, timeout=60, max_pages=2))
+
+        samples = _samples(self.metrics.REGISTRY.render())
+        self.assertEqual(samples['hsbc_parser_pdfs_total{tipo="visa"}'], 2)
+        self.assertEqual(samples['hsbc_parser_pdfs_total{tipo="cuenta"}'], 1)
+        self.assertEqual(
+            samples['hsbc_parser_transactions_total{tipo="visa"}'],
+            sum(len(r.parser.transactions) for r in results if r.ok and r.parser.statement.origen == "visa"),
+        )
+        self.assertEqual(samples['hsbc_parser_warnings_total{code="PAGE_LIMIT_EXCEEDED",level="ERROR"}'], 1)
+        self.assertEqual(samples['hsbc_parser_stage_seconds_count{stage="extract"}'], 4)
+
+    def test_write_produces_a_textfile(self):
+        registry = self.metrics.Registry()
+        registry.inc("hsbc_parser_warnings_total", code='A"B', level="WARNING")
+        registry.observe("hsbc_parser_stage_seconds", 0.2, stage="parse")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "sub" / "hsbc_parser.prom"
+            registry.write(path)
+            text = path.read_text(encoding="utf-8")
+
+        self.assertIn("# TYPE hsbc_parser_warnings_total counter", text)
+        self.assertIn('hsbc_parser_warnings_total{code="A\\"B",level="WARNING"} 1', text)
+        self.assertIn('hsbc_parser_stage_seconds_bucket{stage="parse",le="0.1"} 0', text)
+        self.assertIn('hsbc_parser_stage_seconds_bucket{stage="parse",le="0.25"} 1', text)
+        self.assertIn('hsbc_parser_stage_seconds_sum{stage="parse"} 0.2', text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+def _parsers():
+    from hsbc_parser.dispatcher import parse_text
+
+    return [
+        parse_text([(FIXTURES_DIR / f"{kind}_full_page.txt").read_text(encoding="utf-8")], kind, name=f"{kind}.pdf")
+        for kind in ("visa", "mastercard", "cuenta")
+    ]
+
+
+class TestTransactionStore(unittest.TestCase):
+    def test_filters_and_group_sums_on_parsed_statements(self):
+        from hsbc_parser.query import TransactionStore
+
+        store = TransactionStore.from_parsers(_parsers())
+
+        usd = store.query(moneda="USD", importe_min=10)
+        self.assertEqual([r["descripcion"] for r in usd.records()], ["PALLADIUM PALACE(DOM,USD)"])
+        visa_jan = store.query(origen="visa", fecha_desde="2024-01-01", fecha_hasta="2024-01-31")
+        self.assertEqual([r["operation_id"] for r in visa_jan.records()], ["350257*"])
+        self.assertEqual(len(store.query(persona="NOBODY")), 0)
+        self.assertEqual(
+            store.query(origen="mastercard").group_sum("persona", "moneda"),
+            {("APELLIDO NOMBRE", "ARS"): (205.0, 2), ("APELLIDO NOMBRE", "USD"): (39.0, 1), ("TITULAR", "ARS"): (-20.0, 1)},
+        )
+        with self.assertRaises(ValueError):
+            store.query(descripcion="X")
+
+    def test_loading_exported_files_matches_parsers(self):
+        from hsbc_parser.export import export_csv
+        from hsbc_parser.query import TransactionStore
+
+        parsers = _parsers()
+        with tempfile.TemporaryDirectory() as tmp:
+            export_csv(parsers, tmp, compress="gz", frames=False)
+            from_files = TransactionStore.load(tmp)
+        from_parsers = TransactionStore.from_parsers(parsers)
+
+        self.assertEqual(len(from_files), len(from_parsers))
+        self.assertEqual(from_files.query().group_sum("origen", "mes"), from_parsers.query().group_sum("origen", "mes"))
+
+    def test_merged_output_next_to_its_shards_is_loaded_once(self):
+        from hsbc_parser.export import export_csv
+        from hsbc_parser.query import TransactionStore
+        from hsbc_parser.shards import merge_outputs, shard_dir_name
+
+        parsers = _parsers()
+        with tempfile.TemporaryDirectory() as tmp:
+            for i, p in enumerate(parsers, 1):
+                export_csv([p], Path(tmp) / shard_dir_name(i, len(parsers)), frames=False)
+            shards_only = TransactionStore.load(tmp)
+            merge_outputs([tmp], tmp)
+            merged = TransactionStore.load(tmp)
+
+        expected = sum(len(p.transactions) for p in parsers)
+        self.assertEqual(len(shards_only), expected)
+        self.assertEqual(len(merged), expected)
+
+    def test_indexed_query_matches_brute_force_scan(self):
+        from hsbc_parser.query import TransactionStore
+
+        rnd = random.Random(7)
+        records = [
+            {
+                "archivo": f"f{rnd.randint(0, 20)}.pdf",
+                "fecha": f"2024-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}" if rnd.random() > 0.02 else "",
+                "descripcion": "X",
+                "moneda": rnd.choice(["ARS", "USD"]),
+                "importe": round(rnd.uniform(-500, 500), 2),
+                "persona": rnd.choice(["A", "B", "C"]),
+                "origen": rnd.choice(["visa", "mastercard", "cuenta"]),
+                "operation_id": str(rnd.randint(0, 50)),
+            }
+            for _ in range(3000)
+        ]
+        store = TransactionStore.from_records(records)
+
+        for _ in range(50):
+            desde, hasta = sorted(f"2024-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}" for _ in range(2))
+            persona, moneda, low = rnd.choice("ABC"), rnd.choice(["ARS", "USD"]), rnd.uniform(-500, 500)
+            got = store.query(fecha_desde=desde, fecha_hasta=hasta, persona=persona, moneda=moneda, importe_min=low)
+            expected = [
+                r
+                for r in records
+                if r["fecha"] and desde <= r["fecha"] <= hasta
+                and r["persona"] == persona
+                and r["moneda"] == moneda
+                and r["importe"] >= low
+            ]
+            self.assertEqual(len(got), len(expected))
+            self.assertAlmostEqual(got.total(), sum(r["importe"] for r in expected), places=6)
+
+
+if __name__ == "__main__":
+    unittest.main()
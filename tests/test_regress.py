@@ -0,0 +1,89 @@
+import io
+import json
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+GOLDEN_DIR = FIXTURES_DIR / "golden"
+
+
+class TestRegression(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.corpus = Path(self._tmp.name) / "corpus"
+        self.goldens = self.corpus / "golden"
+        self.corpus.mkdir()
+        for p in FIXTURES_DIR.glob("*.txt"):
+            shutil.copy(p, self.corpus / p.name)
+        shutil.copytree(GOLDEN_DIR, self.goldens)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_fixtures_match_stored_goldens(self):
+        from hsbc_parser.regress import run_regression
+
+        report = run_regression(FIXTURES_DIR, GOLDEN_DIR, timing=False)
+
+        self.assertEqual([(f.archivo, f.status) for f in report.files if f.status != "ok"], [])
+        self.assertEqual(len(report.files), 3)
+        self.assertTrue(report.ok)
+
+    def test_changed_new_and_missing_inputs_fail_with_field_diffs(self):
+        from hsbc_parser.regress import run_regression
+
+        visa = self.corpus / "visa_full_page.txt"
+        visa.write_text(visa.read_text(encoding="utf-8").replace("C.05/06", "C.06/06"), encoding="utf-8")
+        (self.corpus / "cuenta_full_page.txt").rename(self.corpus / "cuenta_renamed.txt")
+
+        report = run_regression(self.corpus, self.goldens, workers=2, timing=False)
+        status = {f.archivo: f for f in report.files}
+
+        self.assertFalse(report.ok)
+        self.assertEqual(status["mastercard_full_page.txt"].status, "ok")
+        self.assertEqual(status["cuenta_renamed.txt"].status, "new")
+        self.assertEqual(status["cuenta_full_page.txt"].status, "missing")
+        self.assertEqual(status["visa_full_page.txt"].status, "changed")
+        self.assertTrue(any(".installment_number: 5 -> 6" in d for d in status["visa_full_page.txt"].diffs))
+
+    def test_update_records_goldens_and_timings_then_throughput_budget_applies(self):
+        from hsbc_parser.regress import TIMINGS_FILE, run_regression
+
+        (self.corpus / "visa_full_page.txt").unlink()
+        report = run_regression(self.corpus, self.goldens, update=True)
+        self.assertFalse((self.goldens / "visa_full_page.txt.json").exists())
+        timings = json.loads((self.goldens / TIMINGS_FILE).read_text(encoding="utf-8"))
+        self.assertEqual(sorted(timings["files"]), ["cuenta_full_page.txt", "mastercard_full_page.txt"])
+        self.assertTrue(report.ok)
+
+        # Baselines far below any real parse time: a throughput regression, but goldens still match.
+        timings["files"] = {k: 1e-6 for k in timings["files"]}
+        (self.goldens / TIMINGS_FILE).write_text(json.dumps(timings), encoding="utf-8")
+        report = run_regression(self.corpus, self.goldens, min_delta_s=0)
+        self.assertEqual(report.mismatches, [])
+        self.assertTrue(report.too_slow)
+        self.assertFalse(report.ok)
+        self.assertEqual(len(report.slow_files()), 2)
+
+        self.assertTrue(run_regression(self.corpus, self.goldens, max_slowdown=1e9).ok)
+
+    def test_cli_exits_nonzero_on_regression(self):
+        from hsbc_parser.cli import main
+
+        argv = ["regress", str(self.corpus), "--no-timing", "--log-file", str(Path(self._tmp.name) / "r.log")]
+        buf = io.StringIO()
+        with redirect_stdout(buf):
+            main(argv)
+        self.assertIn("OK: 3 files match goldens", buf.getvalue())
+
+        (self.goldens / "visa_full_page.txt.json").unlink()
+        with redirect_stdout(io.StringIO()), self.assertRaises(SystemExit) as cm:
+            main(argv)
+        self.assertEqual(cm.exception.code, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
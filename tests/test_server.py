@@ -0,0 +1,182 @@
+import json
+import os
+import signal
+import tempfile
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from synthetic_pdf import build_text_pdf, write_text_pdf
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+class TestServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from hsbc_parser import metrics
+        from hsbc_parser.server import make_server
+
+        metrics.enable()  # what `main()` does; workers inherit it
+        cls.httpd = make_server("127.0.0.1", 0, workers=1, queue_size=1)
+        cls.base = "http://127.0.0.1:%d" % cls.httpd.server_address[1]
+        cls.thread = threading.Thread(target=cls.httpd.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.httpd.shutdown()
+        cls.httpd.server_close()
+        cls.httpd.service.close()
+        from hsbc_parser import metrics
+
+        metrics.enable(False)
+        metrics.REGISTRY.reset()
+
+    def _post(self, path, body, content_type):
+        req = urllib.request.Request(self.base + path, data=body, headers={"Content-Type": content_type})
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            return resp.status, json.loads(resp.read())
+
+    def test_upload_returns_statement_transactions_and_warnings(self):
+        page = (FIXTURES_DIR / "visa_full_page.txt").read_text(encoding="utf-8")
+        status, payload = self._post(
+            "/parse?name=HSBC%20Visa%202024-01.pdf", build_text_pdf([page]), "application/pdf"
+        )
+
+        self.assertEqual(status, 200)
+        self.assertEqual(payload["statement"]["archivo"], "HSBC Visa 2024-01.pdf")
+        self.assertEqual(payload["statement"]["origen"], "visa")
+        self.assertTrue(payload["transactions"])
+        self.assertTrue(any(w["code"] == "BALANCE_SUM_WITHIN_TOLERANCE" for w in payload["warnings"]))
+
+    def test_local_path_and_health(self):
+        page = (FIXTURES_DIR / "cuenta_full_page.txt").read_text(encoding="utf-8")
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf = write_text_pdf(Path(tmp) / "HSBC Cuenta.pdf", [page])
+            status, payload = self._post("/parse", json.dumps({"path": str(pdf)}).encode(), "application/json")
+
+        self.assertEqual(status, 200)
+        self.assertEqual(payload["statement"]["origen"], "cuenta")
+        self.assertEqual(len(payload["transactions"]), 3)
+
+        with urllib.request.urlopen(self.base + "/health", timeout=30) as resp:
+            health = json.loads(resp.read())
+        self.assertEqual(health["status"], "ok")
+        self.assertGreaterEqual(health["ok"], 1)
+
+        with urllib.request.urlopen(self.base + "/metrics", timeout=30) as resp:
+            self.assertTrue(resp.headers["Content-Type"].startswith("text/plain"))
+            exposition = resp.read().decode("utf-8")
+        self.assertIn('hsbc_parser_pdfs_total{tipo="cuenta"}', exposition)
+        self.assertIn('hsbc_parser_stage_seconds_count{stage="extract"}', exposition)
+        self.assertIn("# TYPE hsbc_parser_service_inflight gauge", exposition)
+
+    def test_bad_upload_is_reported_as_error(self):
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            self._post("/parse", b"not a pdf", "application/pdf")
+        self.assertEqual(ctx.exception.code, 422)
+
+    def test_full_queue_rejects_instead_of_waiting(self):
+        from hsbc_parser.server import QueueFull
+
+        service = self.httpd.service
+        held = 0
+        while service._slots.acquire(blocking=False):
+            held += 1
+        try:
+            with self.assertRaises(QueueFull):
+                service.parse_path("whatever.pdf")
+        finally:
+            for _ in range(held):
+                service._slots.release()
+        self.assertEqual(held, 2)
+
+    def _health(self):
+        with urllib.request.urlopen(self.base + "/health", timeout=30) as resp:
+            return json.loads(resp.read())
+
+    def test_killed_worker_degrades_health_then_pool_is_rebuilt(self):
+        service = self.httpd.service
+        restarts = service.health()["restarts"]
+        for pid in list(service._pool._processes):
+            os.kill(pid, signal.SIGKILL)
+        deadline = time.monotonic() + 10
+        while self._health()["status"] != "degraded" and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(self._health()["status"], "degraded")
+
+        page = (FIXTURES_DIR / "visa_full_page.txt").read_text(encoding="utf-8")
+        status, payload = self._post("/parse?name=after-kill.pdf", build_text_pdf([page]), "application/pdf")
+        self.assertEqual(status, 200)
+        self.assertEqual(payload["statement"]["origen"], "visa")
+        health = self._health()
+        self.assertEqual(health["status"], "ok")
+        self.assertEqual(health["restarts"], restarts + 1)
+
+    def test_hung_parse_times_out_and_frees_the_worker(self):
+        from hsbc_parser.server import ParseTimeout
+
+        service = self.httpd.service
+        service.timeout = 0.5
+        try:
+            with self.assertRaises(ParseTimeout):
+                service.submit(time.sleep, 30)
+            self.assertIsNone(service.submit(time.sleep, 0))
+        finally:
+            service.timeout = 120.0
+        self.assertGreaterEqual(service.health()["timeouts"], 1)
+        self.assertEqual(service.health()["status"], "ok")
+
+    def test_time_spent_queued_does_not_count_toward_the_timeout(self):
+        from hsbc_parser.server import ParseService
+
+        service = ParseService(workers=1, queue_size=3, timeout=1.0)
+        try:
+            errors = []
+
+            def job():
+                try:
+                    service.submit(time.sleep, 0.6)
+                except Exception as e:  # noqa: BLE001 - collected for the assertion below
+                    errors.append(e)
+
+            threads = [threading.Thread(target=job) for _ in range(3)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            health = service.health()
+        finally:
+            service.close()
+        self.assertEqual(errors, [])
+        self.assertEqual((health["ok"], health["timeouts"], health["restarts"]), (3, 0, 0))
+
+    def test_timeout_retries_the_other_running_parse(self):
+        from hsbc_parser.server import ParseService, ParseTimeout
+
+        service = ParseService(workers=2, queue_size=0, timeout=0.5)
+        try:
+            results = []
+
+            def other_parse():
+                time.sleep(0.3)  # still running when the hung parse's worker is killed at 0.5 s
+                results.append(service.submit(time.sleep, 0.4))
+
+            other = threading.Thread(target=other_parse)
+            other.start()
+            with self.assertRaises(ParseTimeout):
+                service.submit(time.sleep, 30)
+            other.join()
+            health = service.health()
+        finally:
+            service.close()
+        self.assertEqual(results, [None])
+        self.assertEqual((health["ok"], health["timeouts"], health["restarts"]), (1, 1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import gzip
+import io
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from synthetic_pdf import write_text_pdf
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+def _run_cli(*argv: str) -> None:
+    from hsbc_parser.cli import main
+
+    with redirect_stdout(io.StringIO()):
+        main(list(argv))
+
+
+class TestShards(unittest.TestCase):
+    def test_shard_assignment_is_deterministic_partition(self):
+        from hsbc_parser.shards import parse_shard_spec, shard_of
+
+        names = [f"HSBC Visa {i:03d}.pdf" for i in range(200)]
+        shards = [shard_of(n, 4) for n in names]
+        self.assertEqual(shards, [shard_of(n, 4) for n in names])
+        self.assertEqual(set(shards), {1, 2, 3, 4})
+        self.assertEqual(parse_shard_spec("2/4"), (2, 4))
+        for bad in ("0/4", "5/4", "x", "1/0"):
+            with self.assertRaises(ValueError):
+                parse_shard_spec(bad)
+
+    def test_exports_are_in_archivo_order_whatever_the_input_order(self):
+        from hsbc_parser.dispatcher import parse_text
+        from hsbc_parser.export import export_csv, export_jsonl
+
+        parsers = [
+            parse_text([(FIXTURES_DIR / f"{name}_full_page.txt").read_text(encoding="utf-8")], name=f"{name}.pdf")
+            for name in ("visa", "mastercard", "cuenta")
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            for label, order in (("given", parsers), ("sorted", sorted(parsers, key=lambda p: p.statement.archivo))):
+                export_csv(iter(order), tmp / label, frames=False)
+                export_jsonl(iter(order), tmp / label)
+            for name in ("statements", "transactions", "warnings"):
+                for ext in ("csv", "jsonl"):
+                    given = (tmp / "given" / f"{name}.{ext}").read_text(encoding="utf-8")
+                    self.assertEqual(given, (tmp / "sorted" / f"{name}.{ext}").read_text(encoding="utf-8"), name)
+            rows = (tmp / "given" / "transactions.csv").read_text(encoding="utf-8").splitlines()[1:]
+            self.assertEqual([r.split(",")[0] for r in rows], sorted(r.split(",")[0] for r in rows))
+
+    def test_sharded_runs_merge_to_single_run_output(self):
+        pages = {
+            name: (FIXTURES_DIR / f"{name}_full_page.txt").read_text(encoding="utf-8")
+            for name in ("visa", "mastercard", "cuenta")
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            in_dir = tmp / "in"
+            in_dir.mkdir()
+            for i in range(9):
+                kind = ("visa", "mastercard", "cuenta")[i % 3]
+                write_text_pdf(in_dir / f"HSBC {kind} {i:02d}.pdf", [pages[kind]])
+            log = str(tmp / "log.txt")
+
+            _run_cli(str(in_dir), "--out", str(tmp / "single"), "--log-file", log)
+            for i in (1, 2, 3):
+                _run_cli(str(in_dir), "--out", str(tmp / "sharded"), "--shard", f"{i}/3", "--log-file", log)
+            self.assertEqual(len(list((tmp / "sharded").glob("shard-*-of-3"))), 3)
+
+            _run_cli("merge", str(tmp / "sharded"), "--out", str(tmp / "merged"), "--log-file", log)
+
+            for name in ("statements.csv", "transactions.csv", "warnings.csv"):
+                self.assertEqual(
+                    (tmp / "merged" / name).read_text(encoding="utf-8"),
+                    (tmp / "single" / name).read_text(encoding="utf-8"),
+                    name,
+                )
+
+    def test_compressed_jsonl_shards_merge_to_single_run_output(self):
+        page = (FIXTURES_DIR / "visa_full_page.txt").read_text(encoding="utf-8")
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            in_dir = tmp / "in"
+            in_dir.mkdir()
+            for i in range(6):
+                write_text_pdf(in_dir / f"HSBC visa {i:02d}.pdf", [page])
+            log = str(tmp / "log.txt")
+            fmt = ("--format", "jsonl", "--compress", "gz", "--log-file", log)
+
+            _run_cli(str(in_dir), "--out", str(tmp / "single"), *fmt)
+            for i in (1, 2):
+                _run_cli(str(in_dir), "--out", str(tmp / "sharded"), "--shard", f"{i}/2", *fmt)
+            _run_cli("merge", str(tmp / "sharded"), "--out", str(tmp / "merged"), "--log-file", log)
+
+            for name in ("statements.jsonl.gz", "transactions.jsonl.gz", "warnings.jsonl.gz"):
+                merged = gzip.decompress((tmp / "merged" / name).read_bytes())
+                self.assertEqual(merged, gzip.decompress((tmp / "single" / name).read_bytes()), name)
+
+
+if __name__ == "__main__":
+    unittest.main()
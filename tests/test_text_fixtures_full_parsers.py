@@ -1,4 +1,7 @@
 import json
+import subprocess
+import sys
+import tempfile
 import unittest
 from pathlib import Path
 
@@ -116,17 +119,50 @@ class TestTextFixturesFullParsers(unittest.TestCase):
         for p in parsers:
             p.parse()
 
-        out_dir = Path("data/output/unittest_text_fixtures")
-        df_s, df_t, df_w = export_csv(parsers, out_dir)
-
-        self.assertEqual(len(df_s), 3)
-        self.assertGreaterEqual(len(df_t), 1)
-        self.assertGreaterEqual(len(df_w), 1)
-
-        # warnings.csv contexts must be json strings for dict/list contexts
-        for ctx in df_w["context"].dropna().tolist():
-            if isinstance(ctx, str) and ctx.startswith("{"):
-                json.loads(ctx)
+        with tempfile.TemporaryDirectory() as tmp:
+            out_dir = Path(tmp) / "frames"
+            df_s, df_t, df_w = export_csv(parsers, out_dir)
+
+            self.assertEqual(len(df_s), 3)
+            self.assertGreaterEqual(len(df_t), 1)
+            self.assertGreaterEqual(len(df_w), 1)
+
+            # warnings.csv contexts must be json strings for dict/list contexts
+            for ctx in df_w["context"].dropna().tolist():
+                if isinstance(ctx, str) and ctx.startswith("{"):
+                    json.loads(ctx)
+
+            self.assertEqual(str(df_t["origen"].dtype), "category")
+            self.assertEqual(str(df_t["installment_total"].dtype), "Int16")
+            self.assertTrue(str(df_t["fecha"].dtype).startswith("datetime64"))
+
+            files_only = Path(tmp) / "files_only"
+            counts = export_csv(parsers, files_only, frames=False)
+            self.assertEqual(counts, {"statements": len(df_s), "transactions": len(df_t), "warnings": len(df_w)})
+            for name in ("statements.csv", "transactions.csv", "warnings.csv"):
+                self.assertEqual((files_only / name).read_bytes(), (out_dir / name).read_bytes(), name)
+
+    def test_parse_text_is_public_and_never_imports_pdfplumber(self):
+        script = (
+            "import sys, json\n"
+            "from pathlib import Path\n"
+            "import hsbc_parser\n"
+            "text = Path(sys.argv[1]).read_text(encoding='utf-8')\n"
+            "p = hsbc_parser.parse_text([text], 'visa', name='visa.txt')\n"
+            "print(json.dumps([p.statement.archivo, p.statement.origen, len(p.transactions), 'pdfplumber' in sys.modules]))\n"
+        )
+        root = Path(__file__).resolve().parent.parent
+        out = subprocess.run(
+            [sys.executable, "-c", script, str(FIXTURES_DIR / "visa_full_page.txt")],
+            cwd=root,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        archivo, origen, n_tx, loaded = json.loads(out)
+        self.assertEqual((archivo, origen), ("visa.txt", "visa"))
+        self.assertGreater(n_tx, 0)
+        self.assertFalse(loaded)
 
 
 if __name__ == "__main__":
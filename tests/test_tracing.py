@@ -0,0 +1,64 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from synthetic_pdf import write_text_pdf
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+def _fixture(name: str) -> str:
+    return (FIXTURES_DIR / name).read_text(encoding="utf-8")
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        from hsbc_parser import tracing
+
+        self.tracing = tracing
+        tracing.TRACER.reset()
+
+    def tearDown(self):
+        self.tracing.enable(False)
+        self.tracing.TRACER.reset()
+
+    def test_disabled_tracer_records_nothing(self):
+        from hsbc_parser.dispatcher import parse_text
+
+        parse_text([_fixture("visa_full_page.txt")])
+        self.assertEqual(self.tracing.TRACER.events(), [])
+
+    def test_worker_spans_are_merged_into_one_chrome_trace(self):
+        from hsbc_parser.batch import run_batch
+        from hsbc_parser.export import export_csv
+
+        self.tracing.enable()
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = [
+                write_text_pdf(Path(tmp) / f"{i}-{name}.pdf", [_fixture(f"{name}_full_page.txt")] * 2)
+                for i, name in enumerate(["visa", "mastercard", "cuenta", "visa"])
+            ]
+            results = list(run_batch(paths, workers=2, timeout=60))
+            export_csv([r.parser for r in results], Path(tmp) / "out", frames=False)
+            trace_path = Path(tmp) / "trace.json"
+            self.tracing.TRACER.write(trace_path)
+            trace = json.loads(trace_path.read_text(encoding="utf-8"))
+
+        events = trace["traceEvents"]
+        spans = [e for e in events if e["ph"] == "X"]
+        worker_pids = {r.worker_pid for r in results}
+        self.assertEqual({e["name"] for e in spans}, {"file", "open", "extract", "detect", "parse", "header", "reconcile", "export"})
+        self.assertEqual(sum(e["name"] == "extract" for e in spans), 8)
+        self.assertEqual({e["pid"] for e in spans if e["name"] == "parse"}, worker_pids)
+        self.assertEqual({e["pid"] for e in spans if e["name"] == "export"}, {os.getpid()})
+        named = {e["pid"] for e in events if e["ph"] == "M" and e["name"] == "process_name"}
+        self.assertTrue(worker_pids | {os.getpid()} <= named)
+        for e in spans:
+            self.assertGreaterEqual(e["dur"], 0)
+            self.assertIn("tid", e)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+def _visa(name: str, text: str | None = None):
+    from hsbc_parser.dispatcher import parse_text
+
+    text = text if text is not None else (FIXTURES_DIR / "visa_full_page.txt").read_text(encoding="utf-8")
+    return parse_text([text], "visa", name=name)
+
+
+def _codes(p, code: str):
+    return [w for w in p.warnings if w["code"] == code]
+
+
+class TestTransactionIndex(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.db = Path(self._tmp.name) / "tx.sqlite"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_normalized_fingerprint_ignores_case_accents_and_installment_tags(self):
+        from hsbc_parser.parsers.utils import normalize_description
+
+        self.assertEqual(normalize_description("Café*Centro C.07/18"), "CAFE CENTRO")
+        self.assertEqual(normalize_description("CAFE  CENTRO"), "CAFE CENTRO")
+
+    def test_overlapping_statement_rows_are_flagged_as_duplicates(self):
+        from hsbc_parser.txindex import TransactionIndex
+
+        first, again = _visa("jan.pdf"), _visa("jan (re-download).pdf")
+        with TransactionIndex(self.db) as index:
+            self.assertEqual(index.update(first), (0, 0))
+            dups, _ = index.update(again)
+
+        self.assertEqual(dups, len(again.transactions))
+        self.assertEqual(_codes(first, "DUPLICATE_TRANSACTION"), [])
+        (row,) = _codes(again, "DUPLICATE_TRANSACTION")
+        self.assertEqual(row["count"], dups)
+        self.assertEqual({c["other_archivo"] for c in row["context"]["samples"]}, {"jan.pdf"})
+
+    def test_next_installment_is_a_continuation_and_reruns_are_idempotent(self):
+        from hsbc_parser.txindex import TransactionIndex
+
+        jan = _visa("jan.pdf")
+        feb_text = (FIXTURES_DIR / "visa_full_page.txt").read_text(encoding="utf-8").replace("C.05/06", "C.06/06")
+        with TransactionIndex(self.db) as index:
+            index.update(jan)
+            feb = _visa("feb.pdf", feb_text)
+            self.assertEqual(index.update(feb), (2, 1))
+            rows = len(index)
+
+        with TransactionIndex(self.db) as index:
+            index.update(_visa("feb.pdf", feb_text))
+            self.assertEqual(len(index), rows)
+
+        (cont,) = _codes(feb, "INSTALLMENT_CONTINUATION")
+        self.assertEqual(cont["level"], "INFO")
+        self.assertEqual(cont["context"]["installment"], "6/6")
+        self.assertEqual((cont["context"]["other_archivo"], cont["context"]["other_installment"]), ("jan.pdf", 5))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+
+from hsbc_parser.parsers.types import Statement
+
+
+def _stmt(archivo, desde, hasta, anterior, actual, origen="visa"):
+    return Statement(
+        archivo=archivo,
+        banco="HSBC",
+        origen=origen,
+        fecha_desde=desde,
+        fecha_hasta=hasta,
+        saldo_anterior_ars=anterior,
+        saldo_anterior_usd=0.0,
+        saldo_actual_ars=actual,
+        saldo_actual_usd=0.0,
+    )
+
+
+class TestBalanceChain(unittest.TestCase):
+    def test_sorted_pass_reports_mismatch_and_gap_per_origen(self):
+        from hsbc_parser.validate import check_balance_chain
+
+        statements = [
+            _stmt("mar.pdf", "2024-02-26", "2024-03-25", 180.0, 90.0),  # february is missing
+            _stmt("jan.pdf", "2023-12-22", "2024-01-25", 0.0, 100.0),
+            _stmt("feb-bad.pdf", "2024-01-26", "2024-02-25", 120.0, 180.0),
+            _stmt("cuenta.pdf", "2024-01-01", "2024-01-31", 5.0, 5.0, origen="cuenta"),
+            _stmt("jan-other-card.pdf", "2023-12-22", "2024-01-25", 0.0, 70.0, origen="mastercard"),
+        ]
+
+        warnings = check_balance_chain(statements)
+
+        self.assertEqual([(w["archivo"], w["code"]) for w in warnings], [("feb-bad.pdf", "BALANCE_CHAIN_MISMATCH")])
+        self.assertEqual(warnings[0]["context"]["previous_archivo"], "jan.pdf")
+        self.assertEqual(warnings[0]["context"]["diff"], 20.0)
+
+        gap = check_balance_chain([statements[0], statements[1]])
+        self.assertEqual([(w["archivo"], w["code"]) for w in gap], [("mar.pdf", "STATEMENT_GAP")])
+
+    def test_incremental_add_only_checks_new_links(self):
+        from hsbc_parser.validate import BalanceChain
+
+        chain = BalanceChain([_stmt("jan.pdf", "2023-12-22", "2024-01-25", 0.0, 100.0)])
+        self.assertEqual(chain.add(_stmt("feb.pdf", "2024-01-26", "2024-02-25", 100.0, 150.0)), [])
+        added = chain.add(_stmt("mar.pdf", "2024-02-26", "2024-03-25", 140.0, 160.0))
+        self.assertEqual([w["code"] for w in added], ["BALANCE_CHAIN_MISMATCH"])
+        self.assertEqual(len(chain), 3)
+        self.assertEqual(chain.check(), added)
+
+    def test_add_between_two_statements_retracts_their_link(self):
+        from hsbc_parser.validate import BalanceChain
+
+        chain = BalanceChain(
+            [
+                _stmt("mar.pdf", "2024-02-26", "2024-03-25", 150.0, 160.0),
+                _stmt("jan.pdf", "2023-12-22", "2024-01-25", 0.0, 100.0),
+            ]
+        )
+        self.assertEqual([w["code"] for w in chain.check()], ["STATEMENT_GAP"])
+
+        added = chain.add(_stmt("feb.pdf", "2024-01-26", "2024-02-25", 100.0, 150.0))
+        self.assertEqual(
+            [(w["archivo"], w["level"], w["code"]) for w in added], [("mar.pdf", "INFO", "CHAIN_WARNING_RETRACTED")]
+        )
+        self.assertEqual(added[0]["context"]["codes"], ["STATEMENT_GAP"])
+        self.assertEqual(added[0]["context"]["inserted_archivo"], "feb.pdf")
+        self.assertEqual(chain.check(), [])
+
+        # A link without warnings is split silently; the new links are still checked.
+        added = chain.add(_stmt("feb2.pdf", "2024-01-26", "2024-02-25", 100.0, 155.0))
+        self.assertEqual(
+            [(w["archivo"], w["code"]) for w in added],
+            [("feb2.pdf", "STATEMENT_OVERLAP"), ("feb2.pdf", "BALANCE_CHAIN_MISMATCH"), ("mar.pdf", "BALANCE_CHAIN_MISMATCH")],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
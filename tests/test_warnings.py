@@ -0,0 +1,78 @@
+import csv
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+def _noisy(parser, n):
+    for i in range(n):
+        parser.warn("INFO" if i < n - 1 else "WARNING", "NOISY_ROW", "Row looks odd", {"row": i})
+    return parser
+
+
+class TestWarningCollector(unittest.TestCase):
+    def test_repeats_fold_into_one_row_with_count_and_samples(self):
+        from hsbc_parser.parsers.types import WarningCollector, warn
+
+        rows = WarningCollector(samples=3)
+        for i in range(10):
+            warn(rows, "a.pdf", "INFO", "NOISY_ROW", "Row looks odd", {"row": i})
+        warn(rows, "a.pdf", "ERROR", "NOISY_ROW", "Row looks odd", {"row": 10})
+        warn(rows, "b.pdf", "INFO", "NOISY_ROW", "Row looks odd", {"row": 0})
+        warn(rows, "a.pdf", "WARNING", "OTHER", "Once")
+
+        self.assertEqual([(r["archivo"], r["code"], r["count"]) for r in rows],
+                         [("a.pdf", "NOISY_ROW", 11), ("b.pdf", "NOISY_ROW", 1), ("a.pdf", "OTHER", 1)])
+        self.assertEqual(rows[0]["level"], "ERROR")
+        self.assertEqual(rows[0]["context"], {"samples": [{"row": 0}, {"row": 1}, {"row": 2}]})
+        self.assertEqual(rows[1]["context"], {"row": 0})
+        self.assertIsNone(rows[2]["context"])
+
+    def test_full_warnings_keep_every_occurrence_and_export_count(self):
+        from hsbc_parser.dispatcher import parse_text
+        from hsbc_parser.export import export_csv
+
+        page = (FIXTURES_DIR / "cuenta_full_page.txt").read_text(encoding="utf-8")
+        folded = _noisy(parse_text([page], "cuenta", name="a.pdf"), 50)
+        full = _noisy(parse_text([page], "cuenta", name="b.pdf", warning_samples=None), 50)
+
+        self.assertEqual(sum(w["code"] == "NOISY_ROW" for w in folded.warnings), 1)
+        self.assertEqual(sum(w["code"] == "NOISY_ROW" for w in full.warnings), 50)
+        with tempfile.TemporaryDirectory() as tmp:
+            export_csv([folded, full], tmp, extra_warnings=[{"archivo": "c.pdf", "level": "ERROR", "code": "X",
+                                                             "message": "m", "context": None}], frames=False)
+            with (Path(tmp) / "warnings.csv").open(newline="", encoding="utf-8") as f:
+                rows = [r for r in csv.DictReader(f)]
+        noisy = [r for r in rows if r["code"] == "NOISY_ROW"]
+        self.assertEqual([(r["archivo"], r["count"]) for r in noisy if r["archivo"] == "a.pdf"], [("a.pdf", "50")])
+        self.assertEqual(len(json.loads(noisy[0]["context"])["samples"]), 5)
+        self.assertEqual(noisy[0]["level"], "WARNING")
+        self.assertEqual({r["count"] for r in noisy if r["archivo"] == "b.pdf"}, {"1"})
+        self.assertEqual([r["count"] for r in rows if r["archivo"] == "c.pdf"], ["1"])
+
+    def test_cache_hit_keeps_folding_new_warnings(self):
+        from hsbc_parser.cache import ParseCache
+        from hsbc_parser.dispatcher import parse_pages, parse_text
+        from hsbc_parser.parsers.types import warn
+
+        page = (FIXTURES_DIR / "visa_full_page.txt").read_text(encoding="utf-8")
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ParseCache(tmp)
+            first = parse_text([page], "visa")
+            parse_pages("a.pdf", [page], "visa", cache=cache)
+            hit = parse_pages("a.pdf", [page], "visa", cache=cache)
+            full = parse_pages("a.pdf", [page], "visa", cache=cache, warning_samples=None)
+            self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+        self.assertEqual([w["code"] for w in hit.warnings], [w["code"] for w in first.warnings])
+        for _ in range(2):
+            warn(hit.warnings, "a.pdf", "WARNING", "DUPLICATE_TRANSACTION", "dup", {"row": 0})
+        self.assertEqual(hit.warnings[-1]["count"], 2)
+        self.assertEqual(len(full.warnings), len(first.warnings))
+
+
+if __name__ == "__main__":
+    unittest.main()
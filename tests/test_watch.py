@@ -0,0 +1,78 @@
+import csv
+import tempfile
+import unittest
+from pathlib import Path
+
+from synthetic_pdf import write_text_pdf
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+def _read_archivos(path: Path):
+    with path.open(newline="", encoding="utf-8") as f:
+        return [row["archivo"] for row in csv.DictReader(f)]
+
+
+class TestWatch(unittest.TestCase):
+    def test_stable_file_tracker_waits_for_size_to_settle(self):
+        from hsbc_parser.watch import StableFileTracker
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "partial.pdf"
+            path.write_bytes(b"%PDF-1.4\n")
+            tracker = StableFileTracker(settle_polls=1)
+
+            self.assertEqual(tracker.poll([path]), [])
+            with path.open("ab") as f:
+                f.write(b"more bytes still being copied")
+            self.assertEqual(tracker.poll([path]), [])
+            self.assertEqual(tracker.poll([path]), [path])
+            # Reported once only.
+            self.assertEqual(tracker.poll([path]), [])
+
+    def test_watch_parses_new_files_and_appends_without_duplicates(self):
+        from hsbc_parser.watch import watch
+
+        visa = (FIXTURES_DIR / "visa_full_page.txt").read_text(encoding="utf-8")
+        cuenta = (FIXTURES_DIR / "cuenta_full_page.txt").read_text(encoding="utf-8")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            in_dir = Path(tmp) / "in"
+            out_dir = Path(tmp) / "out"
+            in_dir.mkdir()
+            write_text_pdf(in_dir / "HSBC Visa 2024-01.pdf", [visa])
+
+            n = watch(in_dir, out_dir, interval=0.01, workers=1, max_cycles=3)
+            self.assertEqual(n, 1)
+
+            write_text_pdf(in_dir / "HSBC Cuenta 2024-01.pdf", [cuenta])
+            n = watch(in_dir, out_dir, interval=0.01, workers=1, max_cycles=3)
+            self.assertEqual(n, 1)
+
+            self.assertEqual(
+                sorted(_read_archivos(out_dir / "statements.csv")),
+                ["HSBC Cuenta 2024-01.pdf", "HSBC Visa 2024-01.pdf"],
+            )
+            self.assertEqual(len(_read_archivos(out_dir / "transactions.csv")), 3 + 3)
+
+    def test_restart_does_not_retry_failed_files(self):
+        from hsbc_parser.watch import watch
+
+        visa = (FIXTURES_DIR / "visa_full_page.txt").read_text(encoding="utf-8")
+        with tempfile.TemporaryDirectory() as tmp:
+            in_dir = Path(tmp) / "in"
+            out_dir = Path(tmp) / "out"
+            in_dir.mkdir()
+            (in_dir / "broken.pdf").write_bytes(b"not a pdf at all")
+            write_text_pdf(in_dir / "HSBC Visa 2024-01.pdf", [visa])
+
+            self.assertEqual(watch(in_dir, out_dir, interval=0.01, workers=1, max_cycles=3), 1)
+            self.assertEqual(watch(in_dir, out_dir, interval=0.01, workers=1, max_cycles=3), 0)
+
+            with (out_dir / "warnings.csv").open(newline="", encoding="utf-8") as f:
+                errors = [row["archivo"] for row in csv.DictReader(f) if row["level"] == "ERROR"]
+            self.assertEqual(errors, ["broken.pdf"])
+
+
+if __name__ == "__main__":
+    unittest.main()